@@ -0,0 +1,169 @@
+"""
+Microbenchmark of FormattedProjectData formatting.
+
+Compares the previous formatting (validated construction, team string built on
+every model_dump) with the compiled formatter, and model_dump of an unchanged
+form as on every Streamlit rerun. Formatting a list of projects in one call gave
+no gain over formatting them one by one, the time is spent constructing the
+models, so there is no batch variant.
+
+Usage:
+    python benchmarks/bench_formatting.py [--projects N] [--dumps N]
+"""
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from extraction_models import ProjectData  # noqa: E402
+from formatted_data import FormattedProjectData  # noqa: E402
+from synthetic import make_project_data  # noqa: E402
+
+
+def previous_from_project_data(project_data: ProjectData) -> FormattedProjectData:
+    """Formatting as it was done before the compiled formatter."""
+    stages = project_data.project_stages
+    stage_texts = []
+    for i, stage in enumerate(stages, 1):
+        stage_results = "\n".join(
+            [f"• {result.result_description}" for result in stage.smart_results]
+        )
+        stage_texts.append(
+            f"Этап №{i}\n{stage.stage_start_date}-{stage.stage_end_date}.\n"
+            f"{stage.stage_name}:\n{stage_results}"
+        )
+    team = project_data.project_team
+    return FormattedProjectData(
+        project_name=project_data.project_name,
+        project_start_order_form=project_data.project_start_order_form,
+        project_goal=project_data.project_goal,
+        project_result_vision=project_data.project_result_vision,
+        project_constraints_exclusions="\n".join(project_data.project_constraints_exclusions),
+        project_risks_assumptions="\n".join(project_data.project_risks_assumptions),
+        project_stakeholders="\n".join(project_data.project_stakeholders),
+        project_steering_committee="\n".join(project_data.project_steering_committee),
+        project_start_date=project_data.project_start_date,
+        project_end_date="\n".join(
+            f"Этап {i} – {stage.stage_end_date}" for i, stage in enumerate(stages, 1)
+        ),
+        project_stages_results="\n\n".join(stage_texts),
+        project_initiator=team.project_initiator or "Не указан",
+        project_owner=team.project_owner or "Не указан",
+        project_owner_representative=team.project_owner_representative or "Не указан",
+        project_leader=team.project_leader or "Не указан",
+        management_team_curator=team.management_team_curator or "Не указан",
+        project_manager=team.project_manager or "Не указан",
+        strategy_portfolio_leader=team.strategy_portfolio_leader or "Не указан",
+        strategy_event_leader=team.strategy_event_leader or "Не указан",
+        independent_experts=team.independent_experts or [],
+    )
+
+
+def previous_project_team(formatted_data: FormattedProjectData) -> str:
+    """Team string as it was built on every model_dump before the memoization."""
+    lines = [
+        f"{label}: {value}"
+        for label, value in [
+            ("Инициатор проекта", formatted_data.project_initiator),
+            ("Владелец проекта", formatted_data.project_owner),
+            ("Представитель Владельца проекта", formatted_data.project_owner_representative),
+            ("Руководитель проекта", formatted_data.project_leader),
+            ("Куратор команды управления", formatted_data.management_team_curator),
+            ("Менеджер проекта", formatted_data.project_manager),
+            (
+                "Руководитель портфеля мероприятий Стратегии",
+                formatted_data.strategy_portfolio_leader,
+            ),
+            ("Руководитель мероприятия Стратегии", formatted_data.strategy_event_leader),
+        ]
+    ]
+    lines.extend(f"Независимый эксперт: {expert}" for expert in formatted_data.independent_experts)
+    return "\n".join(lines)
+
+
+def previous_model_dump(formatted_data: FormattedProjectData) -> dict:
+    """model_dump as it was before the memoization."""
+    base_dict = BaseModel.model_dump(formatted_data)
+    base_dict["project_team"] = previous_project_team(formatted_data)
+    return base_dict
+
+
+def measure(label: str, run, count: int, repeats: int = 5) -> float:
+    """Best time of several runs, without garbage collection of earlier results."""
+    elapsed = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        started = time.perf_counter()
+        run()
+        elapsed = min(elapsed, time.perf_counter() - started)
+        gc.enable()
+    print(f"{label:<40} {elapsed * 1e6 / count:8.2f} us per item")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--dumps", type=int, default=10000)
+    args = parser.parse_args()
+
+    projects = [
+        make_project_data(index, stages=2 + index % 5, results_per_stage=1 + index % 4)
+        for index in range(args.projects)
+    ]
+
+    # The new formatter must produce exactly what the previous one did
+    for project_data in projects[:100]:
+        expected = previous_from_project_data(project_data)
+        actual = FormattedProjectData.from_project_data(project_data)
+        assert actual == expected
+        assert actual.project_team == previous_project_team(expected)
+
+    print(f"{args.projects} synthetic projects")
+    before = measure(
+        "previous from_project_data",
+        lambda: [previous_from_project_data(p) for p in projects],
+        args.projects,
+    )
+    single = measure(
+        "from_project_data",
+        lambda: [FormattedProjectData.from_project_data(p) for p in projects],
+        args.projects,
+    )
+    print(f"speedup: x{before / single:.1f}")
+
+    print(f"\nmodel_dump of an unchanged form, {args.dumps} times")
+    formatted_data = FormattedProjectData.from_project_data(projects[0])
+    assert formatted_data.model_dump() == previous_model_dump(formatted_data)
+    previous_dump = measure(
+        "previous model_dump",
+        lambda: [previous_model_dump(formatted_data) for _ in range(args.dumps)],
+        args.dumps,
+    )
+    team_before = measure(
+        "team string every time",
+        lambda: [previous_project_team(formatted_data) for _ in range(args.dumps)],
+        args.dumps,
+    )
+    team_after = measure(
+        "memoized project_team",
+        lambda: [formatted_data.project_team for _ in range(args.dumps)],
+        args.dumps,
+    )
+    dump = measure(
+        "model_dump", lambda: [formatted_data.model_dump() for _ in range(args.dumps)], args.dumps
+    )
+    print(
+        f"speedup: x{team_before / team_after:.1f} project_team, "
+        f"x{previous_dump / dump:.1f} model_dump"
+    )
+
+
+if __name__ == "__main__":
+    main()
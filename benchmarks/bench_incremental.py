@@ -0,0 +1,118 @@
+"""
+Benchmark of re-extraction after small edits of a description.
+
+Edits input_examples/example_1.md in a few typical ways and compares a full
+extraction with IncrementalProjectDataExtractor. The LLM is replaced by a replay
+model answering from benchmarks/recordings; its latency grows with the number of
+generated tokens, which dominate the response time of structured output calls.
+
+Usage:
+    python benchmarks/bench_incremental.py [--ms-per-token 20]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from extraction_models import ProjectData  # noqa: E402
+from extractor import ProjectDataExtractor  # noqa: E402
+from fake_llm import FakeProjectDataChatModel  # noqa: E402
+from incremental_extractor import SECTION_MODELS, IncrementalProjectDataExtractor  # noqa: E402
+from prompt_budget import estimate_tokens  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+
+EDITS = {
+    "new risk": (
+        "### **Ограничения и риски:**  \n",
+        "### **Ограничения и риски:**  \n- Риск ухода ключевых специалистов.  \n",
+    ),
+    "team member replaced": ("А.В. Смирнов", "П.Р. Соколов"),
+    "stage dates moved": ("01.01.2025 – 30.06.2025", "01.02.2025 – 31.07.2025"),
+}
+
+
+class ReplayResponses:
+    """Answers every schema with the matching part of a recorded ProjectData."""
+
+    def __init__(self, recording: dict, ms_per_token: float):
+        self.recording = recording
+        self.ms_per_token = ms_per_token
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str, tool_name: str) -> dict:
+        if tool_name == "StageResults":
+            stage = next(
+                (
+                    stage
+                    for stage in self.recording["project_stages"]
+                    if f"«{stage['stage_name']}»" in prompt
+                ),
+                self.recording["project_stages"][0],
+            )
+            response = {"smart_results": stage["smart_results"]}
+        elif tool_name == "ProjectData":
+            response = self.recording
+        else:
+            # Section models only have a part of the fields, stages without results
+            model = next(
+                model for model in SECTION_MODELS.values() if model.__name__ == tool_name
+            )
+            response = {field: self.recording[field] for field in model.model_fields}
+            if "project_stages" in response:
+                response["project_stages"] = [
+                    {key: value for key, value in stage.items() if key != "smart_results"}
+                    for stage in response["project_stages"]
+                ]
+        tokens = estimate_tokens(json.dumps(response, ensure_ascii=False))
+        with self._lock:
+            self.output_tokens += tokens
+        time.sleep(tokens * self.ms_per_token / 1000)
+        return response
+
+
+def run(func, responses: ReplayResponses) -> tuple[float, int]:
+    responses.output_tokens = 0
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started, responses.output_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ms-per-token", type=float, default=20.0)
+    args = parser.parse_args()
+
+    text = (ROOT / "input_examples" / "example_1.md").read_text(encoding="utf-8")
+    recording = json.loads(
+        (Path(__file__).parent / "recordings" / "example_1.json").read_text(encoding="utf-8")
+    )
+    previous_data = ProjectData.model_validate(recording)
+    responses = ReplayResponses(recording, args.ms_per_token)
+    llm = FakeProjectDataChatModel(response_factory=responses)
+    full = ProjectDataExtractor(llm)
+    incremental = IncrementalProjectDataExtractor(llm)
+
+    print(f"{'edit':<22} {'mode':<12} {'output tokens':>14} {'seconds':>9}")
+    for name, (old, new) in EDITS.items():
+        edited = text.replace(old, new, 1)
+        full_time, full_tokens = run(lambda: full.extract_data(edited), responses)
+        sections = incremental.changed_sections(text, edited)
+        incremental_time, incremental_tokens = run(
+            lambda: incremental.extract_update(text, previous_data, edited), responses
+        )
+        print(f"{name:<22} {'full':<12} {full_tokens:>14} {full_time:>9.2f}")
+        print(
+            f"{'':<22} {'incremental':<12} {incremental_tokens:>14} {incremental_time:>9.2f}"
+            f"  sections: {', '.join(sorted(sections or [])) or 'all'},"
+            f" x{full_time / incremental_time:.1f} faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Microbenchmark of the per-request setup cost of the LLM client and extractor.
+
+Compares building a new ChatGroq client and ProjectDataExtractor on every request
+(the previous behaviour of app.py) with the process-wide registry in llm.py, and
+a fresh HTTP connection per request with a pooled keep-alive connection against
+a local HTTP server. No requests are sent to the LLM provider.
+
+Usage:
+    python benchmarks/bench_llm_setup.py [--iterations N]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_MODEL", "benchmark")
+os.environ.setdefault("TEMPLATE_PATH", "templates/template.docx")
+
+import httpx  # noqa: E402
+
+from extractor import ProjectDataExtractor  # noqa: E402
+from llm import create_llm, get_extractor  # noqa: E402
+from settings import settings  # noqa: E402
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(label: str, func, iterations: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - started) / iterations * 1000
+    print(f"{label:<45} {per_call:8.3f} ms/request")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    def fresh_extractor():
+        llm = create_llm(
+            settings.openai_api_key, settings.openai_model, settings.openai_temperature
+        )
+        ProjectDataExtractor(llm)
+
+    before = measure("new client + extractor per request", fresh_extractor, args.iterations)
+    after = measure("registry (llm.get_extractor)", get_extractor, args.iterations)
+    print(f"setup speedup: x{before / after:.0f}\n")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    def new_connection():
+        with httpx.Client() as client:
+            client.get(url)
+
+    pooled_client = httpx.Client()
+    before = measure("new HTTP connection per request", new_connection, args.iterations)
+    after = measure(
+        "pooled keep-alive connection", lambda: pooled_client.get(url), args.iterations
+    )
+    print(f"round-trip speedup: x{before / after:.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of packing short descriptions into shared extraction requests.
+
+Extracts many short synthetic descriptions one per request and packed into groups
+(see packed_extractor.py) with an offline model answering from the recording of
+example_1, and compares the number of requests and the input tokens per passport.
+Input tokens include the instructions, the tool schema and the descriptions.
+With --invalid-share some packed results are returned invalid to exercise the
+fallback to single requests.
+
+Usage:
+    python benchmarks/bench_packing.py [--descriptions 40] [--max-items 4]
+    python benchmarks/bench_packing.py --invalid-share 0.1
+"""
+import argparse
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from extraction_models import ProjectData  # noqa: E402
+from extractor import ProjectDataExtractor  # noqa: E402
+from fake_llm import FakeProjectDataChatModel  # noqa: E402
+from packed_extractor import PackedProjectDataExtractor, packed_schema  # noqa: E402
+from prompt_budget import analyze_prompt_budget, count_tokens  # noqa: E402
+
+RECORDING = Path(__file__).parent / "recordings" / "example_1.json"
+
+
+def make_description(index: int) -> str:
+    """A short description of a few lines, like the smallest inputs in production."""
+    return (
+        f"Проект «Цифровой сервис мониторинга №{index}» стартует 2024-0{1 + index % 9}-01 "
+        "по письменному поручению. Инициатор проекта — А.В. Смирнов, руководитель "
+        "проекта — Н.С. Васильев.\n"
+        f"Цель: сократить время реагирования на инциденты на {10 + index % 30}%. "
+        "Этапы: анализ требований до конца квартала, затем разработка прототипа и "
+        "пилотное внедрение в одном регионе. Риск: нехватка специалистов."
+    )
+
+
+class CountingModel:
+    """Offline model answers with request accounting."""
+
+    def __init__(self, reference: dict, invalid_share: float, seed: int = 1):
+        self.reference = reference
+        self.invalid_share = invalid_share
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.prompt_tokens = 0
+
+    def respond(self, prompt: str, tool_name: str) -> dict:
+        self.requests += 1
+        self.prompt_tokens += count_tokens(prompt)
+        if tool_name != "PackedProjectDataList":
+            return self.reference
+        projects = []
+        for number in re.findall(r"^### Описание (\d+)$", prompt, re.MULTILINE):
+            item = {**self.reference, "description_id": number}
+            if self.random.random() < self.invalid_share:
+                del item["project_name"]
+            projects.append(item)
+        return {"projects": projects}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--descriptions", type=int, default=40)
+    parser.add_argument("--max-items", type=int, default=4)
+    parser.add_argument("--max-group-chars", type=int, default=12000)
+    parser.add_argument("--invalid-share", type=float, default=0.0)
+    args = parser.parse_args()
+
+    reference = ProjectData.model_validate_json(RECORDING.read_text(encoding="utf-8"))
+    texts = [make_description(index) for index in range(args.descriptions)]
+    single_schema_tokens = analyze_prompt_budget(ProjectData, "").schema_tokens
+    packed_schema_tokens = analyze_prompt_budget(packed_schema(ProjectData), "").schema_tokens
+
+    single_model = CountingModel(reference.model_dump(), args.invalid_share)
+    single = ProjectDataExtractor(FakeProjectDataChatModel(response_factory=single_model.respond))
+    for text in texts:
+        single.extract_data(text)
+    single_tokens = single_model.prompt_tokens + single_model.requests * single_schema_tokens
+
+    packed_model = CountingModel(reference.model_dump(), args.invalid_share)
+    extractor = ProjectDataExtractor(FakeProjectDataChatModel(response_factory=packed_model.respond))
+    packer = PackedProjectDataExtractor(
+        extractor, max_group_chars=args.max_group_chars, max_items=args.max_items
+    )
+    results = [None] * len(texts)
+    groups = packer.pack(texts)
+    for group in groups:
+        for index, project_data in zip(group, packer.extract_group([texts[i] for i in group])):
+            results[index] = project_data
+    packed_requests = packed_model.requests
+    fallbacks = [index for index, project_data in enumerate(results) if project_data is None]
+    for index in fallbacks:
+        results[index] = extractor.extract_data(texts[index])
+    packed_tokens = (
+        packed_model.prompt_tokens
+        + packed_requests * packed_schema_tokens
+        + (packed_model.requests - packed_requests) * single_schema_tokens
+    )
+    assert all(project_data == reference for project_data in results)
+
+    count = len(texts)
+    print(f"{count} descriptions of ~{count_tokens(texts[0])} tokens, {len(groups)} groups")
+    print(f"{'mode':<8} {'requests':>9} {'input tokens':>13} {'per passport':>13}")
+    print(f"{'single':<8} {single_model.requests:9d} {single_tokens:13d} {single_tokens / count:13.0f}")
+    print(f"{'packed':<8} {packed_model.requests:9d} {packed_tokens:13d} {packed_tokens / count:13.0f}")
+    print(
+        f"fallback to single requests: {len(fallbacks)}, "
+        f"input tokens saved: {(1 - packed_tokens / single_tokens) * 100:.1f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
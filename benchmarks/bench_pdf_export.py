@@ -0,0 +1,65 @@
+"""
+Benchmark of DOCX to PDF conversion throughput.
+
+Compares starting a converter for every document (as with one `soffice --convert-to`
+call per file) with a pool of warm converter workers.
+
+Usage:
+    python benchmarks/bench_pdf_export.py [--documents N] [--workers N] [--backend auto|libreoffice|fpdf]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from docx_filler import ProjectPassportFiller  # noqa: E402
+from formatted_data import FormattedProjectData  # noqa: E402
+from pdf_export import create_pdf_converter  # noqa: E402
+from synthetic import make_project_data  # noqa: E402
+
+DEFAULT_TEMPLATE = Path(__file__).parent.parent / "templates" / "template.docx"
+
+
+def report(label: str, documents: int, duration: float) -> float:
+    rate = documents / duration
+    print(f"{label:<35} {rate:8.2f} documents/s  {duration / documents * 1000:8.1f} ms/document")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("--template", default=str(DEFAULT_TEMPLATE))
+    args = parser.parse_args()
+
+    filler = ProjectPassportFiller(args.template)
+    document = filler.render_bytes(
+        FormattedProjectData.from_project_data(make_project_data())
+    )
+
+    started = time.perf_counter()
+    for _ in range(args.documents):
+        with create_pdf_converter(args.backend, workers=1) as converter:
+            converter.convert(document)
+    cold = report("cold converter per document", args.documents, time.perf_counter() - started)
+
+    with create_pdf_converter(args.backend, workers=args.workers) as converter:
+        print(f"backend: {type(converter).__name__}, workers: {args.workers}")
+        started = time.perf_counter()
+        for _ in range(args.documents):
+            converter.convert(document)
+        report("warm pool, sequential", args.documents, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in converter.convert_many([document] * args.documents):
+            pass
+        pooled = report("warm pool, concurrent", args.documents, time.perf_counter() - started)
+    print(f"speedup: x{pooled / cold:.1f}")
+
+
+if __name__ == "__main__":
+    main()
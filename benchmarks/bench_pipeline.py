@@ -0,0 +1,273 @@
+"""
+Benchmark and regression suite for the full passport pipeline.
+
+Runs extract -> FormattedProjectData.from_project_data -> render over
+input_examples/*.md and synthetic scaled inputs. The LLM is replaced by a replay
+model that returns the recorded ProjectData JSON from benchmarks/recordings, so
+the numbers show the overhead of our code plus an optional simulated LLM latency.
+
+Usage:
+    python benchmarks/bench_pipeline.py --output report.json
+    python benchmarks/bench_pipeline.py --baseline report.json --max-regression 0.25
+"""
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from docx import Document  # noqa: E402
+
+from docx_filler import ProjectPassportFiller  # noqa: E402
+from extraction_models import ProjectData  # noqa: E402
+from extraction_prompt import EXTRACTION_PROMPT  # noqa: E402
+from extractor import ProjectDataExtractor  # noqa: E402
+from fake_llm import FakeProjectDataChatModel  # noqa: E402
+from formatted_data import FormattedProjectData  # noqa: E402
+from prompt_budget import estimate_tokens  # noqa: E402
+from synthetic import make_project_data  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+RECORDINGS_DIR = Path(__file__).parent / "recordings"
+STAGES = ("extract", "format", "render")
+
+
+def load_cases(scales: list[int]) -> list[tuple[str, str, dict]]:
+    """Build (name, description, recorded response) triples."""
+    cases = []
+    for path in sorted((ROOT / "input_examples").glob("*.md")):
+        recording = RECORDINGS_DIR / f"{path.stem}.json"
+        if recording.exists():
+            cases.append(
+                (
+                    path.stem,
+                    path.read_text(encoding="utf-8"),
+                    json.loads(recording.read_text(encoding="utf-8")),
+                )
+            )
+
+    base_text = cases[0][1] if cases else "Описание проекта."
+    for scale in scales:
+        response = make_project_data(stages=4 * scale, results_per_stage=3)
+        cases.append(
+            (
+                f"synthetic_x{scale}",
+                "\n\n".join([base_text] * scale),
+                json.loads(response.model_dump_json()),
+            )
+        )
+    return cases
+
+
+def run_pipeline(
+    extractor: ProjectDataExtractor, filler: ProjectPassportFiller, text: str
+) -> tuple[dict, ProjectData, bytes]:
+    """Run the pipeline once and return the duration of every stage in ms."""
+    timings = {}
+
+    started = time.perf_counter()
+    project_data = extractor.extract_data(text)
+    timings["extract"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    formatted_data = FormattedProjectData.from_project_data(project_data)
+    timings["format"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    document = filler.render_bytes(formatted_data)
+    timings["render"] = (time.perf_counter() - started) * 1000
+
+    return timings, project_data, document
+
+
+def check_document(project_data: ProjectData, document: bytes) -> list[str]:
+    """Check that the key extracted values made it into the document."""
+    docx = Document(io.BytesIO(document))
+    texts = [paragraph.text for paragraph in docx.paragraphs]
+    texts += [
+        cell.text for table in docx.tables for row in table.rows for cell in row.cells
+    ]
+    text = "\n".join(texts)
+    expected = [project_data.project_name] + [
+        stage.stage_name for stage in project_data.project_stages
+    ]
+    return [value for value in expected if value not in text]
+
+
+def timing_stats(timings: list[float]) -> dict:
+    """Median, minimum and median absolute deviation of the timings of one stage."""
+    median = statistics.median(timings)
+    return {
+        "median_ms": median,
+        "min_ms": min(timings),
+        "mad_ms": statistics.median(abs(timing - median) for timing in timings),
+    }
+
+
+def benchmark_case(
+    name: str,
+    text: str,
+    response: dict,
+    filler: ProjectPassportFiller,
+    repeat: int,
+    llm_latency: float,
+) -> dict:
+    llm = FakeProjectDataChatModel(responses=[response], latency=llm_latency)
+    extractor = ProjectDataExtractor(llm)
+
+    runs = [run_pipeline(extractor, filler, text) for _ in range(repeat)]
+    _, project_data, document = runs[-1]
+
+    tracemalloc.start()
+    run_pipeline(extractor, filler, text)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    schema = json.dumps(ProjectData.model_json_schema(), ensure_ascii=False)
+    result = {stage: timing_stats([run[0][stage] for run in runs]) for stage in STAGES}
+    result.update(
+        {
+            "total_ms": sum(result[stage]["median_ms"] for stage in STAGES),
+            "peak_memory_kb": peak_memory / 1024,
+            "input_chars": len(text),
+            "prompt_tokens": estimate_tokens(f"{EXTRACTION_PROMPT}\n\n{text}")
+            + estimate_tokens(schema),
+            "output_tokens": estimate_tokens(json.dumps(response, ensure_ascii=False)),
+            "document_bytes": len(document),
+            "missing_in_document": check_document(project_data, document),
+        }
+    )
+    print(
+        f"{name:<16} extract {result['extract']['median_ms']:8.2f} ms  "
+        f"format {result['format']['median_ms']:7.2f} ms  "
+        f"render {result['render']['median_ms']:8.2f} ms  "
+        f"peak {result['peak_memory_kb']:9.0f} KB  "
+        f"tokens {result['prompt_tokens']}/{result['output_tokens']}"
+    )
+    return result
+
+
+def find_regressions(
+    report: dict,
+    baseline: dict,
+    max_regression: float,
+    min_delta_ms: float = 0.0,
+    noise_factor: float = 3.0,
+) -> list[str]:
+    """
+    Compare a report with a baseline report and describe every regression.
+
+    A stage timing counts as a regression only when both its median and its
+    minimum over the repeats grew by more than `max_regression`, and the median
+    grew by more than the run-to-run noise: `noise_factor` times the sum of the
+    median absolute deviations of the repeats in both reports, and at least
+    `min_delta_ms`. Memory and token counts are compared exactly.
+    """
+    regressions = []
+    for name, case in report["cases"].items():
+        if case["missing_in_document"]:
+            regressions.append(
+                f"{name}: missing in document {case['missing_in_document']}"
+            )
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        metrics = [
+            (
+                f"{stage} median_ms",
+                case[stage]["median_ms"],
+                base[stage]["median_ms"],
+                max(
+                    min_delta_ms,
+                    noise_factor
+                    * (case[stage].get("mad_ms", 0.0) + base[stage].get("mad_ms", 0.0)),
+                ),
+            )
+            for stage in STAGES
+            # Interference only slows runs down, so the fastest run is the least noisy
+            if case[stage]["min_ms"] > base[stage]["min_ms"] * (1 + max_regression)
+        ]
+        metrics += [
+            (metric, case[metric], base[metric], 0)
+            for metric in ("peak_memory_kb", "prompt_tokens", "output_tokens")
+        ]
+        for metric, value, base_value, min_delta in metrics:
+            if (
+                base_value
+                and value > base_value * (1 + max_regression)
+                and value - base_value > min_delta
+            ):
+                regressions.append(
+                    f"{name}: {metric} {base_value:.2f} -> {value:.2f} "
+                    f"(+{(value / base_value - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=9, help="Runs per case")
+    parser.add_argument(
+        "--scales", default="1,4,16", help="Comma-separated sizes of synthetic inputs"
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.0, help="Simulated LLM latency, seconds"
+    )
+    parser.add_argument("--template", default=str(ROOT / "templates" / "template.docx"))
+    parser.add_argument("--output", help="Path of the JSON report")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative growth of every metric compared with the baseline",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.0,
+        help="Smallest absolute growth of a stage timing treated as a regression",
+    )
+    parser.add_argument(
+        "--noise-factor",
+        type=float,
+        default=3.0,
+        help="Growth must exceed this many median absolute deviations of the repeats",
+    )
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    filler = ProjectPassportFiller(args.template)
+    report = {
+        "repeat": args.repeat,
+        "llm_latency": args.llm_latency,
+        "cases": {
+            name: benchmark_case(
+                name, text, response, filler, args.repeat, args.llm_latency
+            )
+            for name, text, response in load_cases(scales)
+        },
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = find_regressions(
+            report, baseline, args.max_regression, args.min_delta_ms, args.noise_factor
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
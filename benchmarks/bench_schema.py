@@ -0,0 +1,161 @@
+"""
+Token budget of the extraction prompt and A/B comparison of schema modes.
+
+Prints the tokens sent with every request besides the description: the
+instructions and the tool schema built from extraction_models.py, with the most
+expensive fields. Then compares two schema modes (see compact_schema.py) on
+input_examples/*.md: input tokens per request and, with --live, extraction quality
+against the reference results in benchmarks/recordings using the LLM configured
+in settings (OPENAI_* environment variables).
+
+Usage:
+    python benchmarks/bench_schema.py [--a full] [--b compact] [--top 15]
+    python benchmarks/bench_schema.py --b minimal --live --runs 3
+"""
+import argparse
+import difflib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compact_schema import SCHEMA_MODES, get_extraction_schema  # noqa: E402
+from extraction_models import ProjectData  # noqa: E402
+from formatted_data import FormattedProjectData  # noqa: E402
+from prompt_budget import analyze_prompt_budget, count_tokens  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+RECORDINGS_DIR = Path(__file__).parent / "recordings"
+
+
+def load_examples() -> list[tuple[str, str, ProjectData]]:
+    """Build (name, description, reference result) triples."""
+    examples = []
+    for path in sorted((ROOT / "input_examples").glob("*.md")):
+        recording = RECORDINGS_DIR / f"{path.stem}.json"
+        if recording.exists():
+            examples.append(
+                (
+                    path.stem,
+                    path.read_text(encoding="utf-8"),
+                    ProjectData.model_validate_json(recording.read_text(encoding="utf-8")),
+                )
+            )
+    return examples
+
+
+def field_scores(reference: ProjectData, candidate: ProjectData) -> dict[str, float]:
+    """
+    Compare an extraction result with the reference field by field.
+
+    Both results are formatted as for the document, so every field is a text.
+
+    Returns:
+        Similarity from 0 to 1 for every field of FormattedProjectData
+    """
+    expected = FormattedProjectData.from_project_data(reference).model_dump()
+    actual = FormattedProjectData.from_project_data(candidate).model_dump()
+    return {
+        field: difflib.SequenceMatcher(
+            None, json.dumps(expected[field], ensure_ascii=False),
+            json.dumps(actual[field], ensure_ascii=False),
+        ).ratio()
+        for field in FormattedProjectData.model_fields
+    }
+
+
+def print_budget(mode: str, top: int) -> int:
+    budget = analyze_prompt_budget(get_extraction_schema(mode))
+    print(
+        f"{mode:<8} prompt {budget.prompt_tokens:5d}  schema {budget.schema_tokens:5d}  "
+        f"total {budget.total_tokens:5d} tokens per request"
+    )
+    if top:
+        print(f"  {'field':<52} {'tokens':>6} {'descr.':>6} {'examples':>8}")
+        for cost in sorted(budget.fields, key=lambda cost: -cost.tokens)[:top]:
+            print(
+                f"  {cost.path:<52} {cost.tokens:6d} {cost.description_tokens:6d} "
+                f"{cost.example_tokens:8d}"
+            )
+    return budget.total_tokens
+
+
+def run_live(modes: list[str], examples: list, runs: int) -> None:
+    from extractor import ProjectDataExtractor
+    from llm import init_llm
+
+    llm = init_llm()
+    extractors = {mode: ProjectDataExtractor(llm, schema_mode=mode) for mode in modes}
+    results = {mode: [] for mode in modes}
+    for name, text, reference in examples:
+        for _ in range(runs):
+            for mode in modes:
+                started = time.perf_counter()
+                try:
+                    candidate = extractors[mode].extract_data(text)
+                except ValueError as e:
+                    print(f"{name:<12} {mode:<8} failed: {e.__cause__}")
+                    continue
+                scores = field_scores(reference, candidate)
+                results[mode].append((time.perf_counter() - started, scores))
+                print(
+                    f"{name:<12} {mode:<8} quality {statistics.mean(scores.values()):.3f}  "
+                    f"{time.perf_counter() - started:6.1f} s"
+                )
+
+    print()
+    for mode in modes:
+        if not results[mode]:
+            continue
+        quality = [statistics.mean(scores.values()) for _, scores in results[mode]]
+        print(
+            f"{mode:<8} mean quality {statistics.mean(quality):.3f}  "
+            f"median latency {statistics.median(t for t, _ in results[mode]):6.1f} s  "
+            f"successful runs {len(results[mode])}"
+        )
+    a, b = modes
+    if results[a] and results[b]:
+        for field in FormattedProjectData.model_fields:
+            delta = statistics.mean(s[field] for _, s in results[b]) - statistics.mean(
+                s[field] for _, s in results[a]
+            )
+            if delta < -0.05:
+                print(f"  {field}: {b} is worse than {a} by {-delta:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--a", default="full", choices=SCHEMA_MODES)
+    parser.add_argument("--b", default="compact", choices=SCHEMA_MODES)
+    parser.add_argument("--top", type=int, default=15, help="Most expensive fields to list")
+    parser.add_argument("--live", action="store_true", help="Run extractions with the real LLM")
+    parser.add_argument("--runs", type=int, default=1, help="Live runs per example and mode")
+    args = parser.parse_args()
+
+    modes = [args.a, args.b]
+    totals = {mode: print_budget(mode, args.top if mode == args.a else 0) for mode in modes}
+    print()
+
+    examples = load_examples()
+    print(f"{'example':<12} {args.a + ' tokens':>14} {args.b + ' tokens':>14} {'saved':>7}")
+    for name, text, reference in examples:
+        text_tokens = count_tokens(f"\n\n{text}")
+        a_tokens, b_tokens = totals[args.a] + text_tokens, totals[args.b] + text_tokens
+        print(
+            f"{name:<12} {a_tokens:14d} {b_tokens:14d} {(1 - b_tokens / a_tokens) * 100:6.1f}%"
+        )
+        # Both modes must accept the same results, they only differ in what is sent
+        get_extraction_schema(args.b).model_validate(reference.model_dump())
+
+    if args.live:
+        print()
+        run_live(modes, examples, args.runs)
+    else:
+        print("\nRun with --live to compare the extraction quality with the real LLM.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of DOCX rendering throughput.
+
+Compares parsing the template with DocxTemplate for every document (the previous
+behaviour of ProjectPassportFiller) with the compiled template cache.
+
+Usage:
+    python benchmarks/bench_template_render.py [--documents N] [--template PATH]
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from docxtpl import DocxTemplate  # noqa: E402
+
+from docx_filler import ProjectPassportFiller  # noqa: E402
+from formatted_data import FormattedProjectData  # noqa: E402
+from synthetic import make_project_data  # noqa: E402
+
+DEFAULT_TEMPLATE = Path(__file__).parent.parent / "templates" / "template.docx"
+
+
+def measure(label: str, render, documents: int) -> float:
+    started = time.perf_counter()
+    for _ in range(documents):
+        render()
+    rate = documents / (time.perf_counter() - started)
+    print(f"{label:<35} {rate:8.2f} renders/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--template", default=str(DEFAULT_TEMPLATE))
+    args = parser.parse_args()
+
+    formatted_data = FormattedProjectData.from_project_data(make_project_data())
+    context = formatted_data.model_dump()
+
+    def parse_every_time():
+        template = DocxTemplate(args.template)
+        template.render(context)
+        template.save(io.BytesIO())
+
+    filler = ProjectPassportFiller(args.template)
+
+    before = measure("DocxTemplate per document", parse_every_time, args.documents)
+    after = measure(
+        "compiled template cache",
+        lambda: filler.render_bytes(formatted_data),
+        args.documents,
+    )
+    print(f"speedup: x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Load generator for the passport HTTP API and OpenAI-compatible LLM endpoints.
+
+Sends requests at a target rate for a fixed duration and reports the achieved
+throughput, errors and latency percentiles. The load is open loop: requests are
+started on schedule whether or not the previous ones finished, and latency is
+measured from the scheduled start, so a saturated server shows up as growing
+latency instead of a lower request rate.
+
+Targets:
+    llm - POST /chat/completions with the ProjectData extraction tool, e.g. against
+          the stand-in server (python src/stand_in_server.py) or a real provider
+    api - POST /extract (or /passport) of api_server.py and poll /jobs/{id} until
+          the job is finished
+
+Usage:
+    python benchmarks/load_generator.py llm --url http://127.0.0.1:8001/v1 --rps 20
+    python benchmarks/load_generator.py api --url http://127.0.0.1:8000 --rps 5 --poisson
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: E402
+
+from extraction_models import ProjectData  # noqa: E402
+from extraction_prompt import EXTRACTION_PROMPT  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_texts() -> list[str]:
+    return [path.read_text(encoding="utf-8") for path in sorted(ROOT.glob("input_examples/*.md"))]
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Percentile with linear interpolation between the closest ranks."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * share / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class LoadGenerator:
+    """Sends the requests of one target and collects their outcomes."""
+
+    def __init__(self, args: argparse.Namespace, client: httpx.AsyncClient):
+        self.args = args
+        self.client = client
+        self.texts = load_texts()
+        self.tool = convert_to_openai_tool(ProjectData)
+        self.latencies: list[float] = []
+        self.errors: Counter = Counter()
+
+    async def call_llm(self, text: str) -> None:
+        body = {
+            "model": self.args.model,
+            "messages": [{"role": "user", "content": f"{EXTRACTION_PROMPT}\n\n{text}"}],
+            "tools": [self.tool],
+            "tool_choice": {"type": "function", "function": {"name": ProjectData.__name__}},
+            "temperature": 0.0,
+        }
+        headers = {"Authorization": f"Bearer {self.args.api_key}"}
+        response = await self.client.post(
+            f"{self.args.url.rstrip('/')}/chat/completions", json=body, headers=headers
+        )
+        response.raise_for_status()
+        # A response without a valid tool call counts as an error
+        call = response.json()["choices"][0]["message"]["tool_calls"][0]
+        json.loads(call["function"]["arguments"])
+
+    async def call_api(self, text: str) -> None:
+        url = self.args.url.rstrip("/")
+        response = await self.client.post(
+            f"{url}/{self.args.endpoint}", json={"text_description": text}
+        )
+        response.raise_for_status()
+        job = response.json()
+        while job["status"] not in ("done", "failed"):
+            await asyncio.sleep(self.args.poll_interval)
+            response = await self.client.get(f"{url}/jobs/{job['id']}")
+            response.raise_for_status()
+            job = response.json()
+        if job["status"] == "failed":
+            raise RuntimeError(job["error"])
+
+    async def run_one(self, index: int, scheduled: float) -> None:
+        text = self.texts[index % len(self.texts)]
+        call = self.call_llm if self.args.target == "llm" else self.call_api
+        try:
+            await asyncio.wait_for(call(text), self.args.timeout)
+        except httpx.HTTPStatusError as e:
+            self.errors[f"HTTP {e.response.status_code}"] += 1
+        except Exception as e:
+            self.errors[type(e).__name__] += 1
+        else:
+            self.latencies.append(time.perf_counter() - scheduled)
+
+    async def run(self) -> float:
+        """Send the requests for the duration and wait for them, returns the elapsed time."""
+        generator = random.Random(self.args.seed)
+        start = time.perf_counter()
+        scheduled = start
+        tasks = []
+        index = 0
+        while scheduled - start < self.args.duration:
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            tasks.append(asyncio.create_task(self.run_one(index, scheduled)))
+            index += 1
+            gap = 1 / self.args.rps
+            scheduled += generator.expovariate(1 / gap) if self.args.poisson else gap
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+
+def report(generator: LoadGenerator, sent: int, elapsed: float, duration: float) -> dict:
+    latencies = generator.latencies
+    result = {
+        "sent": sent,
+        "offered_rps": sent / duration,
+        "succeeded": len(latencies),
+        "errors": dict(generator.errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "elapsed": elapsed,
+    }
+    if latencies:
+        result["latency"] = {
+            **{f"p{share}": percentile(latencies, share) for share in PERCENTILES},
+            "mean": statistics.fmean(latencies),
+            "max": max(latencies),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("target", choices=["llm", "api"])
+    parser.add_argument("--url", default=None, help="Base URL, /v1 of the LLM or the API root")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of sending")
+    parser.add_argument(
+        "--poisson", action="store_true", help="Exponential gaps instead of a fixed rate"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0, help="Limit of one request")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool")
+    parser.add_argument("--model", default="stand-in", help="Model name for the llm target")
+    parser.add_argument("--api-key", default="local", help="API key for the llm target")
+    parser.add_argument("--endpoint", default="extract", choices=["extract", "passport"])
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+    if args.url is None:
+        args.url = "http://127.0.0.1:8001/v1" if args.target == "llm" else "http://127.0.0.1:8000"
+
+    async def run() -> dict:
+        limits = httpx.Limits(max_connections=args.connections)
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            generator = LoadGenerator(args, client)
+            elapsed = await generator.run()
+            sent = len(generator.latencies) + sum(generator.errors.values())
+            return report(generator, sent, elapsed, args.duration)
+
+    result = asyncio.run(run())
+    print(
+        f"sent {result['sent']} ({result['offered_rps']:.1f} rps offered), "
+        f"succeeded {result['succeeded']} in {result['elapsed']:.1f}s, "
+        f"throughput {result['throughput_rps']:.1f} rps"
+    )
+    for error, count in sorted(result["errors"].items()):
+        print(f"  {error}: {count}")
+    if "latency" in result:
+        print(" ".join(f"{name}={value * 1000:.0f}ms" for name, value in result["latency"].items()))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Synthetic project data of configurable size for benchmarks."""
+from extraction_models import ProjectData, ProjectStage, ProjectTeam, SMARTResult
+
+
+def make_project_data(index: int = 0, stages: int = 4, results_per_stage: int = 3) -> ProjectData:
+    """
+    Build a ProjectData object with every field filled.
+
+    Args:
+        index: Number mixed into the texts so that objects differ
+        stages: Number of project stages
+        results_per_stage: Number of SMART results in every stage
+
+    Returns:
+        Validated ProjectData
+    """
+    return ProjectData(
+        project_name=f"Национальная платформа мониторинга кибератак №{index}",
+        project_start_order_form="Письменное поручение",
+        project_stakeholders=[
+            "Министерство цифрового развития",
+            "Агентство кибербезопасности",
+            f"Исследовательский центр №{index}",
+        ],
+        project_steering_committee=["Л.Н. Тихонов", "В.П. Громов"],
+        project_team=ProjectTeam(
+            project_initiator="А.В. Смирнов",
+            project_owner="Д.Н. Иванов",
+            project_owner_representative="С.А. Кузнецова",
+            project_leader="Н.С. Васильев",
+            management_team_curator="Ю.Н. Федоров",
+            project_manager="К.А. Орлов",
+            strategy_portfolio_leader="В.П. Громов",
+            strategy_event_leader="Е.А. Зайцева",
+            independent_experts=["Е.В. Михайлова", "И.И. Петров"],
+        ),
+        project_start_date="2024-03-01",
+        project_stages=[
+            ProjectStage(
+                stage_name=f"Этап {stage + 1}: анализ и разработка прототипа",
+                stage_start_date=f"{2024 + stage}-01-01",
+                stage_end_date=f"{2024 + stage}-12-31",
+                smart_results=[
+                    SMARTResult(
+                        specific="Собрать данные о текущих киберугрозах",
+                        measurable="Не указано",
+                        achievable="Поддержка исследовательских центров",
+                        relevant="Соответствует целям проекта",
+                        time_bound=f"До 31 декабря {2024 + stage} года",
+                        result_description=(
+                            f"Результат {result + 1}: собран массив данных о киберугрозах "
+                            f"и определены технические требования к {2024 + stage} году."
+                        ),
+                    )
+                    for result in range(results_per_stage)
+                ],
+            )
+            for stage in range(stages)
+        ],
+        project_goal="Создать платформу мониторинга и предотвращения кибератак.",
+        project_result_vision="Система киберзащиты с центром оперативного реагирования.",
+        project_constraints_exclusions=["Ограничения в финансировании"],
+        project_risks_assumptions=[
+            "Сложность интеграции с существующими системами",
+            "Постоянная эволюция атак",
+        ],
+    )
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from bulk_export import BulkPassportExporter
+from docx_filler import ProjectPassportFiller
+from extraction_models import ProjectData
+from extractor import ProjectDataExtractor
+from formatted_data import FormattedProjectData
+
+DOCX_MIME_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+ZIP_MIME_TYPE = "application/zip"
+
+
+class Job(BaseModel):
+    """
+    State of a submitted extraction or rendering job.
+    """
+
+    id: str
+    kind: Literal["extract", "render", "passport", "bulk"]
+    status: Literal["pending", "running", "done", "failed"] = "pending"
+    created_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    project_data: Optional[ProjectData] = None
+    formatted_data: Optional[FormattedProjectData] = None
+    has_document: bool = False
+    document_format: Optional[Literal["docx", "zip"]] = None
+
+
+class ExtractRequest(BaseModel):
+    text_description: str
+
+
+class RenderRequest(BaseModel):
+    formatted_data: FormattedProjectData
+
+
+class BulkRenderRequest(BaseModel):
+    formatted_data: list[FormattedProjectData]
+    merged: bool = False
+
+
+class JobQueue:
+    """
+    In-process job queue processed by a fixed pool of asyncio workers.
+
+    LLM calls are awaited, so a waiting job holds neither a request nor a thread.
+    Rendering is CPU-bound and runs in the default thread pool.
+    """
+
+    def __init__(self, workers: int = 4, max_jobs: int = 1000, max_pending: int = 100):
+        """
+        Initialize the queue.
+
+        Args:
+            workers: Number of jobs processed concurrently
+            max_jobs: Number of jobs kept for status polling, oldest finished are dropped
+            max_pending: Number of jobs waiting for a worker, new jobs are rejected
+                with 429 while the queue is full
+        """
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.documents: dict[str, bytes] = {}
+        # Bulk exports grow with the batch, so they are kept on disk until evicted
+        self.files: dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers and delete the exported files."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for job_id in list(self.files):
+            self.remove_file(job_id)
+
+    def remove_file(self, job_id: str) -> None:
+        """Delete the exported file of a job, if any."""
+        path = self.files.pop(job_id, None)
+        if path is not None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def submit(self, kind: str, handler: Callable[[Job], Awaitable[None]]) -> Job:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: Kind of the job
+            handler: Coroutine function that fills the job result
+
+        Returns:
+            The pending job
+
+        Raises:
+            HTTPException: 429 if the queue is full
+        """
+        if self._queue.full():
+            raise HTTPException(
+                status_code=429,
+                detail="Too many pending jobs",
+                headers={"Retry-After": "1"},
+            )
+        job = Job(id=uuid.uuid4().hex, kind=kind, created_at=time.time())
+        self.jobs[job.id] = job
+        self._evict()
+        self._queue.put_nowait((job, handler))
+        return job
+
+    def _evict(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ("done", "failed")
+        ]
+        for job_id in finished[: max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+            self.documents.pop(job_id, None)
+            self.remove_file(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job, handler = await self._queue.get()
+            job.status = "running"
+            try:
+                await handler(job)
+                job.status = "done"
+            except Exception as e:
+                logging.error(f"Error processing job {job.id}: {str(e)}", exc_info=True)
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+
+def create_app(
+    extractor: ProjectDataExtractor,
+    filler: ProjectPassportFiller,
+    workers: int = 4,
+    max_jobs: int = 1000,
+    render_processes: Optional[int] = None,
+    max_pending: int = 100,
+) -> FastAPI:
+    """
+    Create the HTTP API.
+
+    Args:
+        extractor: Extractor used for /extract and /passport jobs
+        filler: Filler used for /render and /passport jobs
+        workers: Number of jobs processed concurrently
+        max_jobs: Number of jobs kept for status polling
+        render_processes: Number of processes rendering /render/bulk jobs,
+            None for the number of CPUs
+        max_pending: Number of jobs waiting for a worker before new ones are
+            rejected with 429
+
+    Returns:
+        ASGI application
+    """
+    queue = JobQueue(workers, max_jobs, max_pending)
+    exporter = BulkPassportExporter(filler.template_path, render_processes)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        queue.start()
+        yield
+        await queue.stop()
+        exporter.close()
+
+    app = FastAPI(title="Project passport API", lifespan=lifespan)
+
+    async def render(job: Job, formatted_data: FormattedProjectData) -> None:
+        queue.documents[job.id] = await asyncio.to_thread(
+            filler.render_bytes, formatted_data
+        )
+        job.has_document = True
+        job.document_format = "docx"
+
+    @app.post("/extract", response_model=Job, status_code=202)
+    async def extract(request: ExtractRequest) -> Any:
+        async def handler(job: Job) -> None:
+            job.project_data = await extractor.aextract_data(request.text_description)
+
+        return queue.submit("extract", handler)
+
+    @app.post("/render", response_model=Job, status_code=202)
+    async def render_document(request: RenderRequest) -> Any:
+        async def handler(job: Job) -> None:
+            job.formatted_data = request.formatted_data
+            await render(job, request.formatted_data)
+
+        return queue.submit("render", handler)
+
+    @app.post("/passport", response_model=Job, status_code=202)
+    async def passport(request: ExtractRequest) -> Any:
+        async def handler(job: Job) -> None:
+            job.project_data = await extractor.aextract_data(request.text_description)
+            job.formatted_data = FormattedProjectData.from_project_data(
+                job.project_data
+            )
+            await render(job, job.formatted_data)
+
+        return queue.submit("passport", handler)
+
+    @app.post("/render/bulk", response_model=Job, status_code=202)
+    async def render_bulk(request: BulkRenderRequest) -> Any:
+        async def handler(job: Job) -> None:
+            export = exporter.export_merged if request.merged else exporter.export_zip
+            document_format = "docx" if request.merged else "zip"
+            descriptor, path = tempfile.mkstemp(
+                prefix="passports_", suffix=f".{document_format}"
+            )
+            os.close(descriptor)
+            queue.files[job.id] = path
+            try:
+                await asyncio.to_thread(export, request.formatted_data, path)
+            except Exception:
+                queue.remove_file(job.id)
+                raise
+            job.has_document = True
+            job.document_format = document_format
+
+        return queue.submit("bulk", handler)
+
+    @app.get("/jobs/{job_id}", response_model=Job)
+    async def get_job(job_id: str) -> Any:
+        job = queue.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+
+    @app.get("/jobs/{job_id}/document")
+    async def get_document(job_id: str) -> Response:
+        job = queue.jobs.get(job_id)
+        if job is None or not job.has_document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        if job.document_format == "zip":
+            media_type, file_name = ZIP_MIME_TYPE, "project_passports.zip"
+        else:
+            media_type, file_name = DOCX_MIME_TYPE, "project_passport.docx"
+        if job_id in queue.files:
+            return FileResponse(
+                queue.files[job_id], media_type=media_type, filename=file_name
+            )
+        document = queue.documents[job_id]
+        return Response(
+            content=document,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+        )
+
+    return app
@@ -0,0 +1,61 @@
+import argparse
+
+import uvicorn
+
+from settings import settings
+from api import create_app
+from docx_filler import ProjectPassportFiller
+from extraction_cache import create_extraction_cache
+from llm import get_extractor
+from logger import setup_logging
+from metrics import configure_metrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the project passport HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent jobs")
+    parser.add_argument(
+        "--max-jobs", type=int, default=1000, help="Jobs kept for status polling"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=100,
+        help="Jobs waiting for a worker, more are rejected with 429",
+    )
+    parser.add_argument(
+        "--render-processes",
+        type=int,
+        default=None,
+        help="Processes rendering bulk exports, defaults to the number of CPUs",
+    )
+    return parser.parse_args()
+
+
+def main():
+    setup_logging()
+    args = parse_args()
+    if settings.metrics_enabled:
+        configure_metrics(settings.metrics_log_path, settings.metrics_port)
+
+    cache = create_extraction_cache(
+        settings.extraction_cache_backend,
+        settings.extraction_cache_path,
+        settings.extraction_cache_max_size,
+        settings.extraction_cache_ttl,
+    )
+    app = create_app(
+        get_extractor(cache),
+        ProjectPassportFiller(settings.template_path),
+        workers=args.workers,
+        max_jobs=args.max_jobs,
+        render_processes=args.render_processes,
+        max_pending=args.max_pending,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,211 @@
 from settings import settings
-from extractor import ProjectDataExtractor
+from extraction_cache import create_extraction_cache
+from chunked_extractor import ChunkedProjectDataExtractor
 from docx_filler import ProjectPassportFiller
+from extraction_models import ProjectData
+from form_spec import FORM_SPEC, FormField, form_values, missing_fields, parse_form
 from formatted_data import FormattedProjectData
-from langchain_groq import ChatGroq
+from incremental_extractor import keep_manual_edits
+from llm import get_extractor, get_incremental_extractor, get_two_phase_extractor
 from logger import setup_logging
+from metrics import configure_metrics
+from near_duplicates import NearDuplicateIndex
+from pdf_export import create_pdf_converter
+from project_store import ProjectStore, StoredPassport
+from itertools import groupby
+from typing import Optional
 import streamlit as st
-import os
-import tempfile
 import logging
 
 
-def init_llm():
-    """Initialize LLM model."""
-    return ChatGroq(
-        api_key=settings.openai_api_key,
-        model_name=settings.openai_model,
-        temperature=settings.openai_temperature,
+@st.cache_resource
+def get_extraction_cache():
+    """Create the extraction cache once per process."""
+    return create_extraction_cache(
+        settings.extraction_cache_backend,
+        settings.extraction_cache_path,
+        settings.extraction_cache_max_size,
+        settings.extraction_cache_ttl,
     )
 
 
+@st.cache_resource
+def get_pdf_converter():
+    """Start the PDF converter workers once per process, None if PDF export is off."""
+    return create_pdf_converter(
+        settings.pdf_export_backend,
+        settings.pdf_export_workers,
+        settings.pdf_soffice_path,
+        settings.pdf_font_path,
+    )
+
+
+@st.cache_resource
+def get_project_store():
+    """Open the passport store once per process, None if it is disabled."""
+    if not settings.project_store_enabled:
+        return None
+    return ProjectStore(settings.project_store_path)
+
+
+@st.cache_resource
+def get_duplicate_index():
+    """Index the stored descriptions once per process, None if the lookup is disabled."""
+    store = get_project_store()
+    if store is None or settings.near_duplicate_threshold is None:
+        return None
+    index = NearDuplicateIndex()
+    for project_id, source_text in store.sources():
+        index.add(project_id, source_text)
+    return index
+
+
+@st.cache_resource
+def init_metrics():
+    """Enable instrumentation once per process if it is turned on in settings."""
+    if settings.metrics_enabled:
+        configure_metrics(settings.metrics_log_path, settings.metrics_port)
+
+
+PARTIAL_FIELD_LABELS = {
+    "project_name": "Название проекта",
+    "project_start_order_form": "Поручение о старте проекта",
+    "project_stakeholders": "Заинтересованные стороны",
+    "project_steering_committee": "Состав УКП",
+    "project_start_date": "Дата начала проекта",
+    "project_stages": "Этапы",
+    "project_goal": "Цель проекта",
+    "project_result_vision": "Образ результата",
+    "project_constraints_exclusions": "Ограничения и исключения",
+    "project_risks_assumptions": "Риски и допущения",
+}
+
+
+def render_partial_data(placeholder, partial: dict):
+    """Show the fields extracted so far while the model is still generating."""
+    with placeholder.container():
+        for field, label in PARTIAL_FIELD_LABELS.items():
+            value = partial.get(field)
+            if field == "project_stages" and value:
+                value = [
+                    stage["stage_name"]
+                    for stage in value
+                    if isinstance(stage, dict) and stage.get("stage_name")
+                ]
+            if not value:
+                continue
+            if isinstance(value, list):
+                value = "\n".join(f"- {item}" for item in value)
+            st.markdown(f"**{label}**\n\n{value}")
+
+
+def render_form_fields(spec: list[FormField], values: dict[str, str]) -> dict[str, str]:
+    """Show a widget for every form field, with grouped fields in expanders."""
+    submitted = {}
+    for group, fields in groupby(spec, key=lambda field: field.group):
+        with st.expander(group) if group else st.container():
+            for field in fields:
+                label = f"{field.label} *" if field.required else field.label
+                if field.multiline:
+                    submitted[field.name] = st.text_area(
+                        label,
+                        values[field.name],
+                        height=field.height,
+                        placeholder=field.placeholder,
+                    )
+                else:
+                    submitted[field.name] = st.text_input(
+                        label, values[field.name], placeholder=field.placeholder
+                    )
+    return submitted
+
+
+def open_passport(stored: StoredPassport) -> None:
+    """Make a saved passport the current one, for editing and generation."""
+    st.session_state.formatted_data = stored.formatted_data
+    st.session_state.project_data = stored.project_data
+    st.session_state.project_id = stored.project_id
+    st.session_state.source_text = stored.source_text
+    st.session_state.similar_project_id = None
+    st.session_state.pending_description = None
+
+
+def extract_full(text_description: str) -> ProjectData:
+    """Extract the passport data from scratch in the configured mode."""
+    if settings.extraction_mode == "two_phase":
+        # Stage results are generated concurrently after the outline
+        return get_two_phase_extractor().extract_data(text_description)
+    if len(text_description) > settings.extraction_chunk_size:
+        # Long descriptions are extracted by chunks in parallel
+        return ChunkedProjectDataExtractor(
+            get_extractor(get_extraction_cache()),
+            settings.extraction_chunk_size,
+            settings.extraction_chunk_overlap,
+            settings.extraction_max_workers,
+        ).extract_data(text_description)
+    # Show the fields as soon as the model generates them
+    preview = st.empty()
+    project_data = get_extractor(get_extraction_cache()).extract_data_streaming(
+        text_description,
+        lambda partial: render_partial_data(preview, partial),
+    )
+    preview.empty()
+    return project_data
+
+
+def make_current(
+    store: Optional[ProjectStore],
+    text_description: str,
+    project_data: ProjectData,
+    formatted_data: FormattedProjectData,
+) -> None:
+    """Make an extraction result the current passport and keep it in the archive."""
+    st.session_state.formatted_data = formatted_data
+    st.session_state.project_data = project_data
+    st.session_state.source_text = text_description
+    if store is not None:
+        # Keep the result so it can be found later without the LLM
+        st.session_state.project_id = store.save(
+            formatted_data,
+            project_data,
+            text_description,
+            st.session_state.project_id,
+        ).project_id
+        duplicates = get_duplicate_index()
+        if duplicates is not None:
+            duplicates.add(st.session_state.project_id, text_description)
+
+
+def render_archive(store: ProjectStore) -> None:
+    """Show the search over saved passports in the sidebar."""
+    with st.sidebar:
+        st.header("Архив паспортов")
+        query = st.text_input("Поиск", placeholder="Название, ФИО, дата, этап")
+        for result in store.search(query):
+            label = f"{result.project_name} (версия {result.version})"
+            if st.button(label, key=f"archive_{result.project_id}"):
+                open_passport(store.get(result.project_id))
+            if result.snippet:
+                st.caption(result.snippet)
+
+
 def main():
     setup_logging()
+    init_metrics()
     st.title("Генератор паспорта проекта")
 
     if "formatted_data" not in st.session_state:
         st.session_state.formatted_data = None
+        st.session_state.project_data = None
+        st.session_state.project_id = None
+        st.session_state.source_text = None
+        st.session_state.similar_project_id = None
+        st.session_state.similarity = None
+        st.session_state.pending_description = None
+
+    store = get_project_store()
+    if store is not None:
+        render_archive(store)
 
     # Text input for project description
     text_description = st.text_area(
@@ -37,229 +218,179 @@ def main():
     if st.button("Обработать"):
         with st.spinner("Обрабатываем описание проекта..."):
             try:
-                # Initialize extractor and process description
-                llm = init_llm()
-                extractor = ProjectDataExtractor(llm)
-                project_data = extractor.extract_data(text_description)
-
-                # Format extracted data
-                st.session_state.formatted_data = (
-                    FormattedProjectData.from_project_data(project_data)
+                previous_data = st.session_state.project_data
+                edited_data = st.session_state.formatted_data
+                st.session_state.similar_project_id = None
+                st.session_state.pending_description = None
+                project_data = None
+                if (
+                    settings.incremental_extraction
+                    and previous_data is not None
+                    and st.session_state.source_text
+                ):
+                    # Only the sections touched by the edit are extracted again
+                    project_data = get_incremental_extractor().extract_update(
+                        st.session_state.source_text, previous_data, text_description
+                    )
+                updated = project_data is not None
+
+                duplicates = get_duplicate_index()
+                match = (
+                    duplicates.find(text_description, settings.near_duplicate_threshold)
+                    if project_data is None and duplicates is not None
+                    else None
                 )
-                st.success("Данные успешно извлечены!")
+                similar = store.get(match.key) if match is not None else None
+                if similar is not None:
+                    # The new result is saved as a separate project and never as
+                    # a version of the match
+                    st.session_state.similar_project_id = similar.project_id
+                    st.session_state.similarity = match.similarity
+                    if (
+                        settings.incremental_extraction
+                        and similar.project_data
+                        and similar.source_text
+                    ):
+                        # Only the sections that differ from the stored description
+                        # are extracted
+                        project_data = get_incremental_extractor().extract_update(
+                            similar.source_text, similar.project_data, text_description
+                        )
+                    if project_data is None:
+                        # Without a warm start the stored passport is offered before
+                        # paying for a full extraction of almost the same text
+                        st.session_state.pending_description = text_description
+                    else:
+                        st.info(
+                            f"Найден похожий паспорт «{similar.formatted_data.project_name}» "
+                            f"(сходство {match.similarity:.0%}), результат сохранён как новый проект"
+                        )
+
+                if st.session_state.pending_description is None:
+                    if project_data is None:
+                        project_data = extract_full(text_description)
+
+                    # Format extracted data
+                    formatted_data = FormattedProjectData.from_project_data(project_data)
+                    if updated:
+                        # Fields edited by hand are kept over the new extraction
+                        formatted_data = keep_manual_edits(
+                            FormattedProjectData.from_project_data(previous_data),
+                            edited_data,
+                            formatted_data,
+                        )
+                    else:
+                        # A full extraction or a start from a similar passport is a new project
+                        st.session_state.project_id = None
+                    make_current(store, text_description, project_data, formatted_data)
+                    st.success("Данные успешно извлечены!")
             except Exception as e:
                 logging.error(f"Error processing description: {str(e)}", exc_info=True)
                 st.error(f"Ошибка при обработке")
                 return
 
+    similar_project_id = st.session_state.similar_project_id
+    similar = (
+        store.get(similar_project_id)
+        if store is not None and similar_project_id is not None
+        else None
+    )
+    pending_description = st.session_state.pending_description
+    if similar is not None and pending_description is not None:
+        st.info(
+            f"Найден похожий паспорт «{similar.formatted_data.project_name}» "
+            f"(сходство {st.session_state.similarity:.0%}). Откройте его или извлеките "
+            "данные заново, результат будет сохранён как новый проект"
+        )
+        open_column, extract_column = st.columns(2)
+        if open_column.button("Открыть сохранённый"):
+            open_passport(similar)
+        elif extract_column.button("Извлечь заново"):
+            with st.spinner("Обрабатываем описание проекта..."):
+                try:
+                    project_data = extract_full(pending_description)
+                    st.session_state.project_id = None
+                    make_current(
+                        store,
+                        pending_description,
+                        project_data,
+                        FormattedProjectData.from_project_data(project_data),
+                    )
+                    st.session_state.pending_description = None
+                    st.success("Данные успешно извлечены!")
+                except Exception as e:
+                    logging.error(f"Error processing description: {str(e)}", exc_info=True)
+                    st.error(f"Ошибка при обработке")
+                    return
+    elif similar is not None and st.button(
+        f"Открыть сохранённый паспорт «{similar.formatted_data.project_name}»"
+    ):
+        open_passport(similar)
+
     # Show editable fields if data is extracted
     if st.session_state.formatted_data:
         st.subheader("Проверьте и отредактируйте данные")
 
         formatted_data = st.session_state.formatted_data
 
-        any_empty_field = False
-
-        formatted_data.project_name = st.text_input(
-            "Название проекта *",
-            formatted_data.project_name,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_name:
-            any_empty_field = True
-
-        formatted_data.project_start_order_form = st.text_input(
-            "Поручение о старте проекта *",
-            formatted_data.project_start_order_form,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_start_order_form:
-            any_empty_field = True
-
-        formatted_data.project_goal = st.text_area(
-            "Цель проекта *",
-            formatted_data.project_goal,
-            height=100,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_goal:
-            any_empty_field = True
-
-        formatted_data.project_result_vision = st.text_area(
-            "Образ результата *",
-            formatted_data.project_result_vision,
-            height=100,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_result_vision:
-            any_empty_field = True
-
-        formatted_data.project_constraints_exclusions = st.text_area(
-            "Ограничения и исключения (каждое с новой строки) *",
-            formatted_data.project_constraints_exclusions,
-            height=100,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_constraints_exclusions:
-            any_empty_field = True
-
-        formatted_data.project_risks_assumptions = st.text_area(
-            "Риски и допущения (каждое с новой строки) *",
-            formatted_data.project_risks_assumptions,
-            height=100,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_risks_assumptions:
-            any_empty_field = True
-
-        formatted_data.project_stakeholders = st.text_area(
-            "Заинтересованные стороны (каждая с новой строки) *",
-            formatted_data.project_stakeholders,
-            height=100,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_stakeholders:
-            any_empty_field = True
-
-        formatted_data.project_start_date = st.text_input(
-            "Дата начала проекта *",
-            formatted_data.project_start_date,
-            placeholder="ДД.ММ.ГГГГ",
-        )
-        if not formatted_data.project_start_date:
-            any_empty_field = True
-
-        formatted_data.project_end_date = st.text_area(
-            "Даты окончания этапов *",
-            formatted_data.project_end_date,
-            height=100,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_end_date:
-            any_empty_field = True
-
-        formatted_data.project_stages_results = st.text_area(
-            "Этапы и результаты *",
-            formatted_data.project_stages_results,
-            height=200,
-            placeholder="Обязательное поле",
-        )
-        if not formatted_data.project_stages_results:
-            any_empty_field = True
-
-        with st.expander("Команда проекта"):
-            formatted_data.project_initiator = st.text_input(
-                "Инициатор проекта *",
-                formatted_data.project_initiator,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.project_initiator:
-                any_empty_field = True
-
-            formatted_data.project_owner = st.text_input(
-                "Владелец проекта *",
-                formatted_data.project_owner,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.project_owner:
-                any_empty_field = True
-
-            formatted_data.project_owner_representative = st.text_input(
-                "Представитель владельца проекта *",
-                formatted_data.project_owner_representative,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.project_owner_representative:
-                any_empty_field = True
-
-            formatted_data.project_leader = st.text_input(
-                "Руководитель проекта *",
-                formatted_data.project_leader,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.project_leader:
-                any_empty_field = True
-
-            formatted_data.management_team_curator = st.text_input(
-                "Куратор команды управления *",
-                formatted_data.management_team_curator,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.management_team_curator:
-                any_empty_field = True
-
-            formatted_data.project_manager = st.text_input(
-                "Менеджер проекта *",
-                formatted_data.project_manager,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.project_manager:
-                any_empty_field = True
-
-            formatted_data.strategy_portfolio_leader = st.text_input(
-                "Руководитель портфеля мероприятий Стратегии *",
-                formatted_data.strategy_portfolio_leader,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.strategy_portfolio_leader:
-                any_empty_field = True
-
-            formatted_data.strategy_event_leader = st.text_input(
-                "Руководитель мероприятия Стратегии *",
-                formatted_data.strategy_event_leader,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.strategy_event_leader:
-                any_empty_field = True
-
-            experts_text = st.text_area(
-                "Независимые эксперты (каждый с новой строки)",
-                "\n".join(formatted_data.independent_experts),
-                height=100,
-                placeholder="Необязательное поле",
-            )
-            formatted_data.independent_experts = [
-                e.strip() for e in experts_text.split("\n") if e.strip()
-            ]
-
-            formatted_data.project_steering_committee = st.text_area(
-                "Состав УКП (каждый с новой строки) *",
-                formatted_data.project_steering_committee,
-                height=100,
-                placeholder="Обязательное поле",
-            )
-            if not formatted_data.project_steering_committee:
-                any_empty_field = True
+        # Widgets inside the form do not rerun the script while the user types,
+        # the values are sent and validated once on submit
+        with st.form("passport_form"):
+            values = render_form_fields(FORM_SPEC, form_values(FORM_SPEC, formatted_data))
+            save = st.form_submit_button("Сохранить изменения")
+            generate = st.form_submit_button("Сгенерировать документ", type="primary")
+
+        if save or generate:
+            formatted_data = formatted_data.model_copy(update=parse_form(FORM_SPEC, values))
+            st.session_state.formatted_data = formatted_data
+
+            missing = missing_fields(FORM_SPEC, values)
+            if missing:
+                labels = ", ".join(field.label for field in missing)
+                if generate:
+                    st.error(
+                        "Пожалуйста, заполните все обязательные поля перед генерацией "
+                        f"документа: {labels}"
+                    )
+                    return
+                st.warning(f"Не заполнены обязательные поля: {labels}")
 
         # Generate document button
-        if st.button("Сгенерировать документ"):
-            if any_empty_field:
-                st.error(
-                    "Пожалуйста, заполните все обязательные поля перед генерацией документа"
-                )
-                return
-
+        if generate:
             with st.spinner("Генерируем паспорт проекта..."):
                 try:
-                    # Create temporary file for template
-                    with tempfile.NamedTemporaryFile(
-                        suffix=".docx", delete=False
-                    ) as tmp_file:
-                        # Initialize filler with template
-                        filler = ProjectPassportFiller(settings.template_path)
-
-                        # Fill template and save
-                        filler.fill_template(formatted_data, tmp_file.name)
-
-                        # Provide download button
-                        with open(tmp_file.name, "rb") as file:
-                            st.download_button(
-                                label="Скачать паспорт проекта",
-                                data=file,
-                                file_name="project_passport.docx",
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                            )
-                        os.remove(tmp_file.name)
+                    # Render document in memory
+                    filler = ProjectPassportFiller(settings.template_path)
+                    document = filler.render_bytes(formatted_data)
+
+                    # Provide download button
+                    st.download_button(
+                        label="Скачать паспорт проекта",
+                        data=document,
+                        file_name="project_passport.docx",
+                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    )
+
+                    if store is not None:
+                        # Save the edited data as a new version if anything changed
+                        project_id = st.session_state.project_id
+                        stored = store.get(project_id) if project_id else None
+                        if stored is None or stored.formatted_data != formatted_data:
+                            st.session_state.project_id = store.save(
+                                formatted_data,
+                                st.session_state.project_data,
+                                st.session_state.source_text,
+                                project_id,
+                            ).project_id
+
+                    converter = get_pdf_converter()
+                    if converter is not None:
+                        st.download_button(
+                            label="Скачать паспорт проекта в PDF",
+                            data=converter.convert(document),
+                            file_name="project_passport.pdf",
+                            mime="application/pdf",
+                        )
                 except Exception as e:
                     logging.error(f"Error generating document: {str(e)}", exc_info=True)
                     st.error(f"Ошибка при генерации документа")
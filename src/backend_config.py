@@ -0,0 +1,16 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+
+class BackendConfig(BaseModel):
+    """
+    Settings of one LLM provider/model the extraction requests can be routed to.
+    """
+
+    name: str
+    provider: Literal["groq", "openai"] = "groq"
+    model: str
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    temperature: Optional[float] = None
+    max_concurrency: int = 8
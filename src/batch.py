@@ -0,0 +1,234 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+from chunked_extractor import ChunkedProjectDataExtractor
+from docx_filler import ProjectPassportFiller
+from extraction_models import ProjectData
+from extractor import ProjectDataExtractor
+from formatted_data import FormattedProjectData
+from packed_extractor import PackedProjectDataExtractor
+from pdf_export import BasePdfConverter
+from two_phase_extractor import TwoPhaseProjectDataExtractor
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to at most `rate` per second.
+    """
+
+    def __init__(self, rate: Optional[float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Maximum number of calls per second, None disables limiting
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Block until the next call is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BatchItemResult(BaseModel):
+    """
+    Outcome of processing a single description.
+    """
+
+    source: str
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchReport(BaseModel):
+    """
+    Per-item report for a batch run.
+    """
+
+    results: list[BatchItemResult]
+    duration: float = 0.0
+
+    @property
+    def succeeded(self) -> list[BatchItemResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[BatchItemResult]:
+        return [result for result in self.results if not result.ok]
+
+
+class BatchPassportGenerator:
+    """
+    Class for generating project passports for many descriptions without the UI.
+    """
+
+    def __init__(
+        self,
+        extractor: Union[
+            ProjectDataExtractor,
+            ChunkedProjectDataExtractor,
+            TwoPhaseProjectDataExtractor,
+        ],
+        template_path: str,
+        max_workers: int = 4,
+        requests_per_second: Optional[float] = None,
+        pdf_converter: Optional[BasePdfConverter] = None,
+        packer: Optional[PackedProjectDataExtractor] = None,
+    ):
+        """
+        Initialize the batch generator.
+
+        Args:
+            extractor: Extractor used for every description
+            template_path: Path to the .docx template file with placeholders
+            max_workers: Maximum number of descriptions processed concurrently
+            requests_per_second: Maximum rate of LLM calls, None disables limiting
+            pdf_converter: Converter used to save a PDF next to every document,
+                None saves only .docx files
+            packer: Extractor that handles short descriptions in groups with one
+                LLM call per group, None extracts every description alone
+        """
+        self.extractor = extractor
+        self.filler = ProjectPassportFiller(template_path)
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.pdf_converter = pdf_converter
+        self.packer = packer
+
+    def process_item(
+        self,
+        source: str,
+        text_description: str,
+        output_path: str,
+        project_data: Optional[ProjectData] = None,
+    ) -> BatchItemResult:
+        """
+        Extract, format and render a single description.
+
+        Args:
+            source: Name of the description used in the report
+            text_description: Text description of the project
+            output_path: Path where to save the filled document
+            project_data: Data already extracted in a packed request, None to
+                extract the description alone
+
+        Returns:
+            BatchItemResult with the output path or the error message
+        """
+        started = time.perf_counter()
+        try:
+            if project_data is None:
+                self.rate_limiter.acquire()
+                project_data = self.extractor.extract_data(text_description)
+            formatted_data = FormattedProjectData.from_project_data(project_data)
+            if self.pdf_converter is None:
+                self.filler.fill_template(formatted_data, output_path)
+            else:
+                # The rendered bytes are written and converted without reading the file back
+                document = self.filler.render_bytes(formatted_data)
+                Path(output_path).write_bytes(document)
+                Path(output_path).with_suffix(".pdf").write_bytes(
+                    self.pdf_converter.convert(document)
+                )
+            return BatchItemResult(
+                source=source,
+                output_path=output_path,
+                duration=time.perf_counter() - started,
+            )
+        except Exception as e:
+            logging.error(f"Error processing {source}: {str(e)}", exc_info=True)
+            return BatchItemResult(
+                source=source,
+                error=str(e),
+                duration=time.perf_counter() - started,
+            )
+
+    def run(self, items: list[tuple[str, str]], output_dir: str) -> BatchReport:
+        """
+        Process many descriptions concurrently.
+
+        Args:
+            items: Pairs of (source name, text description)
+            output_dir: Directory where the filled documents are saved
+
+        Returns:
+            BatchReport with one result per item, in input order
+        """
+        output_root = Path(output_dir)
+        output_root.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            extracted = self._extract_packed(executor, [text for _, text in items])
+            futures = [
+                executor.submit(
+                    self.process_item,
+                    source,
+                    text_description,
+                    str(output_root / f"{Path(source).stem}.docx"),
+                    project_data,
+                )
+                for (source, text_description), project_data in zip(items, extracted)
+            ]
+            results = [future.result() for future in futures]
+
+        return BatchReport(results=results, duration=time.perf_counter() - started)
+
+    def _extract_packed(
+        self, executor: ThreadPoolExecutor, texts: list[str]
+    ) -> list[Optional[ProjectData]]:
+        """Extract the short descriptions in groups, None for the rest."""
+        extracted: list[Optional[ProjectData]] = [None] * len(texts)
+        if self.packer is None:
+            return extracted
+
+        def extract_group(group: list[int]) -> list[Optional[ProjectData]]:
+            self.rate_limiter.acquire()
+            return self.packer.extract_group([texts[index] for index in group])
+
+        groups = self.packer.pack(texts)
+        for group, results in zip(groups, executor.map(extract_group, groups)):
+            for index, project_data in zip(group, results):
+                extracted[index] = project_data
+        return extracted
+
+    def run_directory(
+        self, input_dir: str, output_dir: str, pattern: str = "*.md"
+    ) -> BatchReport:
+        """
+        Process every description file in a directory.
+
+        Args:
+            input_dir: Directory with text descriptions
+            output_dir: Directory where the filled documents are saved
+            pattern: Glob pattern for description files
+
+        Returns:
+            BatchReport with one result per file
+        """
+        items = [
+            (path.name, path.read_text(encoding="utf-8"))
+            for path in sorted(Path(input_dir).glob(pattern))
+        ]
+        return self.run(items, output_dir)
@@ -0,0 +1,105 @@
+import argparse
+import logging
+from pathlib import Path
+
+from settings import settings
+from extraction_cache import create_extraction_cache
+from batch import BatchPassportGenerator
+from chunked_extractor import ChunkedProjectDataExtractor
+from llm import get_extractor, get_two_phase_extractor
+from logger import setup_logging
+from metrics import configure_metrics
+from packed_extractor import PackedProjectDataExtractor
+from pdf_export import create_pdf_converter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate project passports for a directory of descriptions"
+    )
+    parser.add_argument("input_dir", help="Directory with text descriptions")
+    parser.add_argument("output_dir", help="Directory for generated documents")
+    parser.add_argument("--pattern", default="*.md", help="Glob for description files")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent extractions")
+    parser.add_argument(
+        "--rps", type=float, default=None, help="Maximum LLM requests per second"
+    )
+    parser.add_argument(
+        "--report", default=None, help="Path of the JSON report (default: output_dir/report.json)"
+    )
+    parser.add_argument(
+        "--pdf", action="store_true", help="Also save every passport as PDF"
+    )
+    parser.add_argument(
+        "--pack",
+        action="store_true",
+        help="Extract short descriptions in groups, one LLM request per group",
+    )
+    return parser.parse_args()
+
+
+def main():
+    setup_logging()
+    args = parse_args()
+    if settings.metrics_enabled:
+        configure_metrics(settings.metrics_log_path, settings.metrics_port)
+
+    cache = create_extraction_cache(
+        settings.extraction_cache_backend,
+        settings.extraction_cache_path,
+        settings.extraction_cache_max_size,
+        settings.extraction_cache_ttl,
+    )
+    if settings.extraction_mode == "two_phase":
+        extractor = get_two_phase_extractor()
+    else:
+        extractor = ChunkedProjectDataExtractor(
+            get_extractor(cache),
+            settings.extraction_chunk_size,
+            settings.extraction_chunk_overlap,
+            settings.extraction_max_workers,
+        )
+    packer = None
+    if args.pack or settings.batch_packing:
+        packer = PackedProjectDataExtractor(
+            get_extractor(cache),
+            settings.batch_pack_max_chars,
+            settings.batch_pack_max_group_chars,
+            settings.batch_pack_max_items,
+        )
+    pdf_converter = None
+    if args.pdf:
+        backend = settings.pdf_export_backend
+        pdf_converter = create_pdf_converter(
+            "auto" if backend == "none" else backend,
+            settings.pdf_export_workers,
+            settings.pdf_soffice_path,
+            settings.pdf_font_path,
+        )
+    generator = BatchPassportGenerator(
+        extractor,
+        settings.template_path,
+        max_workers=args.workers,
+        requests_per_second=args.rps,
+        pdf_converter=pdf_converter,
+        packer=packer,
+    )
+    try:
+        report = generator.run_directory(args.input_dir, args.output_dir, args.pattern)
+    finally:
+        if pdf_converter is not None:
+            pdf_converter.close()
+
+    report_path = Path(args.report or Path(args.output_dir) / "report.json")
+    report_path.write_text(report.model_dump_json(indent=2), encoding="utf-8")
+
+    logging.info(
+        f"Processed {len(report.results)} descriptions in {report.duration:.1f}s: "
+        f"{len(report.succeeded)} succeeded, {len(report.failed)} failed"
+    )
+    for result in report.failed:
+        logging.info(f"{result.source}: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
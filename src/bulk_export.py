@@ -0,0 +1,192 @@
+import io
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from docx import Document
+from docxcompose.composer import Composer
+
+from formatted_data import FormattedProjectData
+from metrics import increment, timed
+from template_cache import CompiledDocxTemplate, get_compiled_template
+
+# Template of the worker process, compiled once by the pool initializer
+_worker_template: Optional[CompiledDocxTemplate] = None
+
+
+def _init_worker(template_path: str) -> None:
+    global _worker_template
+    # With the fork start method the parent's compiled template is inherited and
+    # get_compiled_template returns it without parsing the file again
+    _worker_template = get_compiled_template(template_path)
+
+
+def _render_document(context: dict) -> bytes:
+    buffer = io.BytesIO()
+    _worker_template.render(context).save(buffer)
+    return buffer.getvalue()
+
+
+def passport_file_name(index: int, formatted_data: FormattedProjectData) -> str:
+    """
+    Build a unique file name for a passport in an archive.
+
+    Args:
+        index: Position of the passport in the export
+        formatted_data: Formatted project data
+
+    Returns:
+        File name like "001_Project_name.docx"
+    """
+    name = re.sub(r'[\\/:*?"<>|\s]+', "_", formatted_data.project_name).strip("_.")
+    return f"{index:03d}_{name[:80] or 'passport'}.docx"
+
+
+class BulkPassportExporter:
+    """
+    Class for rendering passports of a whole portfolio into one ZIP archive or one DOCX.
+
+    Documents are rendered in a process pool whose workers share the compiled template,
+    and only a bounded number of rendered documents is kept in memory: each one is
+    written to the output as soon as all documents before it are done.
+    """
+
+    def __init__(
+        self,
+        template_path: str,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Initialize the exporter.
+
+        The process pool is started on the first export and reused until `close`.
+
+        Args:
+            template_path: Path to the .docx template file with placeholders
+            max_workers: Number of rendering processes, None for the number of CPUs
+            max_pending: Maximum number of documents rendered ahead of the output,
+                None for twice the number of workers
+        """
+        self.template_path = template_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Compile in the parent before the workers are forked, so they inherit it
+        get_compiled_template(template_path)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.template_path,),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the rendering processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "BulkPassportExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def render_documents(
+        self, items: Iterable[FormattedProjectData]
+    ) -> Iterator[tuple[FormattedProjectData, bytes]]:
+        """
+        Render passports in the process pool.
+
+        Args:
+            items: Formatted project data, may be a lazy iterable
+
+        Yields:
+            Pairs of the formatted data and the content of its filled .docx document,
+            in input order
+        """
+        executor = self._get_executor()
+        pending: deque[tuple[FormattedProjectData, Future]] = deque()
+        try:
+            for formatted_data in items:
+                future = executor.submit(_render_document, formatted_data.model_dump())
+                pending.append((formatted_data, future))
+                if len(pending) >= self.max_pending:
+                    formatted_data, future = pending.popleft()
+                    yield formatted_data, future.result()
+            while pending:
+                formatted_data, future = pending.popleft()
+                yield formatted_data, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @timed("bulk_export")
+    def export_zip(
+        self,
+        items: Iterable[FormattedProjectData],
+        output: Union[str, IO[bytes]],
+    ) -> int:
+        """
+        Render passports into a ZIP archive with one .docx per project.
+
+        Args:
+            items: Formatted project data, may be a lazy iterable
+            output: Path or binary file object where to write the archive
+
+        Returns:
+            Number of passports in the archive
+        """
+        count = 0
+        # .docx files are already deflated, compressing them again only costs time
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+            for formatted_data, document in self.render_documents(items):
+                count += 1
+                archive.writestr(passport_file_name(count, formatted_data), document)
+        increment("bulk_exported_documents", count, format="zip")
+        return count
+
+    @timed("bulk_export")
+    def export_merged(
+        self,
+        items: Iterable[FormattedProjectData],
+        output: Union[str, IO[bytes]],
+    ) -> int:
+        """
+        Render passports into a single .docx with every passport on a new page.
+
+        Unlike the ZIP export, the merged document itself grows with the number of
+        passports and is kept in memory until it is saved.
+
+        Args:
+            items: Formatted project data, may be a lazy iterable
+            output: Path or binary file object where to save the document
+
+        Returns:
+            Number of passports in the document
+
+        Raises:
+            ValueError: If there are no passports to export
+        """
+        composer = None
+        count = 0
+        for _, document in self.render_documents(items):
+            passport = Document(io.BytesIO(document))
+            if composer is None:
+                composer = Composer(passport)
+            else:
+                composer.doc.add_page_break()
+                composer.append(passport)
+            count += 1
+        if composer is None:
+            raise ValueError("No passports to export")
+        composer.save(output)
+        increment("bulk_exported_documents", count, format="docx")
+        return count
@@ -0,0 +1,212 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from extraction_models import ProjectData, ProjectStage, ProjectTeam
+from extractor import ProjectDataExtractor
+
+NOT_SPECIFIED = "Не указано"
+
+
+def split_text(text: str, chunk_size: int, overlap: int = 0) -> list[str]:
+    """
+    Split text into chunks on paragraph boundaries.
+
+    Paragraphs longer than `chunk_size` are split on sentence boundaries and, as a
+    last resort, by characters. Every chunk after the first starts with the trailing
+    paragraphs of the previous chunk that fit into `overlap` characters.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum chunk length in characters
+        overlap: Maximum length of the context repeated from the previous chunk
+
+    Returns:
+        List of chunks in text order
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_size:
+            pieces.append(paragraph)
+            continue
+        sentence_group = ""
+        for sentence in re.split(r"(?<=[.!?…])\s+", paragraph):
+            while len(sentence) > chunk_size:
+                pieces.append(sentence[:chunk_size])
+                sentence = sentence[chunk_size:]
+            if sentence_group and len(sentence_group) + len(sentence) + 1 > chunk_size:
+                pieces.append(sentence_group)
+                sentence_group = ""
+            sentence_group = f"{sentence_group} {sentence}".strip()
+        if sentence_group:
+            pieces.append(sentence_group)
+
+    chunks = []
+    current: list[str] = []
+    for piece in pieces:
+        if current and len("\n\n".join(current + [piece])) > chunk_size:
+            chunks.append("\n\n".join(current))
+            context: list[str] = []
+            for previous in reversed(current):
+                candidate = [previous] + context
+                if len("\n\n".join(candidate)) > overlap:
+                    break
+                if len("\n\n".join(candidate + [piece])) > chunk_size:
+                    break
+                context = candidate
+            current = context
+        current.append(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _normalize(value: str) -> str:
+    """Key used to detect the same item written slightly differently."""
+    return re.sub(r"[\W_]+", " ", value.casefold()).strip()
+
+
+def _is_specified(value: Optional[str]) -> bool:
+    return bool(value) and _normalize(value) != _normalize(NOT_SPECIFIED)
+
+
+def _first_specified(values: list[Optional[str]]) -> str:
+    for value in values:
+        if _is_specified(value):
+            return value
+    return NOT_SPECIFIED
+
+
+def _merge_lists(lists: list[Optional[list[str]]]) -> list[str]:
+    merged = {}
+    for values in lists:
+        for value in values or []:
+            key = _normalize(value)
+            if _is_specified(value) and key not in merged:
+                merged[key] = value
+    return list(merged.values())
+
+
+def _merge_stages(stage_lists: list[list[ProjectStage]]) -> list[ProjectStage]:
+    merged: dict[str, ProjectStage] = {}
+    for stages in stage_lists:
+        for stage in stages:
+            key = _normalize(stage.stage_name)
+            if key not in merged:
+                merged[key] = stage.model_copy(deep=True)
+                continue
+            existing = merged[key]
+            if not _is_specified(existing.stage_start_date):
+                existing.stage_start_date = stage.stage_start_date
+            if not _is_specified(existing.stage_end_date):
+                existing.stage_end_date = stage.stage_end_date
+            known = {
+                _normalize(result.result_description)
+                for result in existing.smart_results
+            }
+            for result in stage.smart_results:
+                if _normalize(result.result_description) not in known:
+                    existing.smart_results.append(result)
+                    known.add(_normalize(result.result_description))
+    return list(merged.values())
+
+
+def _merge_teams(teams: list[ProjectTeam]) -> ProjectTeam:
+    merged = {}
+    for field in ProjectTeam.model_fields:
+        values = [getattr(team, field) for team in teams]
+        if field in ("project_management_committee", "independent_experts"):
+            merged[field] = _merge_lists(values)
+        else:
+            merged[field] = _first_specified(values)
+    return ProjectTeam(**merged)
+
+
+def merge_project_data(parts: list[ProjectData]) -> ProjectData:
+    """
+    Merge extraction results of consecutive chunks into one result.
+
+    Scalar fields take the first specified value in chunk order. Lists keep the first
+    occurrence of every item, compared case- and punctuation-insensitively. Stages
+    with the same name are combined and their SMART results deduplicated.
+
+    Args:
+        parts: Extraction results in chunk order
+
+    Returns:
+        Merged ProjectData
+    """
+    return ProjectData(
+        project_name=_first_specified([part.project_name for part in parts]),
+        project_start_order_form=_first_specified(
+            [part.project_start_order_form for part in parts]
+        ),
+        project_stakeholders=_merge_lists([part.project_stakeholders for part in parts]),
+        project_steering_committee=_merge_lists(
+            [part.project_steering_committee for part in parts]
+        ),
+        project_team=_merge_teams([part.project_team for part in parts]),
+        project_start_date=_first_specified([part.project_start_date for part in parts]),
+        project_stages=_merge_stages([part.project_stages for part in parts]),
+        project_goal=_first_specified([part.project_goal for part in parts]),
+        project_result_vision=_first_specified(
+            [part.project_result_vision for part in parts]
+        ),
+        project_constraints_exclusions=_merge_lists(
+            [part.project_constraints_exclusions for part in parts]
+        ),
+        project_risks_assumptions=_merge_lists(
+            [part.project_risks_assumptions for part in parts]
+        ),
+    )
+
+
+class ChunkedProjectDataExtractor:
+    """
+    Class for extracting project data from long descriptions with map-reduce over chunks.
+    """
+
+    def __init__(
+        self,
+        extractor: ProjectDataExtractor,
+        chunk_size: int = 6000,
+        chunk_overlap: int = 500,
+        max_workers: int = 4,
+    ):
+        """
+        Initialize the chunked extractor.
+
+        Args:
+            extractor: Extractor used for every chunk
+            chunk_size: Maximum chunk length in characters, shorter texts are not split
+            chunk_overlap: Maximum length of the context repeated from the previous chunk
+            max_workers: Maximum number of chunks extracted concurrently
+        """
+        self.extractor = extractor
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers
+
+    def extract_data(self, text_description: str) -> ProjectData:
+        """
+        Extract project data, splitting the description if it is longer than chunk_size.
+
+        Args:
+            text_description: Text description of the project
+
+        Returns:
+            ProjectData object containing the extracted information
+
+        Raises:
+            ValueError: If there's an error in the extraction process
+        """
+        chunks = split_text(text_description, self.chunk_size, self.chunk_overlap)
+        if len(chunks) <= 1:
+            return self.extractor.extract_data(text_description)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            parts = list(executor.map(self.extractor.extract_data, chunks))
+        return merge_project_data(parts)
@@ -0,0 +1,106 @@
+import inspect
+import re
+from functools import lru_cache
+from typing import Any, Union, get_args, get_origin
+
+from pydantic import BaseModel, Field, create_model
+from pydantic.fields import FieldInfo
+
+from extraction_models import ProjectData
+
+# "full" sends the models as written, "compact" drops the examples, "minimal" also
+# shortens descriptions to their first clause
+SCHEMA_MODES = ("full", "compact", "minimal")
+
+
+def _first_sentence(text: str) -> str:
+    return re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+
+
+def shorten_description(description: str, mode: str) -> str:
+    """
+    Shorten a field or model description for the given schema mode.
+
+    Args:
+        description: Description from the model
+        mode: One of SCHEMA_MODES
+
+    Returns:
+        The description to send to the model
+    """
+    if mode != "minimal":
+        return description
+    # "Инициатор проекта: Принимает решение ..." -> "Инициатор проекта"
+    return _first_sentence(description.split(":", 1)[0]).rstrip(".")
+
+
+def _compact_annotation(annotation: Any, mode: str) -> Any:
+    """Replace the models inside an annotation with their compact versions."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return compact_model(annotation, mode)
+    args = get_args(annotation)
+    if not args:
+        return annotation
+    compact_args = tuple(_compact_annotation(arg, mode) for arg in args)
+    origin = get_origin(annotation)
+    if origin is Union:
+        return Union[compact_args]
+    return origin[compact_args if len(compact_args) > 1 else compact_args[0]]
+
+
+def _compact_field(info: FieldInfo, mode: str) -> FieldInfo:
+    kwargs = {}
+    if info.description:
+        kwargs["description"] = shorten_description(info.description, mode)
+    if info.default_factory is not None:
+        kwargs["default_factory"] = info.default_factory
+        return Field(**kwargs)
+    # Examples are passed both as `examples` and as the `example` schema extra,
+    # neither is kept
+    return Field(... if info.is_required() else info.default, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def compact_model(model: type[BaseModel], mode: str) -> type[BaseModel]:
+    """
+    Build a version of a model whose JSON schema takes fewer tokens.
+
+    The compact model subclasses the original and has the same name, so the tool
+    name seen by the LLM and the validation rules stay the same.
+
+    Args:
+        model: Pydantic model used for structured output
+        mode: One of SCHEMA_MODES
+
+    Returns:
+        The compact model, or the model itself for the "full" mode
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unknown schema mode: {mode}")
+    if mode == "full":
+        return model
+    doc = inspect.cleandoc(model.__doc__ or "")
+    return create_model(
+        model.__name__,
+        __base__=model,
+        __doc__=_first_sentence(shorten_description(doc, mode)) if doc else None,
+        **{
+            name: (_compact_annotation(info.annotation, mode), _compact_field(info, mode))
+            for name, info in model.model_fields.items()
+        },
+    )
+
+
+def get_extraction_schema(mode: str = "full") -> type[ProjectData]:
+    """Get the ProjectData model sent to the LLM in the given schema mode."""
+    return compact_model(ProjectData, mode)
+
+
+def to_project_data(result: ProjectData) -> ProjectData:
+    """Convert an instance of a compact ProjectData model into ProjectData."""
+    if type(result) is ProjectData:
+        return result
+    return ProjectData.model_validate(result.model_dump())
@@ -1,5 +1,9 @@
-from docxtpl import DocxTemplate
+import io
+import os
+from typing import IO, Union
 from formatted_data import FormattedProjectData
+from metrics import get_registry, observe, timed
+from template_cache import get_compiled_template
 
 
 class ProjectPassportFiller:
@@ -11,21 +15,48 @@ class ProjectPassportFiller:
         """
         Initialize the filler with a template path.
 
+        The template is parsed once per process and shared between fillers, so a filler
+        is cheap to create and can be reused for any number of documents.
+
         Args:
             template_path: Path to the .docx template file with placeholders
         """
-        self.template = DocxTemplate(template_path)
+        self.template_path = template_path
+        # Parse the template now, so that errors show up here and not on the first render
+        get_compiled_template(template_path)
 
+    @timed("render")
     def fill_template(
-        self, formatted_data: FormattedProjectData, output_path: str
+        self, formatted_data: FormattedProjectData, output_path: Union[str, IO[bytes]]
     ) -> None:
         """
         Fill the template with project data and save to output path.
 
         Args:
             formatted_data: Formatted project data
-            output_path: Path where to save the filled document
+            output_path: Path or binary file object where to save the filled document
         """
         context = formatted_data.model_dump()
-        self.template.render(context)
-        self.template.save(output_path)
+        document = get_compiled_template(self.template_path).render(context)
+        document.save(output_path)
+
+        if get_registry() is not None:
+            if isinstance(output_path, (str, os.PathLike)):
+                size = os.path.getsize(output_path)
+            else:
+                size = output_path.tell()
+            observe("document_bytes", size)
+
+    def render_bytes(self, formatted_data: FormattedProjectData) -> bytes:
+        """
+        Fill the template with project data in memory.
+
+        Args:
+            formatted_data: Formatted project data
+
+        Returns:
+            Content of the filled .docx document
+        """
+        buffer = io.BytesIO()
+        self.fill_template(formatted_data, buffer)
+        return buffer.getvalue()
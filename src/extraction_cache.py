@@ -0,0 +1,240 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from extraction_models import ProjectData
+from extraction_prompt import EXTRACTION_PROMPT
+
+
+@lru_cache(maxsize=None)
+def _schema_json(schema: type[BaseModel]) -> str:
+    # The schema only changes with the code, so it is serialized once per process
+    return json.dumps(schema.model_json_schema(), sort_keys=True)
+
+
+def make_cache_key(
+    text_description: str,
+    model_name: Optional[str],
+    temperature: Optional[float],
+    schema: type[BaseModel] = ProjectData,
+) -> str:
+    """
+    Build a content-addressed key for an extraction request.
+
+    Args:
+        text_description: Text description of the project
+        model_name: Name of the model used for extraction
+        temperature: Sampling temperature of the model
+        schema: Model sent to the LLM for structured output
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = json.dumps(
+        [text_description, EXTRACTION_PROMPT, _schema_json(schema), model_name, temperature],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseExtractionCache(ABC):
+    """
+    Base class for caches of validated extraction results.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of stored entries, least recently used are evicted
+            ttl: Lifetime of an entry in seconds, None keeps entries until evicted
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ProjectData]:
+        """
+        Get a cached result.
+
+        Args:
+            key: Key built by make_cache_key
+
+        Returns:
+            Cached ProjectData or None if there is no fresh entry
+        """
+        with self._lock:
+            data = self._get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return ProjectData.model_validate_json(data)
+
+    def set(self, key: str, project_data: ProjectData) -> None:
+        """
+        Store an extraction result.
+
+        Args:
+            key: Key built by make_cache_key
+            project_data: Validated extraction result
+        """
+        data = project_data.model_dump_json()
+        with self._lock:
+            self._set(key, data)
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and the current number of entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": self._size()}
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Get serialized data for a key, called under the lock."""
+
+    @abstractmethod
+    def _set(self, key: str, data: str) -> None:
+        """Store serialized data for a key, called under the lock."""
+
+    @abstractmethod
+    def _size(self) -> int:
+        """Get the number of stored entries, called under the lock."""
+
+
+class InMemoryExtractionCache(BaseExtractionCache):
+    """
+    Process-local LRU cache of extraction results.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None):
+        super().__init__(max_size, ttl)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, data = entry
+        if self._is_expired(created_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def _set(self, key: str, data: str) -> None:
+        self._entries[key] = (time.time(), data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteExtractionCache(BaseExtractionCache):
+    """
+    On-disk cache of extraction results that survives restarts.
+    """
+
+    def __init__(self, path: str, max_size: int = 10000, ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path to the SQLite database file, created if missing
+            max_size: Maximum number of stored entries, least recently used are evicted
+            ttl: Lifetime of an entry in seconds, None keeps entries until evicted
+        """
+        super().__init__(max_size, ttl)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS extractions_accessed_at "
+            "ON extractions (accessed_at)"
+        )
+        self._connection.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._connection.execute(
+            "SELECT data, created_at FROM extractions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        data, created_at = row
+        if self._is_expired(created_at):
+            self._connection.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self._connection.commit()
+            return None
+        self._connection.execute(
+            "UPDATE extractions SET accessed_at = ? WHERE key = ?", (time.time(), key)
+        )
+        self._connection.commit()
+        return data
+
+    def _set(self, key: str, data: str) -> None:
+        now = time.time()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO extractions (key, data, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, data, now, now),
+        )
+        if self.ttl is not None:
+            self._connection.execute(
+                "DELETE FROM extractions WHERE created_at < ?", (now - self.ttl,)
+            )
+        self._connection.execute(
+            "DELETE FROM extractions WHERE key NOT IN "
+            "(SELECT key FROM extractions ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_size,),
+        )
+        self._connection.commit()
+
+    def _size(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+
+def create_extraction_cache(
+    backend: str, path: str, max_size: int, ttl: Optional[float] = None
+) -> Optional[BaseExtractionCache]:
+    """
+    Create an extraction cache by backend name.
+
+    Args:
+        backend: One of "none", "memory" or "sqlite"
+        path: Path to the database file for the "sqlite" backend
+        max_size: Maximum number of stored entries
+        ttl: Lifetime of an entry in seconds
+
+    Returns:
+        Cache instance or None if caching is disabled
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return InMemoryExtractionCache(max_size=max_size, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteExtractionCache(path, max_size=max_size, ttl=ttl)
+    raise ValueError(f"Unknown extraction cache backend: {backend}")
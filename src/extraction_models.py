@@ -58,9 +58,9 @@ class SMARTResult(BaseModel):
     )
 
 
-class ProjectStage(BaseModel):
+class ProjectStageOutline(BaseModel):
     """
-    Модель для каждого этапа проекта, включая результаты, прописанные по методологии SMART.
+    Модель для этапа проекта без результатов.
     """
 
     stage_name: str = Field(
@@ -82,12 +82,25 @@ class ProjectStage(BaseModel):
         description="Дата окончания этапа (формат YYYY-MM-DD)",
         example="2023-12-31",
     )
+
+
+class StageResults(BaseModel):
+    """
+    Модель для результатов одного этапа проекта, прописанных по методологии SMART.
+    """
+
     smart_results: list[SMARTResult] = Field(
         ...,
         description="Результаты этапа, прописанные по методологии SMART",
     )
 
 
+class ProjectStage(StageResults, ProjectStageOutline):
+    """
+    Модель для каждого этапа проекта, включая результаты, прописанные по методологии SMART.
+    """
+
+
 class ProjectTeam(BaseModel):
     """
     Model for the project team roles and members.
@@ -145,9 +158,9 @@ class ProjectTeam(BaseModel):
     )
 
 
-class ProjectData(BaseModel):
+class ProjectOutline(BaseModel):
     """
-    Модель для всех полей, связанных с описанием проекта.
+    Модель для всех полей, связанных с описанием проекта, с этапами без результатов.
     """
 
     project_name: str = Field(
@@ -178,8 +191,8 @@ class ProjectData(BaseModel):
     )
     # project_stages are placed above project_goal, project_result_vision, project_constraints_exclusions and project_risks_assumptions
     # this simulate CoT and force model to reason more.
-    project_stages: list[ProjectStage] = Field(
-        ..., description="Список этапов и результатов проекта"
+    project_stages: list[ProjectStageOutline] = Field(
+        ..., description="Список этапов проекта"
     )
     project_goal: str = Field(
         ...,
@@ -201,3 +214,13 @@ class ProjectData(BaseModel):
         description="Риски и допущения проекта: перечень потенциальных угроз и предположений, на которых базируется план реализации проекта.",
         example=["Риск задержки поставок", "Предположение о стабильности рынка"],
     )
+
+
+class ProjectData(ProjectOutline):
+    """
+    Модель для всех полей, связанных с описанием проекта.
+    """
+
+    project_stages: list[ProjectStage] = Field(
+        ..., description="Список этапов и результатов проекта"
+    )
@@ -29,3 +29,70 @@ EXTRACTION_PROMPT = (
     "Для этапа указан результат: улучшение интерфейса, что привело к увеличению конверсии на 15%. Если исходное описание не содержит информацию о каком-либо SMART-поле или числового показателя, установите его значение как 'Не указано'.\n\n"
     "Пожалуйста, извлеките информацию из следующего описания:"
 )
+
+OUTLINE_PROMPT = (
+    "Вы — ассистент, специализирующийся на извлечении структурированной информации о проектах из текстовых описаний. "
+    "Вам будет предоставлено текстовое описание проекта. Ваша задача — извлечь общую информацию о проекте, его команду и список этапов с датами начала и окончания, "
+    "исходя только из данных, содержащихся в тексте. Результаты этапов на этом шаге не формируются. "
+    "Если информация для какого-либо поля отсутствует или неоднозначна, установите его значение как 'Не указано'.\n\n"
+    "При извлечении информации соблюдайте следующие правила:\n"
+    "1. Для дат используйте формат YYYY-MM-DD.\n"
+    "2. Для списков (этапы, риски, ограничения и т.д.) извлекайте каждый элемент отдельно.\n"
+    "3. Для членов команды проекта указывайте их полные ФИО.\n"
+    "4. Убедитесь, что все обязательные поля заполнены.\n\n"
+    "Важно: используйте только ту информацию, которая действительно встречается в исходном тексте. Не генерируйте дополнительных или выдуманных данных.\n\n"
+    "Пожалуйста, извлеките информацию из следующего описания:"
+)
+
+SECTION_PROMPT = (
+    "Вы — ассистент, специализирующийся на извлечении структурированной информации о проектах из текстовых описаний. "
+    "Вам будет предоставлено текстовое описание проекта. Ваша задача — извлечь только следующие поля паспорта проекта, "
+    "исходя только из данных, содержащихся в тексте:\n"
+    "{fields}\n\n"
+    "Другие сведения о проекте на этом шаге не извлекаются. "
+    "Если информация для какого-либо поля отсутствует или неоднозначна, установите его значение как 'Не указано'.\n\n"
+    "При извлечении информации соблюдайте следующие правила:\n"
+    "1. Для дат используйте формат YYYY-MM-DD.\n"
+    "2. Для списков извлекайте каждый элемент отдельно.\n"
+    "3. Для людей указывайте их полные ФИО.\n\n"
+    "Важно: используйте только ту информацию, которая действительно встречается в исходном тексте. Не генерируйте дополнительных или выдуманных данных.\n\n"
+    "Пожалуйста, извлеките информацию из следующего описания:"
+)
+
+STAGE_RESULTS_PROMPT = (
+    "Вы — ассистент, специализирующийся на формулировании результатов этапов проекта по методологии SMART. "
+    "Вам будет предоставлено текстовое описание проекта. Сформируйте результаты только для этапа «{stage_name}» "
+    "(с {stage_start_date} по {stage_end_date}), исходя только из данных, содержащихся в тексте.\n\n"
+    "Для каждого результата создайте следующие поля:\n"
+    "   - specific — конкретное описание результата с указанием ссылок на исходный текст (в том числе числовые данные, если они имеются);\n"
+    "   - measurable — критерии или показатели для измерения успеха (например, если присутствует число или процент, извлеките его точно как в оригинале);\n"
+    "   - achievable — обоснование достижимости результата с ссылкой на те данные, которые встречаются в тексте;\n"
+    "   - relevant — описание того, как результат согласуется с целями проекта, с обязательной привязкой к исходному описанию;\n"
+    "   - time_bound — указание временных рамок, извлекаемых из текста (например, сроки завершения, даты).\n"
+    "После этого сформируйте итоговое поле result_description – составьте абзац, объединяющий все SMART-поля, только из данных исходного текста.\n\n"
+    "Важно:\n"
+    "- Не генерируйте дополнительных или выдуманных данных, особенно числовых значений. Если исходное описание не содержит информацию о каком-либо SMART-поле или числового показателя, установите его значение как 'Не указано'.\n"
+    "- Итоговый вывод должен содержать только структурированный результат без дополнительных рассуждений.\n\n"
+    "Описание проекта:"
+)
+
+REPAIR_PROMPT = (
+    "Вы — ассистент, специализирующийся на извлечении структурированной информации о проектах из текстовых описаний. "
+    "Ранее из описания проекта был извлечён структурированный результат, но часть полей не прошла проверку. "
+    "Верните исправленные значения только для полей с ошибками, исходя только из данных, содержащихся в тексте. "
+    "Если информация для поля отсутствует или неоднозначна, установите его значение как 'Не указано'. "
+    "Для дат используйте формат YYYY-MM-DD.\n\n"
+    "Ошибки проверки:\n"
+    "{errors}\n\n"
+    "Текущий результат:\n"
+    "{output}\n\n"
+    "Описание проекта:"
+)
+
+# Same rules as EXTRACTION_PROMPT, for several short descriptions sent in one request
+PACKED_EXTRACTION_PROMPT = EXTRACTION_PROMPT.rsplit("\n\n", 1)[0] + (
+    "\n\nНиже приведены несколько независимых описаний разных проектов, каждое начинается с заголовка «### Описание N». "
+    "Извлеките информацию из каждого описания отдельно по тем же правилам и не переносите сведения из одного описания в другое. "
+    "Верните по одному результату на каждое описание и укажите в поле description_id номер описания из его заголовка.\n\n"
+    "Описания:"
+)
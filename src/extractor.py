@@ -1,6 +1,18 @@
+import asyncio
+import copy
+from typing import Callable, Optional
+from langchain_core.exceptions import OutputParserException
 from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
+from langchain_core.runnables import Runnable
+from compact_schema import get_extraction_schema, to_project_data
+from extraction_cache import BaseExtractionCache, make_cache_key
 from extraction_models import ProjectData
 from extraction_prompt import EXTRACTION_PROMPT
+from fact_extractor import ProjectFacts, extract_facts, schema_without_facts
+from metrics import increment, llm_config, timed
+from output_repair import StructuredOutputRepairer, tool_call_args
+from resilience import ResilientCaller
 
 
 class ProjectDataExtractor:
@@ -8,16 +20,176 @@ class ProjectDataExtractor:
     Class for extracting project data from text descriptions using LangChain and LLM with structured decoding.
     """
 
-    def __init__(self, llm: BaseChatModel):
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        cache: Optional[BaseExtractionCache] = None,
+        resilience: Optional[ResilientCaller] = None,
+        repair_attempts: int = 0,
+        schema_mode: str = "full",
+        rule_facts: bool = False,
+    ):
         """
         Initialize the extractor with LLM.
 
         Args:
             llm: LLM model - LLM must support structured decoding.
+            cache: Optional cache of extraction results keyed by the request content
+            resilience: Optional retry, deadline and hedging policy for LLM calls
+            repair_attempts: Number of calls made to fix output that fails validation
+                before the extraction fails, 0 disables repair
+            schema_mode: "full", "compact" or "minimal" - how much of the field
+                descriptions and examples is sent with the schema
+            rule_facts: Find dates, the start order form and team members with
+                deterministic rules before the call; they are given to the LLM as
+                fixed facts, removed from the schema it fills and set in the result
         """
         self.llm = llm
-        self.structured_llm = self.llm.with_structured_output(ProjectData)
+        self.schema = get_extraction_schema(schema_mode)
+        self.structured_llm = self.llm.with_structured_output(
+            self.schema, include_raw=True
+        )
+        self.cache = cache
+        self.resilience = resilience
+        self.repairer = (
+            StructuredOutputRepairer(llm, self.schema, repair_attempts)
+            if repair_attempts
+            else None
+        )
+        self.rule_facts = rule_facts
+        self._fact_llms: dict[type, Runnable] = {}
+        # Built once here, so that the copies made by with_cache share it
+        tool_name = self.schema.__name__
+        self.streaming_llm = self.llm.bind_tools(
+            [self.schema], tool_choice=tool_name
+        ) | JsonOutputKeyToolsParser(key_name=tool_name, first_tool_only=True)
 
+    def with_cache(self, cache: Optional[BaseExtractionCache]) -> "ProjectDataExtractor":
+        """
+        Get an extractor that uses another cache and shares everything else with this one.
+
+        Args:
+            cache: Cache of extraction results for the new extractor
+
+        Returns:
+            Shallow copy of the extractor, the structured LLMs are not set up again
+        """
+        extractor = copy.copy(self)
+        extractor.cache = cache
+        return extractor
+
+    def cache_key(self, text_description: str) -> str:
+        """Build the cache key for a description and the current model settings."""
+        model_name = getattr(self.llm, "model_name", None) or getattr(
+            self.llm, "model", None
+        )
+        temperature = getattr(self.llm, "temperature", None)
+        facts = extract_facts(text_description) if self.rule_facts else None
+        if facts is None or facts.is_empty():
+            return make_cache_key(text_description, model_name, temperature, self.schema)
+        # The facts change both the request and the schema sent with it
+        return make_cache_key(
+            f"{text_description}\n\n{facts.to_prompt()}",
+            model_name,
+            temperature,
+            schema_without_facts(self.schema, facts),
+        )
+
+    def _lookup_cache(
+        self, text_description: str
+    ) -> tuple[Optional[str], Optional[ProjectData]]:
+        """Get the cache key and the cached result, if caching is enabled."""
+        if not self.cache:
+            return None, None
+        key = self.cache_key(text_description)
+        cached = self.cache.get(key)
+        increment(
+            "extraction_cache_requests", result="miss" if cached is None else "hit"
+        )
+        return key, cached
+
+    def _facts(self, text_description: str) -> Optional[ProjectFacts]:
+        """Find the rule-based facts of a description, if enabled."""
+        if not self.rule_facts:
+            return None
+        facts = extract_facts(text_description)
+        increment("rule_facts", result="empty" if facts.is_empty() else "found")
+        return None if facts.is_empty() else facts
+
+    def _prompt(self, text_description: str, facts: Optional[ProjectFacts]) -> str:
+        prompt = f"{EXTRACTION_PROMPT}\n\n{text_description}"
+        return f"{prompt}\n\n{facts.to_prompt()}" if facts else prompt
+
+    def _structured_llm(self, facts: Optional[ProjectFacts]) -> Runnable:
+        """Get the structured LLM for the schema without the fields set by the facts."""
+        schema = schema_without_facts(self.schema, facts) if facts else self.schema
+        if schema is self.schema:
+            return self.structured_llm
+        structured_llm = self._fact_llms.get(schema)
+        if structured_llm is None:
+            structured_llm = self.llm.with_structured_output(schema, include_raw=True)
+            self._fact_llms[schema] = structured_llm
+        return structured_llm
+
+    @staticmethod
+    def _finalize(result, facts: Optional[ProjectFacts]) -> ProjectData:
+        """Convert a result into ProjectData, setting the fields determined by the facts."""
+        if facts is None:
+            return to_project_data(result)
+        data = result if isinstance(result, dict) else result.model_dump()
+        return ProjectData.model_validate(facts.apply(data))
+
+    def _output_to_repair(self, result: dict) -> dict:
+        """
+        Get the raw output to repair from a structured call result.
+
+        Raises:
+            Exception: The parsing error if the output cannot be repaired
+        """
+        output = tool_call_args(result["raw"])
+        if output is None or self.repairer is None:
+            raise result["parsing_error"] or OutputParserException(
+                "Model did not return ProjectData"
+            )
+        return output
+
+    def _invoke(self, text_description: str) -> ProjectData:
+        """Make the structured LLM call, under the resilience policy if configured."""
+        facts = self._facts(text_description)
+        prompt = self._prompt(text_description, facts)
+        structured_llm = self._structured_llm(facts)
+
+        def call() -> ProjectData:
+            result = structured_llm.invoke(prompt, config=llm_config())
+            if result["parsed"] is not None:
+                return self._finalize(result["parsed"], facts)
+            output = self._output_to_repair(result)
+            if facts:
+                output = facts.apply(output)
+            return self._finalize(self.repairer.repair(text_description, output), facts)
+
+        return self.resilience.call(call) if self.resilience else call()
+
+    async def _ainvoke(self, text_description: str) -> ProjectData:
+        """Make the structured LLM call asynchronously, under the resilience policy if configured."""
+        facts = self._facts(text_description)
+        prompt = self._prompt(text_description, facts)
+        structured_llm = self._structured_llm(facts)
+
+        async def call() -> ProjectData:
+            result = await structured_llm.ainvoke(prompt, config=llm_config())
+            if result["parsed"] is not None:
+                return self._finalize(result["parsed"], facts)
+            output = self._output_to_repair(result)
+            if facts:
+                output = facts.apply(output)
+            return self._finalize(
+                await self.repairer.arepair(text_description, output), facts
+            )
+
+        return await self.resilience.acall(call) if self.resilience else await call()
+
+    @timed("extract")
     def extract_data(self, text_description: str) -> ProjectData:
         """
         Extract project data from a text description using LangChain.
@@ -31,11 +203,97 @@ class ProjectDataExtractor:
         Raises:
             ValueError: If there's an error in the extraction process
         """
+        key, cached = self._lookup_cache(text_description)
+        if cached is not None:
+            return cached
+
         try:
-            prompt = f"{EXTRACTION_PROMPT}\n\n{text_description}"
+            project_data = self._invoke(text_description)
+        except Exception as e:
+            raise ValueError("Error during extraction") from e
+
+        if key:
+            self.cache.set(key, project_data)
+        return project_data
+
+    @timed("extract")
+    async def aextract_data(self, text_description: str) -> ProjectData:
+        """
+        Extract project data without blocking the event loop during the LLM call.
+
+        Args:
+            text_description: Text description of the project
+
+        Returns:
+            ProjectData object containing the extracted information
+
+        Raises:
+            ValueError: If there's an error in the extraction process
+        """
+        # The cache may be on disk, so it is not used on the event loop thread
+        key, cached = await asyncio.to_thread(self._lookup_cache, text_description)
+        if cached is not None:
+            return cached
+
+        try:
+            project_data = await self._ainvoke(text_description)
+        except Exception as e:
+            raise ValueError("Error during extraction") from e
+
+        if key:
+            await asyncio.to_thread(self.cache.set, key, project_data)
+        return project_data
+
+    @timed("extract")
+    def extract_data_streaming(
+        self, text_description: str, on_update: Callable[[dict], None]
+    ) -> ProjectData:
+        """
+        Extract project data while reporting partially parsed output as tokens arrive.
+
+        The stream runs under the resilience policy, if configured: transient errors
+        before the first chunk are retried, later ones fail the extraction.
+
+        Args:
+            text_description: Text description of the project
+            on_update: Called with the partially parsed ProjectData fields as a dict
+                every time the model output grows
+
+        Returns:
+            ProjectData object containing the extracted information
+
+        Raises:
+            ValueError: If there's an error in the extraction process
+        """
+        key, cached = self._lookup_cache(text_description)
+        if cached is not None:
+            return cached
+
+        try:
+            # The streamed schema stays complete so that the preview shows every
+            # field; the facts are still given in the prompt and set in the result
+            facts = self._facts(text_description)
+            prompt = self._prompt(text_description, facts)
+
+            def stream():
+                return self.streaming_llm.stream(prompt, config=llm_config())
 
-            project_data = self.structured_llm.invoke(prompt)
-            return project_data
+            partial = None
+            chunks = self.resilience.stream(stream) if self.resilience else stream()
+            for partial in chunks:
+                if partial:
+                    on_update(partial)
+            if facts and isinstance(partial, dict):
+                partial = facts.apply(partial)
+            if self.repairer is not None and isinstance(partial, dict):
+                project_data = to_project_data(
+                    self.repairer.repair(text_description, partial)
+                )
+            else:
+                project_data = ProjectData.model_validate(partial)
+        except Exception as e:
+            raise ValueError("Error during extraction") from e
 
-        except Exception:
-            raise ValueError("Error during extraction")
+        if key:
+            self.cache.set(key, project_data)
+        return project_data
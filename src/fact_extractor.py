@@ -0,0 +1,378 @@
+import re
+from functools import lru_cache
+from typing import Optional, Union
+
+from dateutil import parser as date_parser
+from pydantic import BaseModel, Field, create_model
+from pydantic.json_schema import SkipJsonSchema
+
+from extraction_models import ProjectData, ProjectStageOutline, ProjectTeam
+
+MONTHS = {
+    "января": 1,
+    "февраля": 2,
+    "марта": 3,
+    "апреля": 4,
+    "мая": 5,
+    "июня": 6,
+    "июля": 7,
+    "августа": 8,
+    "сентября": 9,
+    "октября": 10,
+    "ноября": 11,
+    "декабря": 12,
+}
+
+DATE_PATTERN = (
+    r"(?:\d{4}-\d{2}-\d{2}|\d{1,2}[./]\d{1,2}[./]\d{4}|"
+    rf"\d{{1,2}}\s+(?:{'|'.join(MONTHS)})\s+\d{{4}}(?:\s*(?:г\.|года))?)"
+)
+_RANGE = rf"(?:с\s+)?(?P<start>{DATE_PATTERN})\s*(?:[–—-]|по|до)\s*(?P<end>{DATE_PATTERN})"
+# "1. **Анализ требований** (01.03.2024 – 30.06.2024)", one stage per line
+_STAGE_RE = re.compile(
+    rf"^[ \t>#*\-•]*(?:\d+[.)]\s*)?(?P<name>[^\n(]{{3,150}}?)[\s*:]*\(\s*{_RANGE}\s*\)[\s*:.]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# "начал" alone would also match "начальник", so only forms of "начало" are taken
+_START_RE = re.compile(
+    rf"\b(?:старт\w*|начал[оаи]\w*|начина\w*|запуск\w*)(?P<gap>[^.\n]{{0,40}}?)"
+    rf"(?P<date>{DATE_PATTERN})",
+    re.IGNORECASE,
+)
+# "начало второго этапа 01.07.2024" is the start of a stage, not of the project
+_STAGE_START_GAP_RE = re.compile(r"этап", re.IGNORECASE)
+_ORDER_FORM_RE = re.compile(
+    r"(?P<before>письменн|устн)\w*\s+(?:\w+\s+){0,2}поручени|"
+    r"поручени\w*\s+(?:\w+\s+){0,3}(?:в\s+)?(?P<after>письменн|устн)",
+    re.IGNORECASE,
+)
+
+_UPPER, _LOWER = "А-ЯЁ", "а-яё"
+FIO_PATTERN = (
+    # А.В. Смирнов
+    rf"[{_UPPER}]\.\s?[{_UPPER}]\.\s?[{_UPPER}][{_LOWER}]+(?:-[{_UPPER}][{_LOWER}]+)?"
+    # Смирнов А.В.
+    rf"|[{_UPPER}][{_LOWER}]+(?:-[{_UPPER}][{_LOWER}]+)?\s[{_UPPER}]\.\s?[{_UPPER}]\."
+    # Смирнов Андрей Викторович
+    rf"|[{_UPPER}][{_LOWER}]+\s[{_UPPER}][{_LOWER}]+\s[{_UPPER}][{_LOWER}]+"
+    rf"(?:ович|евич|ич|овна|евна|ична|инична)\b"
+)
+_FIO_RE = re.compile(FIO_PATTERN)
+
+# Labels of the team roles as they are written in lists like "Руководитель проекта: ..."
+ROLE_LABELS: list[tuple[str, str]] = [
+    ("project_owner_representative", r"представител\w*\s+владел\w*(?:\s+проекта)?"),
+    ("project_initiator", r"инициатор\w*(?:\s+проекта)?"),
+    ("project_owner", r"владел\w*\s+проекта"),
+    ("strategy_portfolio_leader", r"руководител\w*\s+портфеля\s+мероприятий(?:\s+стратегии)?"),
+    ("strategy_event_leader", r"руководител\w*\s+мероприятия(?:\s+стратегии)?"),
+    ("project_leader", r"руководител\w*\s+проекта"),
+    ("management_team_curator", r"куратор\w*\s+команды\s+управления"),
+    ("project_manager", r"менеджер\w*\s+проекта"),
+    ("independent_experts", r"независим\w*\s+эксперт\w*"),
+    ("project_steering_committee", r"(?:состав\s+)?(?:управляющ\w*\s+комитет\w*|укп)(?:\s+проекта)?"),
+]
+_FIO_LIST = rf"(?:{FIO_PATTERN})(?:(?:\s*,\s*|\s+и\s+)(?:{FIO_PATTERN}))*"
+# A role is followed by its people either in a list ("Руководитель проекта: Н.С. Васильев")
+# or in prose ("Инициатором выступил А.В. Смирнов"), within a few words of the label
+_ROLE_RES = [
+    (
+        field,
+        re.compile(
+            rf"\b(?i:{label})\b(?P<gap>[^.\n]{{0,30}}?)(?P<names>{_FIO_LIST})"
+        ),
+    )
+    for field, label in ROLE_LABELS
+]
+# "Эксперты, такие как Е.В. Михайлова" names only some of the people in the role, and
+# in "куратором команды управления, и К.А. Орлов" the name belongs to the next clause
+_SKIP_GAP_RE = re.compile(
+    r"таки\w+\s+как|например|в\s+том\s+числе|среди|включая|\b(?:и|а|но)\b", re.IGNORECASE
+)
+_LIST_ROLES = {"independent_experts", "project_steering_committee"}
+
+
+def normalize_date(value: str) -> Optional[str]:
+    """
+    Convert a date written in the text into the YYYY-MM-DD format.
+
+    Args:
+        value: Date such as "01.03.2024", "2024-03-01" or "1 марта 2024 года"
+
+    Returns:
+        The date in the YYYY-MM-DD format, or None if it is not a valid date
+    """
+    value = re.sub(r"\s*(?:г\.|года)$", "", value.strip(), flags=re.IGNORECASE)
+    words = value.split()
+    if len(words) == 3 and words[1].lower() in MONTHS:
+        value = f"{words[0]}.{MONTHS[words[1].lower()]}.{words[2]}"
+    try:
+        return date_parser.parse(value, dayfirst=not re.match(r"\d{4}-", value)).date().isoformat()
+    except (ValueError, OverflowError):
+        return None
+
+
+def _normalize_fio(value: str) -> str:
+    # "А.В.Смирнов" and "А. В. Смирнов" are written as "А.В. Смирнов"
+    value = re.sub(r"([А-ЯЁ]\.)\s+(?=[А-ЯЁ]\.)", r"\1", value)
+    return re.sub(r"([А-ЯЁ]\.)(?=[А-ЯЁ][а-яё])", r"\1 ", value)
+
+
+def _normalize_name(value: str) -> str:
+    return re.sub(r"[\W_]+", " ", value.casefold()).strip()
+
+
+class ProjectFacts(BaseModel):
+    """
+    Values found in a description by deterministic rules, without the LLM.
+    """
+
+    project_start_date: Optional[str] = None
+    project_start_order_form: Optional[str] = None
+    project_stages: list[ProjectStageOutline] = []
+    project_steering_committee: list[str] = []
+    team: dict[str, Union[str, list[str]]] = {}
+    people: list[str] = []
+    # Candidate values of fields the rules could not determine unambiguously, they
+    # are only shown to the LLM and never removed from the schema or applied
+    hints: dict[str, str] = {}
+
+    def is_empty(self) -> bool:
+        return not (
+            self.project_start_date
+            or self.project_start_order_form
+            or self.project_stages
+            or self.project_steering_committee
+            or self.team
+            or self.people
+            or self.hints
+        )
+
+    def to_prompt(self) -> str:
+        """Describe the facts for the LLM, empty if nothing was found."""
+        if self.is_empty():
+            return ""
+        lines = ["Достоверно установленные факты из описания (используйте их без изменений):"]
+        if self.project_start_date:
+            lines.append(f"- Дата начала проекта: {self.project_start_date}")
+        if self.project_start_order_form:
+            lines.append(f"- Поручение о старте проекта: {self.project_start_order_form}")
+        for stage in self.project_stages:
+            lines.append(
+                f"- Этап «{stage.stage_name}»: с {stage.stage_start_date} по {stage.stage_end_date}"
+            )
+        if self.project_steering_committee:
+            lines.append(f"- Управляющий комитет: {', '.join(self.project_steering_committee)}")
+        for field, value in self.team.items():
+            label = ProjectTeam.model_fields[field].description.split(":")[0]
+            lines.append(f"- {label}: {', '.join(value) if isinstance(value, list) else value}")
+        if self.people:
+            lines.append(f"- Упомянутые люди (ФИО в тексте): {', '.join(self.people)}")
+        if len(lines) == 1:
+            lines = []
+        if self.hints:
+            if lines:
+                lines.append("")
+            lines.append("Возможные значения из описания (проверьте их по тексту):")
+            lines.extend(f"- {label}: {value}" for label, value in self.hints.items())
+        return "\n".join(lines)
+
+    def _stage_fact(self, stage_name: str) -> Optional[ProjectStageOutline]:
+        name = _normalize_name(stage_name or "")
+        for stage in self.project_stages:
+            fact_name = _normalize_name(stage.stage_name)
+            if name and (name == fact_name or name in fact_name or fact_name in name):
+                return stage
+        return None
+
+    def apply(self, data: dict) -> dict:
+        """
+        Overwrite the fields of extracted data that the facts determine.
+
+        Args:
+            data: ProjectData as a dict, possibly incomplete
+
+        Returns:
+            A new dict with the facts applied
+        """
+        data = dict(data)
+        if self.project_start_date:
+            data["project_start_date"] = self.project_start_date
+        if self.project_start_order_form:
+            data["project_start_order_form"] = self.project_start_order_form
+        team = dict(data.get("project_team") or {})
+        if self.project_steering_committee:
+            data["project_steering_committee"] = list(self.project_steering_committee)
+            team["project_management_committee"] = list(self.project_steering_committee)
+        team.update(self.team)
+        data["project_team"] = team
+        if self.project_stages and isinstance(data.get("project_stages"), list):
+            stages = []
+            for stage in data["project_stages"]:
+                fact = self._stage_fact(stage.get("stage_name")) if isinstance(stage, dict) else None
+                if fact is not None:
+                    stage = {
+                        **stage,
+                        "stage_start_date": fact.stage_start_date,
+                        "stage_end_date": fact.stage_end_date,
+                    }
+                stages.append(stage)
+            data["project_stages"] = stages
+        return data
+
+
+def extract_facts(text: str) -> ProjectFacts:
+    """
+    Find dates, the start order form and team members with deterministic rules.
+
+    Only unambiguous patterns are used: full dates, stage lines of the form
+    "Название (дата – дата)", role lists of the form "Роль: ФИО" and explicit
+    written or oral orders. A field whose matches disagree, or whose date may
+    belong to a stage, is only passed to the LLM as a hint.
+
+    Args:
+        text: Text description of the project
+
+    Returns:
+        Facts found in the text
+    """
+    facts = {}
+    hints = {}
+
+    stages = []
+    for match in _STAGE_RE.finditer(text):
+        start, end = normalize_date(match["start"]), normalize_date(match["end"])
+        name = match["name"].strip(" *_:\t")
+        if start and end and name:
+            stages.append(
+                ProjectStageOutline(stage_name=name, stage_start_date=start, stage_end_date=end)
+            )
+    facts["project_stages"] = stages
+
+    start_dates, stage_start_dates = [], [stage.stage_start_date for stage in stages]
+    for match in _START_RE.finditer(text):
+        date = normalize_date(match["date"])
+        if date is None:
+            continue
+        if _STAGE_START_GAP_RE.search(match["gap"]):
+            stage_start_dates.append(date)
+        elif date not in start_dates:
+            start_dates.append(date)
+    if len(start_dates) == 1:
+        facts["project_start_date"] = start_dates[0]
+    elif start_dates:
+        hints["Дата начала проекта"] = " или ".join(start_dates)
+    elif stage_start_dates:
+        # The project usually starts with its first stage, but not necessarily
+        hints["Дата начала проекта"] = min(stage_start_dates)
+
+    order_forms = []
+    for match in _ORDER_FORM_RE.finditer(text):
+        kind = (match["before"] or match["after"]).lower()
+        order_form = "Письменное поручение" if kind.startswith("письменн") else "Устное поручение"
+        if order_form not in order_forms:
+            order_forms.append(order_form)
+    if len(order_forms) == 1:
+        facts["project_start_order_form"] = order_forms[0]
+    elif order_forms:
+        hints["Поручение о старте проекта"] = " или ".join(order_forms)
+
+    team = {}
+    # "представитель Владельца проекта" must not be read as the owner label
+    claimed: list[tuple[int, int]] = []
+    for field, pattern in _ROLE_RES:
+        found = []
+        for match in pattern.finditer(text):
+            if any(start <= match.start() < end for start, end in claimed):
+                continue
+            claimed.append(match.span())
+            if _SKIP_GAP_RE.search(match["gap"]):
+                continue
+            names = [_normalize_fio(name) for name in _FIO_RE.findall(match["names"])]
+            if names not in found:
+                found.append(names)
+        if len(found) > 1:
+            # The role is given to different people in different places
+            label = (
+                "Управляющий комитет"
+                if field == "project_steering_committee"
+                else ProjectTeam.model_fields[field].description.split(":")[0]
+            )
+            hints[label] = " или ".join(", ".join(names) for names in found)
+        elif field == "project_steering_committee" and found:
+            facts["project_steering_committee"] = found[0]
+        elif found:
+            team[field] = found[0] if field in _LIST_ROLES else found[0][0]
+    facts["team"] = team
+
+    people = {}
+    for name in _FIO_RE.findall(text):
+        name = _normalize_fio(name)
+        people.setdefault(name, None)
+    facts["people"] = list(people)
+    facts["hints"] = hints
+    return ProjectFacts(**facts)
+
+
+def _skipped(annotation, default) -> tuple:
+    return SkipJsonSchema[annotation], Field(default)
+
+
+@lru_cache(maxsize=64)
+def _schema_without(
+    schema: type[ProjectData], fields: frozenset[str], team_fields: frozenset[str]
+) -> type[ProjectData]:
+    overrides = {}
+    for field in fields:
+        annotation = schema.model_fields[field].annotation
+        overrides[field] = _skipped(annotation, [] if field == "project_steering_committee" else "")
+    if team_fields:
+        team_info = schema.model_fields["project_team"]
+        team_model = team_info.annotation
+        if team_fields >= set(team_model.model_fields):
+            overrides["project_team"] = (
+                SkipJsonSchema[team_model],
+                Field(default_factory=team_model),
+            )
+        else:
+            team_variant = create_model(
+                team_model.__name__,
+                __base__=team_model,
+                **{
+                    field: _skipped(
+                        team_model.model_fields[field].annotation,
+                        team_model.model_fields[field].default,
+                    )
+                    for field in team_fields
+                },
+            )
+            overrides["project_team"] = (team_variant, team_info)
+    return create_model(schema.__name__, __base__=schema, **overrides)
+
+
+def schema_without_facts(schema: type[ProjectData], facts: ProjectFacts) -> type[ProjectData]:
+    """
+    Remove the fields determined by the facts from the schema the LLM has to fill.
+
+    The removed fields keep placeholder defaults and are filled by `ProjectFacts.apply`,
+    so the model does not spend output tokens on them.
+
+    Args:
+        schema: ProjectData model sent to the LLM
+        facts: Facts found in the description
+
+    Returns:
+        A subclass of the schema without the determined fields, or the schema itself
+        if the facts determine none of them
+    """
+    fields = frozenset(
+        field
+        for field in ("project_start_date", "project_start_order_form", "project_steering_committee")
+        if getattr(facts, field)
+    )
+    team_fields = set(facts.team)
+    if facts.project_steering_committee:
+        team_fields.add("project_management_committee")
+    if not fields and not team_fields:
+        return schema
+    return _schema_without(schema, fields, frozenset(team_fields))
@@ -0,0 +1,224 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+import uuid
+from typing import Any, Callable, Iterator, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from extraction_models import ProjectData
+from stand_in import LatencyDistribution, ResponseSynthesizer, StandInConfig, StandInError
+
+
+class FakeProjectDataChatModel(BaseChatModel):
+    """
+    Offline chat model that answers structured output calls with prepared ProjectData payloads.
+
+    Responses are returned as tool calls, so the model works with the default
+    `with_structured_output` implementation of BaseChatModel and needs no network.
+    When streamed, the tool call arguments are sent as JSON in `chunk_size` pieces.
+    `response_factory` gets the prompt and the name of the requested tool, so one model
+    can serve requests for different schemas; `schema_factory` gets the prompt and the
+    JSON schema of the tool parameters instead. For load tests the delay can be drawn
+    from a distribution, errors injected at a rate and output generated at a fixed
+    token speed (see `from_stand_in`).
+    """
+
+    responses: list[dict] = []
+    response_factory: Optional[Callable[[str, str], dict]] = None
+    schema_factory: Optional[Callable[[str, dict], dict]] = None
+    latency: float = 0.0
+    latency_distribution: Optional[LatencyDistribution] = None
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+    chunk_size: int = 64
+    chunk_latency: float = 0.0
+    tool_name: str = ProjectData.__name__
+
+    _cycle: Iterator[dict] = PrivateAttr(default=None)
+    _random: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.responses and self.response_factory is None and self.schema_factory is None:
+            raise ValueError(
+                "Either responses, response_factory or schema_factory must be provided"
+            )
+        self._cycle = itertools.cycle(self.responses) if self.responses else None
+        self._random = random.Random(self.seed)
+
+    @classmethod
+    def from_stand_in(cls, config: StandInConfig) -> "FakeProjectDataChatModel":
+        """
+        Create a model answering any schema from recorded results.
+
+        Args:
+            config: Recordings directory, latency distribution, error rate and
+                generation speed
+
+        Returns:
+            Model with the same behaviour as the stand-in server
+        """
+        synthesizer = ResponseSynthesizer.from_directory(config.recordings, config.seed)
+        return cls(
+            schema_factory=lambda prompt, schema: synthesizer.synthesize(schema, prompt),
+            latency_distribution=config.latency,
+            tokens_per_second=config.tokens_per_second,
+            error_rate=config.error_rate,
+            seed=config.seed,
+            chunk_size=config.chunk_size,
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-project-data"
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        """Accept tool binding so that structured output can be requested."""
+        function = convert_to_openai_tool(tools[0])["function"]
+        return self.bind(
+            tool_name=function["name"], tool_schema=function["parameters"], **kwargs
+        )
+
+    def next_response(
+        self, prompt: str, tool_name: str, tool_schema: Optional[dict] = None
+    ) -> dict:
+        """
+        Get the payload for the given prompt.
+
+        Args:
+            prompt: Text of the last message sent to the model
+            tool_name: Name of the tool the model is asked to call
+            tool_schema: JSON schema of the tool parameters, ProjectData if not bound
+
+        Returns:
+            Arguments of the tool call that will be returned by the model
+        """
+        if self.response_factory is not None:
+            return self.response_factory(prompt, tool_name)
+        if self.schema_factory is not None:
+            if tool_schema is None:
+                tool_schema = convert_to_openai_tool(ProjectData)["function"]["parameters"]
+            return self.schema_factory(prompt, tool_schema)
+        return next(self._cycle)
+
+    def _delay(self) -> float:
+        """Delay before the response starts, raising the injected errors."""
+        delay = self.latency
+        if self.latency_distribution is not None:
+            delay += self.latency_distribution.sample(self._random)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise StandInError("Injected stand-in error")
+        return delay
+
+    def _generation_time(self, output_tokens: int) -> float:
+        return output_tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    @staticmethod
+    def _usage(prompt: str, output: str) -> dict:
+        # Rough estimate of 4 characters per token, enough for token accounting in tests
+        input_tokens = len(prompt) // 4
+        output_tokens = len(output) // 4
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        result = self._result(messages, **kwargs)
+        usage = result.generations[0].message.usage_metadata
+        if self.tokens_per_second:
+            time.sleep(self._generation_time(usage["output_tokens"]))
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        result = self._result(messages, **kwargs)
+        usage = result.generations[0].message.usage_metadata
+        if self.tokens_per_second:
+            await asyncio.sleep(self._generation_time(usage["output_tokens"]))
+        return result
+
+    def _result(self, messages: list[BaseMessage], **kwargs: Any) -> ChatResult:
+        prompt = messages[-1].content if messages else ""
+        tool_name = kwargs.get("tool_name", self.tool_name)
+        arguments = self.next_response(prompt, tool_name, kwargs.get("tool_schema"))
+        message = AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": tool_name,
+                    "args": arguments,
+                    "id": f"call_{uuid.uuid4().hex}",
+                }
+            ],
+            usage_metadata=self._usage(prompt, json.dumps(arguments, ensure_ascii=False)),
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+
+        prompt = messages[-1].content if messages else ""
+        tool_name = kwargs.get("tool_name", self.tool_name)
+        arguments = json.dumps(
+            self.next_response(prompt, tool_name, kwargs.get("tool_schema")),
+            ensure_ascii=False,
+        )
+        call_id = f"call_{uuid.uuid4().hex}"
+        for start in range(0, len(arguments), self.chunk_size):
+            piece = arguments[start : start + self.chunk_size]
+            chunk_latency = self.chunk_latency + self._generation_time(len(piece) / 4)
+            if chunk_latency:
+                time.sleep(chunk_latency)
+            first = start == 0
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {
+                        "name": tool_name if first else None,
+                        "args": piece,
+                        "id": call_id if first else None,
+                        "index": 0,
+                    }
+                ],
+            )
+            if run_manager:
+                run_manager.on_llm_new_token("", chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
@@ -0,0 +1,139 @@
+from typing import Optional, get_origin
+from pydantic import BaseModel
+from formatted_data import FormattedProjectData
+
+REQUIRED_PLACEHOLDER = "Обязательное поле"
+TEAM_GROUP = "Команда проекта"
+
+
+class FormField(BaseModel):
+    """
+    Editable field of the passport form.
+    """
+
+    name: str
+    label: str
+    multiline: bool = False
+    height: Optional[int] = None
+    placeholder: str = REQUIRED_PLACEHOLDER
+    required: bool = True
+    group: Optional[str] = None
+    # list[str] fields are edited as one item per line
+    is_list: bool = False
+
+
+# Display options of the FormattedProjectData fields, in the order of the form
+FIELD_OPTIONS: dict[str, dict] = {
+    "project_name": {"label": "Название проекта"},
+    "project_start_order_form": {"label": "Поручение о старте проекта"},
+    "project_goal": {"label": "Цель проекта", "multiline": True},
+    "project_result_vision": {"label": "Образ результата", "multiline": True},
+    "project_constraints_exclusions": {
+        "label": "Ограничения и исключения (каждое с новой строки)",
+        "multiline": True,
+    },
+    "project_risks_assumptions": {
+        "label": "Риски и допущения (каждое с новой строки)",
+        "multiline": True,
+    },
+    "project_stakeholders": {
+        "label": "Заинтересованные стороны (каждая с новой строки)",
+        "multiline": True,
+    },
+    "project_start_date": {"label": "Дата начала проекта", "placeholder": "ДД.ММ.ГГГГ"},
+    "project_end_date": {"label": "Даты окончания этапов", "multiline": True},
+    "project_stages_results": {
+        "label": "Этапы и результаты",
+        "multiline": True,
+        "height": 200,
+    },
+    "project_initiator": {"label": "Инициатор проекта", "group": TEAM_GROUP},
+    "project_owner": {"label": "Владелец проекта", "group": TEAM_GROUP},
+    "project_owner_representative": {
+        "label": "Представитель владельца проекта",
+        "group": TEAM_GROUP,
+    },
+    "project_leader": {"label": "Руководитель проекта", "group": TEAM_GROUP},
+    "management_team_curator": {"label": "Куратор команды управления", "group": TEAM_GROUP},
+    "project_manager": {"label": "Менеджер проекта", "group": TEAM_GROUP},
+    "strategy_portfolio_leader": {
+        "label": "Руководитель портфеля мероприятий Стратегии",
+        "group": TEAM_GROUP,
+    },
+    "strategy_event_leader": {"label": "Руководитель мероприятия Стратегии", "group": TEAM_GROUP},
+    "independent_experts": {
+        "label": "Независимые эксперты (каждый с новой строки)",
+        "placeholder": "Необязательное поле",
+        "required": False,
+        "group": TEAM_GROUP,
+    },
+    "project_steering_committee": {
+        "label": "Состав УКП (каждый с новой строки)",
+        "multiline": True,
+        "group": TEAM_GROUP,
+    },
+}
+
+
+def build_form_spec(model: type[BaseModel] = FormattedProjectData) -> list[FormField]:
+    """
+    Build the form fields from the model fields and their display options.
+
+    Fields without options are shown as required text areas labelled with the
+    field name, so a new model field appears in the form without code changes.
+
+    Args:
+        model: Model edited by the form
+
+    Returns:
+        Form fields in display order
+    """
+    names = [name for name in FIELD_OPTIONS if name in model.model_fields]
+    names += [name for name in model.model_fields if name not in FIELD_OPTIONS]
+    spec = []
+    for name in names:
+        is_list = get_origin(model.model_fields[name].annotation) is list
+        options = dict(FIELD_OPTIONS.get(name) or {"label": name, "multiline": True})
+        if is_list:
+            options["multiline"] = True
+        if options.get("multiline"):
+            options.setdefault("height", 100)
+        spec.append(FormField(name=name, is_list=is_list, **options))
+    return spec
+
+
+FORM_SPEC = build_form_spec()
+
+
+def form_values(spec: list[FormField], data: BaseModel) -> dict[str, str]:
+    """Get the text shown in every form widget."""
+    values = {}
+    for field in spec:
+        value = getattr(data, field.name)
+        values[field.name] = "\n".join(value) if field.is_list else value
+    return values
+
+
+def parse_form(spec: list[FormField], values: dict[str, str]) -> dict:
+    """Convert the submitted widget texts into model field values."""
+    parsed = {}
+    for field in spec:
+        value = values[field.name]
+        if field.is_list:
+            value = [item.strip() for item in value.split("\n") if item.strip()]
+        parsed[field.name] = value
+    return parsed
+
+
+def missing_fields(spec: list[FormField], values: dict[str, str]) -> list[FormField]:
+    """
+    Find the required fields left empty.
+
+    Args:
+        spec: Form fields
+        values: Submitted widget texts
+
+    Returns:
+        Required fields whose text is empty or only whitespace
+    """
+    return [field for field in spec if field.required and not values[field.name].strip()]
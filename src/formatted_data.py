@@ -1,5 +1,64 @@
+from functools import cached_property
+from typing import Iterable, Optional
 from pydantic import BaseModel
-from extraction_models import ProjectData
+from extraction_models import ProjectData, ProjectStage
+from metrics import timed
+
+NOT_SPECIFIED = "Не указан"
+
+# Team members in the order of the passport; labels are joined with the values by
+# one precompiled template instead of formatting every line
+TEAM_ROLES: tuple[tuple[str, str], ...] = (
+    ("project_initiator", "Инициатор проекта"),
+    ("project_owner", "Владелец проекта"),
+    ("project_owner_representative", "Представитель Владельца проекта"),
+    ("project_leader", "Руководитель проекта"),
+    ("management_team_curator", "Куратор команды управления"),
+    ("project_manager", "Менеджер проекта"),
+    ("strategy_portfolio_leader", "Руководитель портфеля мероприятий Стратегии"),
+    ("strategy_event_leader", "Руководитель мероприятия Стратегии"),
+)
+TEAM_FIELDS = frozenset(field for field, _ in TEAM_ROLES) | {"independent_experts"}
+_TEAM_TEMPLATE = "\n".join(f"{label}: {{}}" for _, label in TEAM_ROLES)
+_EXPERT_SEPARATOR = "\nНезависимый эксперт: "
+_RESULT_SEPARATOR = "\n• "
+
+
+def _format_results(stage: ProjectStage) -> str:
+    descriptions = [result.result_description for result in stage.smart_results]
+    return "• " + _RESULT_SEPARATOR.join(descriptions) if descriptions else ""
+
+
+def format_stages_results(stages: list[ProjectStage]) -> str:
+    """Format project stages and results."""
+    return "\n\n".join(
+        [
+            f"Этап №{i}\n{stage.stage_start_date}-{stage.stage_end_date}.\n"
+            f"{stage.stage_name}:\n{_format_results(stage)}"
+            for i, stage in enumerate(stages, 1)
+        ]
+    )
+
+
+def format_end_date(stages: list[ProjectStage]) -> str:
+    """Format project end dates based on stages."""
+    return "\n".join(
+        [f"Этап {i} – {stage.stage_end_date}" for i, stage in enumerate(stages, 1)]
+    )
+
+
+def format_team(values: Iterable[str], independent_experts: Optional[list[str]]) -> str:
+    """
+    Format project team into a string for template rendering.
+
+    Args:
+        values: Names of the members in the order of TEAM_ROLES
+        independent_experts: Names of the independent experts
+    """
+    text = _TEAM_TEMPLATE.format(*values)
+    if independent_experts:
+        text += _EXPERT_SEPARATOR + _EXPERT_SEPARATOR.join(independent_experts)
+    return text
 
 
 class FormattedProjectData(BaseModel):
@@ -28,6 +87,18 @@ class FormattedProjectData(BaseModel):
     strategy_event_leader: str
     independent_experts: list[str]
 
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        if name in TEAM_FIELDS:
+            # The memoized team string is built from this field
+            self.__dict__.pop("project_team", None)
+
+    def model_copy(self, *, update: Optional[dict] = None, deep: bool = False):
+        """Override model_copy to drop the team string memoized for the original."""
+        copied = super().model_copy(update=update, deep=deep)
+        copied.__dict__.pop("project_team", None)
+        return copied
+
     def model_dump(self) -> dict:
         """Override model_dump to include computed properties."""
         base_dict = super().model_dump()
@@ -35,32 +106,9 @@ class FormattedProjectData(BaseModel):
         return base_dict
 
     @classmethod
+    @timed("format")
     def from_project_data(cls, project_data: ProjectData) -> "FormattedProjectData":
         """Create formatted data from ProjectData."""
-
-        def format_stages_results(stages: list) -> str:
-            """Format project stages and results."""
-            result = []
-            for i, stage in enumerate(stages, 1):
-                stage_results = "\n".join(
-                    [f"• {result.result_description}" for result in stage.smart_results]
-                )
-                stage_text = (
-                    f"Этап №{i}\n"
-                    f"{stage.stage_start_date}-{stage.stage_end_date}.\n"
-                    f"{stage.stage_name}:\n"
-                    f"{stage_results}"
-                )
-                result.append(stage_text)
-            return "\n\n".join(result)
-
-        def format_end_date(stages: list) -> str:
-            """Format project end dates based on stages."""
-            result = []
-            for i, stage in enumerate(stages, 1):
-                result.append(f"Этап {i} – {stage.stage_end_date}")
-            return "\n".join(result)
-
         team = project_data.project_team
         return cls(
             project_name=project_data.project_name,
@@ -78,51 +126,27 @@ class FormattedProjectData(BaseModel):
             project_start_date=project_data.project_start_date,
             project_end_date=format_end_date(project_data.project_stages),
             project_stages_results=format_stages_results(project_data.project_stages),
-            project_initiator=team.project_initiator or "Не указан",
-            project_owner=team.project_owner or "Не указан",
+            project_initiator=team.project_initiator or NOT_SPECIFIED,
+            project_owner=team.project_owner or NOT_SPECIFIED,
             project_owner_representative=team.project_owner_representative
-            or "Не указан",
-            project_leader=team.project_leader or "Не указан",
-            management_team_curator=team.management_team_curator or "Не указан",
-            project_manager=team.project_manager or "Не указан",
-            strategy_portfolio_leader=team.strategy_portfolio_leader or "Не указан",
-            strategy_event_leader=team.strategy_event_leader or "Не указан",
-            independent_experts=team.independent_experts
-            if team.independent_experts
-            else [],
+            or NOT_SPECIFIED,
+            project_leader=team.project_leader or NOT_SPECIFIED,
+            management_team_curator=team.management_team_curator or NOT_SPECIFIED,
+            project_manager=team.project_manager or NOT_SPECIFIED,
+            strategy_portfolio_leader=team.strategy_portfolio_leader or NOT_SPECIFIED,
+            strategy_event_leader=team.strategy_event_leader or NOT_SPECIFIED,
+            independent_experts=list(team.independent_experts or []),
         )
 
-    @property
+    @cached_property
     def project_team(self) -> str:
-        """Format project team into a string for template rendering."""
+        """
+        Format project team into a string for template rendering.
 
-        def format_team_member(title: str, fullname: str) -> str:
-            return f"{title}: {fullname}"
-
-        team_formatted = [
-            format_team_member("Инициатор проекта", self.project_initiator),
-            format_team_member("Владелец проекта", self.project_owner),
-            format_team_member(
-                "Представитель Владельца проекта", self.project_owner_representative
-            ),
-            format_team_member("Руководитель проекта", self.project_leader),
-            format_team_member(
-                "Куратор команды управления", self.management_team_curator
-            ),
-            format_team_member("Менеджер проекта", self.project_manager),
-            format_team_member(
-                "Руководитель портфеля мероприятий Стратегии",
-                self.strategy_portfolio_leader,
-            ),
-            format_team_member(
-                "Руководитель мероприятия Стратегии", self.strategy_event_leader
-            ),
-        ]
-
-        if self.independent_experts:
-            for expert in self.independent_experts:
-                team_formatted.append(
-                    format_team_member("Независимый эксперт", f"{expert}")
-                )
-
-        return "\n".join(team_formatted)
+        The string is memoized and built again only after one of the team fields
+        is assigned, e.g. when a member is edited in the form. Changing the
+        independent_experts list in place is not detected, assign a new list instead.
+        """
+        return format_team(
+            [getattr(self, field) for field, _ in TEAM_ROLES], self.independent_experts
+        )
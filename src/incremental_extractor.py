@@ -0,0 +1,364 @@
+import difflib
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel, create_model
+
+from extraction_models import (
+    ProjectData,
+    ProjectOutline,
+    ProjectStage,
+    ProjectStageOutline,
+    StageResults,
+)
+from extraction_prompt import SECTION_PROMPT, STAGE_RESULTS_PROMPT
+from formatted_data import FormattedProjectData
+from metrics import increment, llm_config, timed
+from resilience import ResilientCaller
+
+# Fields of ProjectData extracted together when a paragraph about them changes
+SECTION_FIELDS: dict[str, tuple[str, ...]] = {
+    "general": (
+        "project_name",
+        "project_start_order_form",
+        "project_goal",
+        "project_result_vision",
+    ),
+    "team": ("project_stakeholders", "project_steering_committee", "project_team"),
+    "stages": ("project_start_date", "project_stages"),
+    "risks": ("project_constraints_exclusions", "project_risks_assumptions"),
+}
+
+# Words that tie a paragraph to a section, a paragraph may belong to several sections
+SECTION_PATTERNS: dict[str, re.Pattern] = {
+    "general": re.compile(
+        r"назван|наименован|поручен|цел[ьию]|задач|результат|направлен", re.IGNORECASE
+    ),
+    "team": re.compile(
+        r"инициир|инициатор|владел|руковод|куратор|менеджер|эксперт|команд|комитет|"
+        r"УКП|заинтересован|стейкхолдер|представител|[А-ЯЁ]\.\s?[А-ЯЁ]\.",
+        re.IGNORECASE,
+    ),
+    "stages": re.compile(
+        r"этап|срок|старт|начал|оконч|заверш|квартал|\d{1,2}\.\d{1,2}\.\d{2,4}|"
+        r"\d{4}-\d{2}-\d{2}|\b20\d{2}\b",
+        re.IGNORECASE,
+    ),
+    "risks": re.compile(r"риск|допущени|ограничени|исключени", re.IGNORECASE),
+}
+
+# Unattributed paragraphs shorter than this are ignored instead of forcing a full extraction
+MIN_UNATTRIBUTED_WORDS = 4
+
+
+def _section_model(section: str, fields: tuple[str, ...]) -> type[BaseModel]:
+    # Stages are extracted without results, results of changed stages are generated
+    # separately, so the fields are taken from the outline
+    return create_model(
+        f"Project{section.title()}Section",
+        __doc__=f"Модель для части полей описания проекта ({section}).",
+        **{
+            field: (
+                ProjectOutline.model_fields[field].annotation,
+                ProjectOutline.model_fields[field],
+            )
+            for field in fields
+        },
+    )
+
+
+SECTION_MODELS: dict[str, type[BaseModel]] = {
+    section: _section_model(section, fields) for section, fields in SECTION_FIELDS.items()
+}
+
+
+def _section_prompt(fields: tuple[str, ...]) -> str:
+    # The full prompt describes every field and SMART results, a section prompt
+    # only the fields the section model asks for
+    return SECTION_PROMPT.format(
+        fields="\n".join(
+            f"- {field}: {ProjectOutline.model_fields[field].description}" for field in fields
+        )
+    )
+
+
+SECTION_PROMPTS: dict[str, str] = {
+    section: _section_prompt(fields) for section, fields in SECTION_FIELDS.items()
+}
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r"[\W_]+", " ", value.casefold()).strip()
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Split text into non-empty paragraphs separated by blank lines."""
+    return [
+        paragraph.strip()
+        for paragraph in re.split(r"\n\s*\n", text)
+        if paragraph.strip()
+    ]
+
+
+def diff_paragraphs(previous_text: str, text: str) -> tuple[list[str], list[str]]:
+    """
+    Find the paragraphs that differ between two versions of a description.
+
+    Paragraphs are compared ignoring case, punctuation and whitespace.
+
+    Args:
+        previous_text: Description the previous extraction was made from
+        text: Edited description
+
+    Returns:
+        Paragraphs of the previous version that were changed or removed, and
+        paragraphs of the new version that were changed or added
+    """
+    previous = split_paragraphs(previous_text)
+    current = split_paragraphs(text)
+    matcher = difflib.SequenceMatcher(
+        None,
+        [_normalize(paragraph) for paragraph in previous],
+        [_normalize(paragraph) for paragraph in current],
+        autojunk=False,
+    )
+    removed, added = [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            removed.extend(previous[i1:i2])
+            added.extend(current[j1:j2])
+    return removed, added
+
+
+def affected_sections(paragraphs: list[str]) -> Optional[set[str]]:
+    """
+    Find the sections of ProjectData that the paragraphs are about.
+
+    Args:
+        paragraphs: Changed paragraphs
+
+    Returns:
+        Names of the sections, or None if some paragraph cannot be attributed to
+        any section and everything has to be extracted again
+    """
+    sections = set()
+    for paragraph in paragraphs:
+        matched = {
+            section
+            for section, pattern in SECTION_PATTERNS.items()
+            if pattern.search(paragraph)
+        }
+        if not matched:
+            # Headings and separators do not change the data
+            if len(_normalize(paragraph).split()) < MIN_UNATTRIBUTED_WORDS:
+                continue
+            return None
+        sections |= matched
+    return sections
+
+
+def _mentions(paragraph: str, stage_name: str) -> bool:
+    """Check whether the stage name occurs in the paragraph."""
+    name = _normalize(stage_name)
+    return bool(name) and f" {name} " in f" {_normalize(paragraph)} "
+
+
+def keep_manual_edits(
+    extracted: FormattedProjectData,
+    edited: FormattedProjectData,
+    updated: FormattedProjectData,
+) -> FormattedProjectData:
+    """
+    Apply a new extraction result without losing the fields the user edited by hand.
+
+    Args:
+        extracted: Formatted data of the previous extraction, as shown before editing
+        edited: The same data after the user's edits
+        updated: Formatted data of the new extraction
+
+    Returns:
+        The new data with every field the user changed taken from `edited`
+    """
+    return updated.model_copy(
+        update={
+            field: getattr(edited, field)
+            for field in FormattedProjectData.model_fields
+            if getattr(edited, field) != getattr(extracted, field)
+        }
+    )
+
+
+class IncrementalProjectDataExtractor:
+    """
+    Class for updating extracted project data after the description was edited.
+
+    The changed paragraphs are attributed to sections of ProjectData (general
+    information, team, stages, risks) and only those sections are extracted again.
+    SMART results, which make up most of the output, are generated only for the
+    stages whose paragraphs changed; the other stages keep their previous results.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        max_workers: int = 4,
+        resilience: Optional[ResilientCaller] = None,
+        max_changed_share: float = 0.5,
+    ):
+        """
+        Initialize the extractor with LLM.
+
+        Args:
+            llm: LLM model - LLM must support structured decoding.
+            max_workers: Maximum number of sections and stages processed concurrently
+            resilience: Optional retry, deadline and hedging policy for LLM calls
+            max_changed_share: Share of the text that may change, in characters,
+                before a full extraction is preferred
+        """
+        self.llm = llm
+        self.section_llms = {
+            section: llm.with_structured_output(model)
+            for section, model in SECTION_MODELS.items()
+        }
+        self.stage_results_llm = llm.with_structured_output(StageResults)
+        self.max_workers = max_workers
+        self.resilience = resilience
+        self.max_changed_share = max_changed_share
+
+    def _invoke(self, structured_llm: Runnable, prompt: str):
+        """Make a structured LLM call, under the resilience policy if configured."""
+
+        def call():
+            result = structured_llm.invoke(prompt, config=llm_config())
+            if result is None:
+                raise OutputParserException("Model did not return structured output")
+            return result
+
+        return self.resilience.call(call) if self.resilience else call()
+
+    def changed_sections(self, previous_text: str, text: str) -> Optional[set[str]]:
+        """
+        Decide which sections have to be extracted again.
+
+        Args:
+            previous_text: Description the previous extraction was made from
+            text: Edited description
+
+        Returns:
+            Names of the sections, empty if nothing changed, or None if the edit is
+            too large or unclear and a full extraction is needed
+        """
+        removed, added = diff_paragraphs(previous_text, text)
+        if not removed and not added:
+            return set()
+        if sum(len(paragraph) for paragraph in added) > self.max_changed_share * len(text):
+            return None
+        return affected_sections(removed + added)
+
+    def _extract_section(self, section: str, text_description: str) -> dict:
+        prompt = f"{SECTION_PROMPTS[section]}\n\n{text_description}"
+        result = self._invoke(self.section_llms[section], prompt)
+        return {field: getattr(result, field) for field in SECTION_FIELDS[section]}
+
+    def _extract_stage_results(
+        self, text_description: str, stage: ProjectStageOutline
+    ) -> StageResults:
+        instructions = STAGE_RESULTS_PROMPT.format(
+            stage_name=stage.stage_name,
+            stage_start_date=stage.stage_start_date,
+            stage_end_date=stage.stage_end_date,
+        )
+        return self._invoke(self.stage_results_llm, f"{instructions}\n\n{text_description}")
+
+    def _update_stages(
+        self,
+        executor: ThreadPoolExecutor,
+        text_description: str,
+        previous_stages: list[ProjectStage],
+        changed: list[str],
+    ) -> dict:
+        update = self._extract_section("stages", text_description)
+        outlines: list[ProjectStageOutline] = update["project_stages"]
+        previous = {_normalize(stage.stage_name): stage for stage in previous_stages}
+        stage_names = [stage.stage_name for stage in outlines + previous_stages]
+        # A changed paragraph that names no stage may hold results of any stage
+        regenerate_all = any(
+            not any(_mentions(paragraph, name) for name in stage_names)
+            for paragraph in changed
+            if SECTION_PATTERNS["stages"].search(paragraph)
+        )
+
+        def results(stage: ProjectStageOutline) -> list:
+            old = previous.get(_normalize(stage.stage_name))
+            if (
+                not regenerate_all
+                and old is not None
+                and (old.stage_start_date, old.stage_end_date)
+                == (stage.stage_start_date, stage.stage_end_date)
+                and not any(_mentions(paragraph, stage.stage_name) for paragraph in changed)
+            ):
+                return old.smart_results
+            increment("incremental_stage_results")
+            return self._extract_stage_results(text_description, stage).smart_results
+
+        update["project_stages"] = [
+            ProjectStage(**stage.model_dump(), smart_results=smart_results)
+            for stage, smart_results in zip(outlines, executor.map(results, outlines))
+        ]
+        return update
+
+    @timed("extract")
+    def extract_update(
+        self, previous_text: str, previous_data: ProjectData, text_description: str
+    ) -> Optional[ProjectData]:
+        """
+        Update project data extracted from a previous version of the description.
+
+        Args:
+            previous_text: Description `previous_data` was extracted from
+            previous_data: Result of the previous extraction
+            text_description: Edited description
+
+        Returns:
+            Updated ProjectData, or None if the edit needs a full extraction
+
+        Raises:
+            ValueError: If there's an error in the extraction process
+        """
+        sections = self.changed_sections(previous_text, text_description)
+        if sections is None:
+            increment("incremental_extractions", mode="full")
+            return None
+        if not sections:
+            increment("incremental_extractions", mode="unchanged")
+            return previous_data
+        logging.info(f"Re-extracting sections: {', '.join(sorted(sections))}")
+        removed, added = diff_paragraphs(previous_text, text_description)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._extract_section, section, text_description)
+                    for section in sections - {"stages"}
+                ]
+                update = {}
+                if "stages" in sections:
+                    # The outline runs alongside the other sections, stage results after it
+                    update.update(
+                        self._update_stages(
+                            executor,
+                            text_description,
+                            previous_data.project_stages,
+                            removed + added,
+                        )
+                    )
+                for future in futures:
+                    update.update(future.result())
+        except Exception as e:
+            raise ValueError("Error during extraction") from e
+        increment("incremental_extractions", mode="partial")
+        return previous_data.model_copy(update=update)
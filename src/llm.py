@@ -0,0 +1,243 @@
+import threading
+from typing import Optional
+
+from langchain_core.language_models import BaseChatModel
+
+from backend_config import BackendConfig
+from extraction_cache import BaseExtractionCache
+from extractor import ProjectDataExtractor
+from incremental_extractor import IncrementalProjectDataExtractor
+from llm_router import RoutedChatModel, RouterBackend, create_chat_model
+from resilience import ResiliencePolicy, ResilientCaller
+from settings import settings
+from two_phase_extractor import TwoPhaseProjectDataExtractor
+
+# Clients and extractors are shared by every session of the process, so the
+# structured output schema and HTTP connections are set up only once per settings.
+_registry_lock = threading.Lock()
+_llm_registry: dict[tuple, BaseChatModel] = {}
+_extractor_registry: dict[tuple, object] = {}
+_resilience_registry: dict[tuple, ResilientCaller] = {}
+
+
+def create_llm(
+    api_key: str,
+    model_name: str,
+    temperature: float,
+    max_connections: int = 20,
+    keepalive_expiry: float = 60.0,
+    timeout: Optional[float] = None,
+    base_url: Optional[str] = None,
+) -> BaseChatModel:
+    """
+    Create an LLM client with a pooled keep-alive HTTP connection.
+
+    Args:
+        api_key: API key of the provider
+        model_name: Name of the model
+        temperature: Sampling temperature
+        max_connections: Size of the HTTP connection pool
+        keepalive_expiry: Seconds an idle connection is kept open
+        timeout: HTTP timeout of a request in seconds
+        base_url: URL of an OpenAI-compatible endpoint, None for the Groq API,
+            "stand-in://..." for the offline stand-in model
+
+    Returns:
+        Chat model ready for structured decoding
+    """
+    return create_chat_model(
+        "openai" if base_url else "groq",
+        api_key,
+        model_name,
+        temperature,
+        base_url,
+        max_connections,
+        keepalive_expiry,
+        timeout,
+    )
+
+
+def _llm_key() -> tuple:
+    return (
+        settings.openai_api_key,
+        settings.openai_base_url,
+        settings.openai_model,
+        settings.openai_temperature,
+        tuple(backend.model_dump_json() for backend in settings.llm_backends),
+        settings.llm_max_connections,
+        settings.llm_keepalive_expiry,
+        settings.llm_timeout,
+    )
+
+
+def _create_routed_llm(backends: list[BackendConfig]) -> BaseChatModel:
+    """Create a client for every configured backend and route requests between them."""
+    return RoutedChatModel(
+        backends=[
+            RouterBackend(
+                backend.name,
+                create_chat_model(
+                    backend.provider,
+                    backend.api_key or settings.openai_api_key,
+                    backend.model,
+                    (
+                        settings.openai_temperature
+                        if backend.temperature is None
+                        else backend.temperature
+                    ),
+                    backend.base_url,
+                    settings.llm_max_connections,
+                    settings.llm_keepalive_expiry,
+                    settings.llm_timeout,
+                ),
+                backend.max_concurrency,
+            )
+            for backend in backends
+        ]
+    )
+
+
+def _resilience_key() -> tuple:
+    return (
+        settings.llm_timeout,
+        settings.llm_max_retries,
+        settings.llm_backoff_base,
+        settings.llm_backoff_max,
+        settings.llm_hedge_percentile,
+        settings.llm_hedge_min_samples,
+        settings.llm_circuit_failure_threshold,
+        settings.llm_circuit_reset_timeout,
+    )
+
+
+def init_llm() -> BaseChatModel:
+    """Get the LLM model for the current settings, creating it on first use."""
+    key = _llm_key()
+    with _registry_lock:
+        llm = _llm_registry.get(key)
+        if llm is None:
+            if settings.llm_backends:
+                llm = _create_routed_llm(settings.llm_backends)
+            else:
+                llm = create_llm(
+                    settings.openai_api_key,
+                    settings.openai_model,
+                    settings.openai_temperature,
+                    settings.llm_max_connections,
+                    settings.llm_keepalive_expiry,
+                    settings.llm_timeout,
+                    settings.openai_base_url,
+                )
+            _llm_registry[key] = llm
+        return llm
+
+
+def get_resilience() -> ResilientCaller:
+    """
+    Get the LLM call policy for the current settings, creating it on first use.
+
+    The policy is shared, so all extractors see the same latency history and circuit state.
+    """
+    key = _resilience_key()
+    with _registry_lock:
+        resilience = _resilience_registry.get(key)
+        if resilience is None:
+            resilience = ResilientCaller(
+                ResiliencePolicy(
+                    timeout=settings.llm_timeout,
+                    max_retries=settings.llm_max_retries,
+                    backoff_base=settings.llm_backoff_base,
+                    backoff_max=settings.llm_backoff_max,
+                    hedge_percentile=settings.llm_hedge_percentile,
+                    hedge_min_samples=settings.llm_hedge_min_samples,
+                    circuit_failure_threshold=settings.llm_circuit_failure_threshold,
+                    circuit_reset_timeout=settings.llm_circuit_reset_timeout,
+                )
+            )
+            _resilience_registry[key] = resilience
+        return resilience
+
+
+def get_extractor(cache: Optional[BaseExtractionCache] = None) -> ProjectDataExtractor:
+    """
+    Get the extractor for the current settings, creating it on first use.
+
+    Args:
+        cache: Optional cache of extraction results used by the extractor
+
+    Returns:
+        ProjectDataExtractor set up once per settings and bound to the cache
+    """
+    llm = init_llm()
+    resilience = get_resilience()
+    key = (
+        _llm_key(),
+        _resilience_key(),
+        settings.extraction_repair_attempts,
+        settings.extraction_schema_mode,
+        settings.extraction_rule_facts,
+    )
+    with _registry_lock:
+        extractor = _extractor_registry.get(key)
+        if extractor is None:
+            # The registry does not hold caches, every caller gets its own binding
+            extractor = ProjectDataExtractor(
+                llm,
+                None,
+                resilience,
+                settings.extraction_repair_attempts,
+                settings.extraction_schema_mode,
+                settings.extraction_rule_facts,
+            )
+            _extractor_registry[key] = extractor
+    return extractor.with_cache(cache) if cache is not None else extractor
+
+
+def get_two_phase_extractor() -> TwoPhaseProjectDataExtractor:
+    """Get the two-phase extractor for the current settings, creating it on first use."""
+    llm = init_llm()
+    resilience = get_resilience()
+    key = (
+        _llm_key(),
+        _resilience_key(),
+        "two_phase",
+        settings.extraction_max_workers,
+        settings.extraction_schema_mode,
+        settings.extraction_rule_facts,
+    )
+    with _registry_lock:
+        extractor = _extractor_registry.get(key)
+        if extractor is None:
+            extractor = TwoPhaseProjectDataExtractor(
+                llm,
+                settings.extraction_max_workers,
+                resilience,
+                settings.extraction_schema_mode,
+                settings.extraction_rule_facts,
+            )
+            _extractor_registry[key] = extractor
+        return extractor
+
+
+def get_incremental_extractor() -> IncrementalProjectDataExtractor:
+    """Get the extractor of edited descriptions for the current settings, creating it on first use."""
+    llm = init_llm()
+    resilience = get_resilience()
+    key = (
+        _llm_key(),
+        _resilience_key(),
+        "incremental",
+        settings.extraction_max_workers,
+        settings.incremental_max_changed_share,
+    )
+    with _registry_lock:
+        extractor = _extractor_registry.get(key)
+        if extractor is None:
+            extractor = IncrementalProjectDataExtractor(
+                llm,
+                settings.extraction_max_workers,
+                resilience,
+                settings.incremental_max_changed_share,
+            )
+            _extractor_registry[key] = extractor
+        return extractor
@@ -0,0 +1,325 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator, Optional
+
+import httpx
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_groq import ChatGroq
+from langchain_openai import ChatOpenAI
+from pydantic import ConfigDict, PrivateAttr
+
+from metrics import increment, observe
+from resilience import TRANSIENT_ERRORS
+
+
+def create_chat_model(
+    provider: str,
+    api_key: str,
+    model_name: str,
+    temperature: float,
+    base_url: Optional[str] = None,
+    max_connections: int = 20,
+    keepalive_expiry: float = 60.0,
+    timeout: Optional[float] = None,
+) -> BaseChatModel:
+    """
+    Create a chat model client with a pooled keep-alive HTTP connection.
+
+    Args:
+        provider: "groq" for the Groq API or "openai" for any OpenAI-compatible endpoint
+        api_key: API key of the provider
+        model_name: Name of the model
+        temperature: Sampling temperature
+        base_url: Base URL of the API, None for the provider default; a
+            "stand-in://" URL returns the offline stand-in model (see stand_in.py)
+        max_connections: Size of the HTTP connection pool
+        keepalive_expiry: Seconds an idle connection is kept open
+        timeout: HTTP timeout of a request in seconds
+
+    Returns:
+        Chat model ready for structured decoding
+    """
+    if base_url and base_url.startswith("stand-in://"):
+        # The stand-in is only loaded when it is configured
+        from fake_llm import FakeProjectDataChatModel
+        from stand_in import parse_stand_in_url
+
+        return FakeProjectDataChatModel.from_stand_in(parse_stand_in_url(base_url))
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    # Retries are made by ResilientCaller, which also retries invalid structured output
+    common = dict(
+        api_key=api_key,
+        model_name=model_name,
+        temperature=temperature,
+        max_retries=0,
+        request_timeout=timeout,
+        http_client=httpx.Client(limits=limits),
+        http_async_client=httpx.AsyncClient(limits=limits),
+    )
+    if provider == "openai":
+        return ChatOpenAI(base_url=base_url, **common)
+    if provider == "groq":
+        return ChatGroq(groq_api_base=base_url, **common)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+class RouterBackend:
+    """
+    Chat model of one provider together with the statistics used for routing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        llm: BaseChatModel,
+        max_concurrency: int = 8,
+        window: int = 100,
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            name: Name of the backend used in metrics
+            llm: Chat model of the provider
+            max_concurrency: Number of requests in flight above which the backend
+                is only used when every other backend is saturated too
+            window: Number of recent requests the statistics are computed over
+        """
+        self.name = name
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile of recent successful requests, None before the first one."""
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[int(q * (len(latencies) - 1))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def score(self) -> float:
+        """
+        Expected time to serve one more request, lower is better.
+
+        A backend without observations scores 0, so every backend is tried early on.
+        """
+        p50 = self.percentile(0.5)
+        if p50 is None:
+            return 0.0
+        expected = p50 + 0.25 * (self.percentile(0.95) - p50)
+        load = 1 + self.in_flight / self.max_concurrency
+        return expected * load / max(0.05, 1 - self.error_rate)
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that sends every request to the best of several provider backends.
+
+    Backends are ranked by observed p50/p95 latency, error rate and the number of
+    requests in flight, so load spreads across providers and throughput is not bound
+    by the rate limit of one of them. A backend that fails with a transient error is
+    put on a cooldown and the request fails over to the next backend.
+    """
+
+    backends: list[RouterBackend]
+    failure_cooldown: float = 5.0
+    max_cooldown: float = 60.0
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _bound: dict[tuple, Runnable] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.backends:
+            raise ValueError("At least one backend must be provided")
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    @property
+    def model_name(self) -> str:
+        """Names of the backends, used in cache keys."""
+        return "+".join(backend.name for backend in self.backends)
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        """Accept tool binding; the tools are bound to the chosen backend per request."""
+        return self.bind(tools=tools, **kwargs)
+
+    def _acquire(self, tried: list[RouterBackend]) -> tuple[RouterBackend, float]:
+        """
+        Pick the best backend not tried yet for the request and count it as in flight.
+
+        Backends on cooldown come last, then saturated ones, the rest by score.
+        """
+        now = time.monotonic()
+        with self._lock:
+            backend = min(
+                (backend for backend in self.backends if backend not in tried),
+                key=lambda backend: (
+                    backend.cooldown_until > now,
+                    backend.in_flight >= backend.max_concurrency,
+                    backend.score(),
+                ),
+            )
+            backend.in_flight += 1
+        tried.append(backend)
+        return backend, time.perf_counter()
+
+    def _release(self, backend: RouterBackend) -> None:
+        with self._lock:
+            backend.in_flight -= 1
+
+    def _finish(self, backend: RouterBackend, started: float, ok: bool) -> None:
+        duration = time.perf_counter() - started
+        with self._lock:
+            backend.in_flight -= 1
+            backend.outcomes.append(ok)
+            if ok:
+                backend.latencies.append(duration)
+                backend.consecutive_failures = 0
+                backend.cooldown_until = 0.0
+            else:
+                backend.consecutive_failures += 1
+                backend.cooldown_until = time.monotonic() + min(
+                    self.max_cooldown,
+                    self.failure_cooldown * 2 ** (backend.consecutive_failures - 1),
+                )
+        status = "ok" if ok else "error"
+        increment("llm_backend_requests", backend=backend.name, status=status)
+        if ok:
+            observe("llm_backend_latency_seconds", duration, backend=backend.name)
+
+    def _runnable(self, backend: RouterBackend, kwargs: dict):
+        """Backend model with the tools and options of the request bound to it."""
+        kwargs = dict(kwargs)
+        # Only meaningful to the tracing of the outer call
+        kwargs.pop("structured_output_format", None)
+        tools = kwargs.pop("tools", None)
+        if not tools:
+            return backend.llm.bind(**kwargs) if kwargs else backend.llm
+        # Converting the schema to a tool definition is costly, so bindings are reused.
+        # Schemas built on the fly (e.g. for repairs) would grow the cache forever, so
+        # it is simply reset when it gets large.
+        try:
+            key = (backend.name, tuple(tools), repr(sorted(kwargs.items())))
+            runnable = self._bound.get(key)
+        except TypeError:
+            return backend.llm.bind_tools(tools, **kwargs)
+        if runnable is None:
+            runnable = backend.llm.bind_tools(tools, **kwargs)
+            with self._lock:
+                if len(self._bound) >= 64:
+                    self._bound.clear()
+                self._bound[key] = runnable
+        return runnable
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tried: list[RouterBackend] = []
+        while True:
+            backend, started = self._acquire(tried)
+            try:
+                message = self._runnable(backend, kwargs).invoke(messages, stop=stop)
+            except TRANSIENT_ERRORS:
+                self._finish(backend, started, ok=False)
+                if len(tried) == len(self.backends):
+                    raise
+                increment("llm_failovers", backend=backend.name)
+                continue
+            except Exception:
+                # Not the provider's fault, another backend would fail the same way
+                self._release(backend)
+                raise
+            self._finish(backend, started, ok=True)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tried: list[RouterBackend] = []
+        while True:
+            backend, started = self._acquire(tried)
+            try:
+                message = await self._runnable(backend, kwargs).ainvoke(
+                    messages, stop=stop
+                )
+            except TRANSIENT_ERRORS:
+                self._finish(backend, started, ok=False)
+                if len(tried) == len(self.backends):
+                    raise
+                increment("llm_failovers", backend=backend.name)
+                continue
+            except Exception:
+                self._release(backend)
+                raise
+            self._finish(backend, started, ok=True)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tried: list[RouterBackend] = []
+        while True:
+            backend, started = self._acquire(tried)
+            streamed = False
+            ok: Optional[bool] = None
+            try:
+                for chunk in self._runnable(backend, kwargs).stream(messages, stop=stop):
+                    streamed = True
+                    generation = ChatGenerationChunk(message=chunk)
+                    if run_manager:
+                        run_manager.on_llm_new_token("", chunk=generation)
+                    yield generation
+                ok = True
+            except TRANSIENT_ERRORS:
+                ok = False
+                # Output already sent to the caller cannot be taken back
+                if streamed or len(tried) == len(self.backends):
+                    raise
+                increment("llm_failovers", backend=backend.name)
+                continue
+            finally:
+                # Other errors and a consumer that stops reading (GeneratorExit is
+                # not an Exception) say nothing about the backend, the slot is freed
+                if ok is None:
+                    self._release(backend)
+                else:
+                    self._finish(backend, started, ok=ok)
+            return
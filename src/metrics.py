@@ -0,0 +1,266 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+METRICS_PREFIX = "passport"
+
+
+def escape_label_value(value: Any) -> str:
+    """Escape a label value for the Prometheus text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters and summaries that also writes every event as a JSON line.
+    """
+
+    def __init__(self, jsonl_path: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            jsonl_path: Path of the JSON-lines event log, None disables the log
+        """
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._summaries: dict[str, dict[tuple, list[float]]] = {}
+        self._event_logger = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+            handler = logging.FileHandler(jsonl_path, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._event_logger = logging.getLogger(f"{METRICS_PREFIX}.metrics")
+            self._event_logger.handlers = [handler]
+            self._event_logger.setLevel(logging.INFO)
+            self._event_logger.propagate = False
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add a value to a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add an observation to a summary."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            summary = self._summaries.setdefault(name, {}).setdefault(key, [0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+
+    def log_event(self, event: str, **fields: Any) -> None:
+        """Write an event to the JSON-lines log."""
+        if self._event_logger is None:
+            return
+        record = {"ts": time.time(), "event": event, **fields}
+        self._event_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+
+        def format_labels(key: tuple) -> str:
+            if not key:
+                return ""
+            return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in key) + "}"
+
+        lines = []
+        with self._lock:
+            for name, values in sorted(self._counters.items()):
+                metric = f"{METRICS_PREFIX}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{metric}{format_labels(key)} {value}")
+            for name, values in sorted(self._summaries.items()):
+                metric = f"{METRICS_PREFIX}_{name}"
+                lines.append(f"# TYPE {metric} summary")
+                for key, (count, total) in sorted(values.items()):
+                    lines.append(f"{metric}_count{format_labels(key)} {count}")
+                    lines.append(f"{metric}_sum{format_labels(key)} {total}")
+        return "\n".join(lines) + "\n"
+
+
+# None means instrumentation is disabled, so decorated functions only pay for one check
+_registry: Optional[MetricsRegistry] = None
+
+
+def configure_metrics(
+    jsonl_path: Optional[str] = None, port: Optional[int] = None
+) -> MetricsRegistry:
+    """
+    Enable instrumentation for the process.
+
+    Args:
+        jsonl_path: Path of the JSON-lines event log, None disables the log
+        port: Port of the Prometheus text endpoint, None disables the endpoint
+
+    Returns:
+        The active MetricsRegistry
+    """
+    global _registry
+    _registry = MetricsRegistry(jsonl_path)
+    if port is not None:
+        start_metrics_server(port)
+    return _registry
+
+
+def get_registry() -> Optional[MetricsRegistry]:
+    """Get the active registry or None if instrumentation is disabled."""
+    return _registry
+
+
+def timed(stage: str):
+    """
+    Decorator that records wall time and status of a pipeline stage.
+
+    Args:
+        stage: Name of the stage used as a metric label
+    """
+
+    def decorator(func):
+        def record(registry: MetricsRegistry, started: float, status: str) -> None:
+            duration = time.perf_counter() - started
+            registry.observe(
+                "stage_duration_seconds", duration, stage=stage, status=status
+            )
+            registry.log_event(
+                "stage", stage=stage, status=status, duration_ms=duration * 1000
+            )
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                registry = _registry
+                if registry is None:
+                    return await func(*args, **kwargs)
+
+                started = time.perf_counter()
+                status = "ok"
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    status = "error"
+                    raise
+                finally:
+                    record(registry, started, status)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = _registry
+            if registry is None:
+                return func(*args, **kwargs)
+
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                record(registry, started, status)
+
+        return wrapper
+
+    return decorator
+
+
+def increment(name: str, value: float = 1, **labels: str) -> None:
+    """Add a value to a counter and log it, if instrumentation is enabled."""
+    registry = _registry
+    if registry is None:
+        return
+    registry.increment(name, value, **labels)
+    registry.log_event(name, value=value, **labels)
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    """Add an observation to a summary and log it, if instrumentation is enabled."""
+    registry = _registry
+    if registry is None:
+        return
+    registry.observe(name, value, **labels)
+    registry.log_event(name, value=value, **labels)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler that records token usage and retries of LLM calls.
+    """
+
+    def on_retry(self, retry_state: Any, **kwargs: Any) -> None:
+        increment("llm_retries")
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        registry = _registry
+        if registry is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                input_tokens = usage.get("input_tokens", 0)
+                output_tokens = usage.get("output_tokens", 0)
+                registry.increment("llm_tokens", input_tokens, type="prompt")
+                registry.increment("llm_tokens", output_tokens, type="completion")
+                registry.log_event(
+                    "llm_tokens",
+                    prompt_tokens=input_tokens,
+                    completion_tokens=output_tokens,
+                )
+
+
+_callback_handler = MetricsCallbackHandler()
+
+
+def llm_config() -> Optional[dict]:
+    """Runnable config that attaches the token usage handler when instrumentation is enabled."""
+    if _registry is None:
+        return None
+    return {"callbacks": [_callback_handler]}
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        registry = _registry
+        if self.path != "/metrics" or registry is None:
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer:
+    """
+    Serve the metrics at http://0.0.0.0:<port>/metrics from a daemon thread.
+
+    Args:
+        port: Port to listen on
+
+    Returns:
+        The running server
+    """
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,143 @@
+import re
+import threading
+import zlib
+from typing import Hashable, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+# Prime larger than every 32-bit shingle hash, the permutations are (a * x + b) mod p
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+class DuplicateMatch(BaseModel):
+    """
+    Indexed text most similar to a query.
+    """
+
+    key: Hashable
+    similarity: float
+
+
+def shingles(text: str, size: int = 5) -> set[int]:
+    """
+    Hash the character shingles of a text.
+
+    The text is lowercased and punctuation and whitespace runs are collapsed, so
+    formatting changes do not affect the shingles.
+
+    Args:
+        text: Text to split
+        size: Number of characters in a shingle
+
+    Returns:
+        32-bit hashes of the distinct shingles
+    """
+    normalized = re.sub(r"[\W_]+", " ", text.casefold()).strip()
+    if len(normalized) <= size:
+        return {zlib.crc32(normalized.encode("utf-8"))}
+    return {
+        zlib.crc32(normalized[start : start + size].encode("utf-8"))
+        for start in range(len(normalized) - size + 1)
+    }
+
+
+class NearDuplicateIndex:
+    """
+    In-memory MinHash index for finding texts that differ only in small edits.
+
+    Every text is reduced to a signature of `num_perm` minimum hashes of its
+    character shingles; the share of equal positions in two signatures estimates
+    the Jaccard similarity of the shingle sets. A query compares its signature with
+    all indexed signatures in one vectorized NumPy operation, which takes a few
+    milliseconds for ten thousand texts.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """
+        Initialize an empty index.
+
+        Args:
+            num_perm: Signature length, the error of the similarity estimate is
+                about 1 / sqrt(num_perm)
+            shingle_size: Number of characters in a shingle
+            seed: Seed of the hash permutations, signatures are only comparable
+                between indexes with the same seed
+        """
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self.shingle_size = shingle_size
+        self._lock = threading.Lock()
+        self._keys: list[Hashable] = []
+        self._positions: dict[Hashable, int] = {}
+        self._signatures = np.empty((16, num_perm), dtype=np.uint32)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        hashes = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        # a, b and the hashes are below 2**32, so a * x + b does not overflow uint64
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def add(self, key: Hashable, text: str) -> None:
+        """
+        Index a text, replacing the text previously indexed under the same key.
+
+        Args:
+            key: Identifier returned by `find`, e.g. a project id
+            text: Text to index
+        """
+        signature = self.signature(text)
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = len(self._keys)
+                if position == len(self._signatures):
+                    self._signatures = np.concatenate(
+                        [self._signatures, np.empty_like(self._signatures)]
+                    )
+                self._keys.append(key)
+                self._positions[key] = position
+            self._signatures[position] = signature
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a text from the index, if it is indexed."""
+        with self._lock:
+            position = self._positions.pop(key, None)
+            if position is None:
+                return
+            # The last signature takes the freed row so that the rows stay contiguous
+            last = len(self._keys) - 1
+            last_key = self._keys.pop()
+            if position != last:
+                self._keys[position] = last_key
+                self._positions[last_key] = position
+                self._signatures[position] = self._signatures[last]
+
+    def find(self, text: str, threshold: float = 0.0) -> Optional[DuplicateMatch]:
+        """
+        Find the indexed text most similar to a text.
+
+        Args:
+            text: Query text
+            threshold: Minimum estimated Jaccard similarity of the shingle sets
+
+        Returns:
+            The best match, or None if nothing reaches the threshold
+        """
+        signature = self.signature(text)
+        with self._lock:
+            if not self._keys:
+                return None
+            similarities = (self._signatures[: len(self._keys)] == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            similarity = float(similarities[best])
+            key = self._keys[best]
+        if similarity < threshold:
+            return None
+        return DuplicateMatch(key=key, similarity=similarity)
+
+    def __len__(self) -> int:
+        return len(self._keys)
@@ -0,0 +1,244 @@
+import copy
+import json
+from typing import Any, Optional, Union, get_args, get_origin
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel, Field, ValidationError, create_model
+
+from extraction_prompt import REPAIR_PROMPT
+from metrics import increment, llm_config
+
+Loc = tuple[Union[str, int], ...]
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _resolve(schema: type[BaseModel], loc: Loc) -> tuple[Any, Optional[str]]:
+    """
+    Get the type and the description of the value at a location in the schema.
+
+    Raises:
+        KeyError: If the location does not exist in the schema
+    """
+    annotation: Any = schema
+    description = None
+    for part in loc:
+        annotation = _unwrap_optional(annotation)
+        if isinstance(part, int):
+            if get_origin(annotation) is not list:
+                raise KeyError(loc)
+            annotation = get_args(annotation)[0]
+            continue
+        if not (isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+            raise KeyError(loc)
+        field = annotation.model_fields.get(part)
+        if field is None:
+            raise KeyError(loc)
+        annotation = field.annotation
+        description = field.description
+    return annotation, description
+
+
+def repair_targets(schema: type[BaseModel], error: ValidationError) -> list[Loc]:
+    """
+    Get the smallest parts of the output that have to be regenerated.
+
+    Every error location is shortened until it exists in the schema, and locations
+    nested in another target are dropped.
+
+    Args:
+        schema: Model the output was validated against
+        error: Validation error of the output
+
+    Returns:
+        Sorted list of locations
+    """
+    targets = set()
+    for item in error.errors():
+        loc = tuple(item["loc"])
+        while len(loc) > 1:
+            try:
+                _resolve(schema, loc)
+                break
+            except KeyError:
+                loc = loc[:-1]
+        targets.add(loc)
+    return sorted(
+        (
+            loc
+            for loc in targets
+            if not any(loc[: len(other)] == other for other in targets if other != loc)
+        ),
+        key=lambda loc: [str(part) for part in loc],
+    )
+
+
+def _field_name(loc: Loc) -> str:
+    return "__".join(str(part) for part in loc)
+
+
+def build_patch_model(schema: type[BaseModel], targets: list[Loc]) -> type[BaseModel]:
+    """
+    Build a model with one required field for every part to regenerate.
+
+    Args:
+        schema: Model the output was validated against
+        targets: Locations of the parts to regenerate
+
+    Returns:
+        Model whose fields are named after the locations joined with "__"
+    """
+    fields = {}
+    for loc in targets:
+        annotation, description = _resolve(schema, loc)
+        path = ".".join(str(part) for part in loc)
+        description = f"Исправленное значение {path}. {description or ''}".strip()
+        fields[_field_name(loc)] = (annotation, Field(..., description=description))
+    return create_model(
+        f"{schema.__name__}Repair",
+        __doc__=f"Исправленные значения полей {schema.__name__}, не прошедших проверку.",
+        **fields,
+    )
+
+
+def apply_patch(output: dict, targets: list[Loc], patch: BaseModel) -> None:
+    """
+    Write the regenerated parts into the output in place.
+
+    Args:
+        output: Raw output of the model
+        targets: Locations of the regenerated parts
+        patch: Instance of the model built by build_patch_model
+    """
+    values = patch.model_dump()
+    for loc in targets:
+        container: Any = output
+        for part in loc[:-1]:
+            container = container[part]
+        container[loc[-1]] = values[_field_name(loc)]
+
+
+def tool_call_args(message: Any) -> Optional[dict]:
+    """Get the arguments of the first tool call of a model response, if any."""
+    if isinstance(message, AIMessage) and message.tool_calls:
+        args = message.tool_calls[0]["args"]
+        if isinstance(args, dict):
+            return args
+    return None
+
+
+def _format_errors(error: ValidationError) -> str:
+    return "\n".join(
+        f"- {'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class StructuredOutputRepairer:
+    """
+    Fixes structured output that failed validation by regenerating only the broken parts.
+
+    The model gets the validation errors and the current output and returns values
+    for the failing fields only, which are merged back into the output. This is much
+    cheaper than regenerating the whole output when one nested field is missing or
+    has the wrong type.
+    """
+
+    def __init__(self, llm: BaseChatModel, schema: type[BaseModel], max_attempts: int = 2):
+        """
+        Initialize the repairer.
+
+        Args:
+            llm: LLM model - LLM must support structured decoding.
+            schema: Model the output must be valid against
+            max_attempts: Maximum number of repair calls for one output
+        """
+        self.llm = llm
+        self.schema = schema
+        self.max_attempts = max_attempts
+
+    def _plan(
+        self, text_description: str, output: dict, error: ValidationError
+    ) -> tuple[list[Loc], Any, str]:
+        targets = repair_targets(self.schema, error)
+        patch_llm = self.llm.with_structured_output(
+            build_patch_model(self.schema, targets)
+        )
+        instructions = REPAIR_PROMPT.format(
+            errors=_format_errors(error),
+            output=json.dumps(output, ensure_ascii=False),
+        )
+        return targets, patch_llm, f"{instructions}\n\n{text_description}"
+
+    @staticmethod
+    def _apply(output: dict, targets: list[Loc], patch: Optional[BaseModel]) -> None:
+        if patch is None:
+            raise OutputParserException("Model did not return the repaired fields")
+        apply_patch(output, targets, patch)
+
+    def repair(self, text_description: str, output: dict) -> BaseModel:
+        """
+        Repair the output until it is valid.
+
+        Args:
+            text_description: Text the output was extracted from
+            output: Raw output of the model
+
+        Returns:
+            Valid instance of the schema
+
+        Raises:
+            ValidationError: If the output is still invalid after all attempts
+        """
+        output = copy.deepcopy(output)
+        for attempt in range(self.max_attempts + 1):
+            try:
+                result = self.schema.model_validate(output)
+            except ValidationError as e:
+                if attempt == self.max_attempts:
+                    increment("extraction_repairs", result="failed")
+                    raise
+                targets, patch_llm, prompt = self._plan(text_description, output, e)
+                self._apply(output, targets, patch_llm.invoke(prompt, config=llm_config()))
+                continue
+            if attempt:
+                increment("extraction_repairs", result="ok")
+            return result
+
+    async def arepair(self, text_description: str, output: dict) -> BaseModel:
+        """
+        Repair the output until it is valid without blocking the event loop.
+
+        Args:
+            text_description: Text the output was extracted from
+            output: Raw output of the model
+
+        Returns:
+            Valid instance of the schema
+
+        Raises:
+            ValidationError: If the output is still invalid after all attempts
+        """
+        output = copy.deepcopy(output)
+        for attempt in range(self.max_attempts + 1):
+            try:
+                result = self.schema.model_validate(output)
+            except ValidationError as e:
+                if attempt == self.max_attempts:
+                    increment("extraction_repairs", result="failed")
+                    raise
+                targets, patch_llm, prompt = self._plan(text_description, output, e)
+                patch = await patch_llm.ainvoke(prompt, config=llm_config())
+                self._apply(output, targets, patch)
+                continue
+            if attempt:
+                increment("extraction_repairs", result="ok")
+            return result
@@ -0,0 +1,193 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+from pydantic import BaseModel, Field, ValidationError, create_model
+from extraction_models import ProjectData
+from extraction_prompt import PACKED_EXTRACTION_PROMPT
+from extractor import ProjectDataExtractor
+from fact_extractor import extract_facts
+from metrics import increment, llm_config, timed
+from output_repair import tool_call_args
+
+
+@lru_cache(maxsize=None)
+def packed_schema(schema: type[ProjectData]) -> type[BaseModel]:
+    """
+    Build the model of a packed response: a list of ProjectData with description IDs.
+
+    Args:
+        schema: ProjectData model used for single extractions
+
+    Returns:
+        Model with a `projects` list whose items have a `description_id` field
+    """
+    item = create_model(
+        "PackedProjectData",
+        __base__=schema,
+        description_id=(
+            str,
+            Field(description="Номер описания из заголовка «### Описание N»"),
+        ),
+    )
+    return create_model(
+        "PackedProjectDataList",
+        projects=(
+            list[item],
+            Field(description="Результаты извлечения, по одному на каждое описание"),
+        ),
+    )
+
+
+class PackedProjectDataExtractor:
+    """
+    Class for extracting many short descriptions with one structured call per group.
+
+    For short descriptions most of the input tokens of a request are the fixed
+    instructions and schema. Packing several descriptions into one request sends
+    them once per group; every description gets an ID in its header and the model
+    returns it with the result, so the results are mapped back by ID. Items that are
+    missing from the response or fail validation are left for single extraction.
+    """
+
+    def __init__(
+        self,
+        extractor: ProjectDataExtractor,
+        max_chars: int = 3000,
+        max_group_chars: int = 12000,
+        max_items: int = 4,
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            extractor: Extractor of single descriptions, its LLM, schema, cache,
+                resilience policy and rule-based facts are used for the groups
+            max_chars: Longest description that is packed, longer ones are
+                extracted alone
+            max_group_chars: Maximum total length of the descriptions in one request
+            max_items: Maximum number of descriptions in one request
+        """
+        self.extractor = extractor
+        self.max_chars = max_chars
+        self.max_group_chars = max_group_chars
+        self.max_items = max_items
+        self.schema = packed_schema(extractor.schema)
+        self.structured_llm = extractor.llm.with_structured_output(
+            self.schema, include_raw=True
+        )
+
+    def pack(self, texts: list[str]) -> list[list[int]]:
+        """
+        Group the short descriptions for packed requests.
+
+        Descriptions are taken in order and a group is closed when the next one does
+        not fit into its limits. Groups of one description are not returned.
+
+        Args:
+            texts: Text descriptions
+
+        Returns:
+            Indexes of the descriptions in every group
+        """
+        groups: list[list[int]] = []
+        group: list[int] = []
+        group_chars = 0
+        for index, text in enumerate(texts):
+            if len(text) > self.max_chars:
+                continue
+            if group and (
+                len(group) >= self.max_items
+                or group_chars + len(text) > self.max_group_chars
+            ):
+                groups.append(group)
+                group, group_chars = [], 0
+            group.append(index)
+            group_chars += len(text)
+        groups.append(group)
+        return [group for group in groups if len(group) > 1]
+
+    @staticmethod
+    def build_prompt(texts: list[str]) -> str:
+        """Join the descriptions under numbered headers after the instructions."""
+        parts = [PACKED_EXTRACTION_PROMPT]
+        for number, text in enumerate(texts, 1):
+            parts.append(f"### Описание {number}\n{text.strip()}")
+        return "\n\n".join(parts)
+
+    def _to_project_data(self, item: dict, text: str) -> ProjectData:
+        data = {key: value for key, value in item.items() if key != "description_id"}
+        if self.extractor.rule_facts:
+            facts = extract_facts(text)
+            if not facts.is_empty():
+                data = facts.apply(data)
+        return ProjectData.model_validate(data)
+
+    def _invoke(self, texts: list[str]) -> list[dict]:
+        """Make the packed call and get the raw result items."""
+        prompt = self.build_prompt(texts)
+
+        def call() -> list[dict]:
+            result = self.structured_llm.invoke(prompt, config=llm_config())
+            if result["parsed"] is not None:
+                return [item.model_dump() for item in result["parsed"].projects]
+            # One invalid item fails the whole response, the valid ones are kept
+            output = tool_call_args(result["raw"]) or {}
+            items = output.get("projects")
+            if not isinstance(items, list):
+                raise result["parsing_error"] or ValueError("Model did not return projects")
+            return [item for item in items if isinstance(item, dict)]
+
+        resilience = self.extractor.resilience
+        return resilience.call(call) if resilience else call()
+
+    @timed("extract_packed")
+    def extract_group(self, texts: list[str]) -> list[Optional[ProjectData]]:
+        """
+        Extract several descriptions with one structured call.
+
+        Args:
+            texts: Short text descriptions
+
+        Returns:
+            ProjectData for every description, None for the ones that have to be
+            extracted alone because the model skipped them or their result is invalid
+        """
+        results: list[Optional[ProjectData]] = [None] * len(texts)
+        cache = self.extractor.cache
+        keys = [self.extractor.cache_key(text) for text in texts] if cache else None
+        pending = []
+        for index in range(len(texts)):
+            cached = cache.get(keys[index]) if cache else None
+            if cached is None:
+                pending.append(index)
+            else:
+                results[index] = cached
+                increment("packed_extraction_items", result="cached")
+        if not pending:
+            return results
+        if len(pending) == 1:
+            # Nothing to share the instructions with
+            increment("packed_extraction_items", result="fallback")
+            return results
+
+        try:
+            items = self._invoke([texts[index] for index in pending])
+        except Exception as e:
+            logging.warning(f"Packed extraction of {len(pending)} descriptions failed: {e}")
+            items = []
+
+        by_id = {str(item.get("description_id", "")).strip(): item for item in items}
+        for number, index in enumerate(pending, 1):
+            item = by_id.get(str(number))
+            if item is None:
+                increment("packed_extraction_items", result="fallback")
+                continue
+            try:
+                results[index] = self._to_project_data(item, texts[index])
+            except ValidationError:
+                increment("packed_extraction_items", result="fallback")
+                continue
+            increment("packed_extraction_items", result="packed")
+            if cache:
+                cache.set(keys[index], results[index])
+        return results
@@ -0,0 +1,372 @@
+import copy
+import io
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from fpdf import FPDF
+
+from metrics import timed
+
+DEFAULT_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+class BasePdfConverter(ABC):
+    """
+    Base class of DOCX to PDF converters backed by a pool of warm worker processes.
+
+    Workers are started once and reused, so a conversion does not pay the startup
+    of the converter. Conversions wait in a queue while all workers are busy.
+    """
+
+    def __init__(self, workers: int = 2):
+        """
+        Initialize the converter.
+
+        Args:
+            workers: Number of worker processes converting documents concurrently
+        """
+        self.workers = workers
+
+    @timed("pdf")
+    def convert(self, document: bytes) -> bytes:
+        """
+        Convert a document to PDF.
+
+        Args:
+            document: Content of a .docx document
+
+        Returns:
+            Content of the PDF document
+        """
+        return self._convert(document)
+
+    def convert_many(self, documents: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Convert documents on all workers at once.
+
+        Args:
+            documents: Contents of .docx documents
+
+        Yields:
+            Contents of the PDF documents, in input order
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(self.convert, documents)
+
+    @abstractmethod
+    def _convert(self, document: bytes) -> bytes: ...
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop the worker processes."""
+
+    def __enter__(self) -> "BasePdfConverter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _LibreOfficeWorker:
+    """
+    Headless LibreOffice process with its own profile, controlled over UNO.
+    """
+
+    def __init__(self, soffice_path: str, profile_dir: str, startup_timeout: float):
+        import uno
+
+        self._uno = uno
+        self.pipe_name = f"passport_{uuid.uuid4().hex}"
+        self.process = subprocess.Popen(
+            [
+                soffice_path,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--norestore",
+                "--nodefault",
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+                f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.desktop = self._connect(startup_timeout)
+
+    def _connect(self, timeout: float):
+        local_context = self._uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+                )
+                return context.ServiceManager.createInstanceWithContext(
+                    "com.sun.star.frame.Desktop", context
+                )
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("LibreOffice worker did not start")
+                time.sleep(0.2)
+
+    def _properties(self, **values):
+        from com.sun.star.beans import PropertyValue
+
+        properties = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name, prop.Value = name, value
+            properties.append(prop)
+        return tuple(properties)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def convert(self, document: bytes, work_dir: str) -> bytes:
+        source = os.path.join(work_dir, "passport.docx")
+        target = os.path.join(work_dir, "passport.pdf")
+        with open(source, "wb") as file:
+            file.write(document)
+        component = self.desktop.loadComponentFromURL(
+            self._uno.systemPathToFileUrl(source),
+            "_blank",
+            0,
+            self._properties(Hidden=True),
+        )
+        try:
+            component.storeToURL(
+                self._uno.systemPathToFileUrl(target),
+                self._properties(FilterName="writer_pdf_Export"),
+            )
+        finally:
+            component.close(True)
+        with open(target, "rb") as file:
+            return file.read()
+
+    def close(self) -> None:
+        if self.alive:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class LibreOfficePdfConverter(BasePdfConverter):
+    """
+    Converter that keeps headless LibreOffice processes running between conversions.
+
+    Requires a local LibreOffice installation and the `uno` module, which is shipped
+    with LibreOffice (python3-uno on Debian/Ubuntu). The layout matches the DOCX exactly.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        soffice_path: str = "soffice",
+        startup_timeout: float = 60.0,
+    ):
+        """
+        Start the LibreOffice processes.
+
+        Args:
+            workers: Number of LibreOffice processes
+            soffice_path: Name or path of the soffice executable
+            startup_timeout: Seconds to wait for a process to accept connections
+        """
+        super().__init__(workers)
+        self.soffice_path = soffice_path
+        self.startup_timeout = startup_timeout
+        self._root = tempfile.mkdtemp(prefix="passport_pdf_")
+        self._idle: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        try:
+            for index in range(workers):
+                self._idle.put(self._start_worker(index))
+        except BaseException:
+            # The caller gets no object to close, so the started processes are stopped here
+            while not self._idle.empty():
+                _, worker = self._idle.get_nowait()
+                worker.close()
+            shutil.rmtree(self._root, ignore_errors=True)
+            raise
+
+    def _start_worker(self, index: int) -> tuple[int, _LibreOfficeWorker]:
+        # Every process needs its own profile, LibreOffice locks it while running
+        profile_dir = os.path.join(self._root, f"profile_{index}")
+        return index, _LibreOfficeWorker(
+            self.soffice_path, profile_dir, self.startup_timeout
+        )
+
+    def _convert(self, document: bytes) -> bytes:
+        index, worker = self._idle.get()
+        try:
+            if not worker.alive:
+                logging.warning(f"LibreOffice worker {index} died, restarting it")
+                index, worker = self._start_worker(index)
+            work_dir = os.path.join(self._root, f"work_{index}")
+            os.makedirs(work_dir, exist_ok=True)
+            return worker.convert(document, work_dir)
+        finally:
+            self._idle.put((index, worker))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in range(self.workers):
+            _, worker = self._idle.get()
+            worker.close()
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+# Fonts of the worker process, loaded once by the pool initializer
+_font_prototype: Optional[FPDF] = None
+
+
+def _init_fpdf_worker(font_path: str) -> None:
+    global _font_prototype
+    _font_prototype = FPDF(format="A4")
+    _font_prototype.add_font("Body", fname=font_path)
+    bold_path = font_path.replace(".ttf", "-Bold.ttf")
+    _font_prototype.add_font(
+        "Body", style="B", fname=bold_path if os.path.exists(bold_path) else font_path
+    )
+
+
+def _iter_blocks(document):
+    for child in document.element.body.iterchildren():
+        if child.tag.endswith("}p"):
+            yield Paragraph(child, document)
+        elif child.tag.endswith("}tbl"):
+            yield Table(child, document)
+
+
+def _docx_to_pdf(document: bytes) -> bytes:
+    # Copying the prototype is several times faster than parsing the fonts again
+    pdf = copy.deepcopy(_font_prototype)
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    for block in _iter_blocks(Document(io.BytesIO(document))):
+        if isinstance(block, Table):
+            # Rows are written as stacked cells, table rows of the passport can be
+            # longer than a page and fpdf tables cannot split a row
+            for row in block.rows:
+                cells = []
+                for cell in row.cells:
+                    # Merged cells are returned once for every grid column they span
+                    if not cells or cell._tc is not cells[-1]._tc:
+                        cells.append(cell)
+                for index, cell in enumerate(cells):
+                    label = index == 0 and len(cells) > 1
+                    pdf.set_font("Body", style="B" if label else "", size=9)
+                    pdf.multi_cell(0, 4.5, cell.text.strip(), new_x="LMARGIN", new_y="NEXT")
+                pdf.line(pdf.l_margin, pdf.get_y() + 1, pdf.w - pdf.r_margin, pdf.get_y() + 1)
+                pdf.ln(2)
+            pdf.ln(2)
+            continue
+        text = block.text.strip()
+        if not text:
+            pdf.ln(2)
+            continue
+        bold = bool(block.runs) and all(run.bold for run in block.runs if run.text.strip())
+        pdf.set_font("Body", style="B" if bold else "", size=10)
+        pdf.multi_cell(0, 5, text, new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+class FpdfPdfConverter(BasePdfConverter):
+    """
+    Pure-Python converter for machines without LibreOffice.
+
+    Paragraphs and tables are laid out with fpdf2, so the text is complete but
+    the formatting is simplified.
+    """
+
+    def __init__(self, workers: int = 2, font_path: Optional[str] = None):
+        """
+        Start the worker processes.
+
+        Args:
+            workers: Number of worker processes
+            font_path: TrueType font with Cyrillic glyphs, a "-Bold" variant next
+                to it is used for bold text
+        """
+        super().__init__(workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_fpdf_worker,
+            initargs=(font_path or DEFAULT_FONT_PATH,),
+        )
+        # Start every process and load the fonts now rather than on the first conversions
+        for future in [self._executor.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+
+    def _convert(self, document: bytes) -> bytes:
+        return self._executor.submit(_docx_to_pdf, document).result()
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+
+def libreoffice_available(soffice_path: str = "soffice") -> bool:
+    """Check whether LibreOffice and its Python bridge are installed."""
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which(soffice_path) is not None
+
+
+def create_pdf_converter(
+    backend: str = "auto",
+    workers: int = 2,
+    soffice_path: str = "soffice",
+    font_path: Optional[str] = None,
+) -> Optional[BasePdfConverter]:
+    """
+    Create a PDF converter.
+
+    Args:
+        backend: "none", "libreoffice", "fpdf" or "auto" for LibreOffice when it
+            is installed and fpdf otherwise
+        workers: Number of worker processes
+        soffice_path: Name or path of the soffice executable
+        font_path: TrueType font used by the fpdf converter
+
+    Returns:
+        Converter, or None if PDF export is disabled
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "none":
+        return None
+    if backend == "auto":
+        backend = "libreoffice" if libreoffice_available(soffice_path) else "fpdf"
+    if backend == "libreoffice":
+        return LibreOfficePdfConverter(workers, soffice_path)
+    if backend == "fpdf":
+        return FpdfPdfConverter(workers, font_path)
+    raise ValueError(f"Unknown PDF converter backend: {backend}")
@@ -0,0 +1,320 @@
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from extraction_models import ProjectData
+from formatted_data import FormattedProjectData
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    latest_version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    source_text TEXT,
+    project_data TEXT,
+    formatted_data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (project_id, version)
+);
+CREATE INDEX IF NOT EXISTS projects_updated_at ON projects (updated_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS passport_search USING fts5 (
+    project_name, team, stakeholders, dates, stages,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+
+class StoredPassport(BaseModel):
+    """
+    One saved version of a project passport.
+    """
+
+    project_id: int
+    version: int
+    created_at: float
+    formatted_data: FormattedProjectData
+    project_data: Optional[ProjectData] = None
+    source_text: Optional[str] = None
+
+
+class PassportSearchResult(BaseModel):
+    """
+    Project found by a search, described by its latest version.
+    """
+
+    project_id: int
+    version: int
+    project_name: str
+    updated_at: float
+    snippet: str = ""
+
+
+def _index_columns(
+    formatted_data: FormattedProjectData, project_data: Optional[ProjectData]
+) -> tuple[str, str, str, str, str]:
+    """Text of the project for every column of the search index."""
+    team = [
+        formatted_data.project_initiator,
+        formatted_data.project_owner,
+        formatted_data.project_owner_representative,
+        formatted_data.project_leader,
+        formatted_data.management_team_curator,
+        formatted_data.project_manager,
+        formatted_data.strategy_portfolio_leader,
+        formatted_data.strategy_event_leader,
+        *formatted_data.independent_experts,
+    ]
+    stakeholders = [
+        formatted_data.project_stakeholders,
+        formatted_data.project_steering_committee,
+    ]
+    dates = [formatted_data.project_start_date, formatted_data.project_end_date]
+    if project_data is not None:
+        # The raw stage dates are in YYYY-MM-DD, so both date formats can be searched
+        dates.append(project_data.project_start_date)
+        for stage in project_data.project_stages:
+            dates.extend([stage.stage_start_date, stage.stage_end_date])
+    return (
+        formatted_data.project_name,
+        "\n".join(team),
+        "\n".join(stakeholders),
+        " ".join(dates),
+        formatted_data.project_stages_results,
+    )
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches every word as a prefix.
+
+    Args:
+        query: Words typed by the user, FTS5 syntax is not interpreted
+
+    Returns:
+        FTS5 MATCH expression, empty if the query has no words
+    """
+    terms = re.findall(r"\w[\w.\-]*", query)
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+class ProjectStore:
+    """
+    SQLite store of passport versions with a full-text index over the latest versions.
+
+    Every save of a project adds a version, so edits never overwrite earlier results.
+    Search covers the project name, team members, stakeholders, dates and stage text.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the store.
+
+        Args:
+            path: Path to the SQLite database file, created if missing
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+
+    def save(
+        self,
+        formatted_data: FormattedProjectData,
+        project_data: Optional[ProjectData] = None,
+        source_text: Optional[str] = None,
+        project_id: Optional[int] = None,
+    ) -> StoredPassport:
+        """
+        Save a new version of a passport.
+
+        Args:
+            formatted_data: Formatted project data as rendered into the document
+            project_data: Extracted project data the formatted data came from
+            source_text: Text description the data was extracted from
+            project_id: Project to add the version to, None creates a new project
+
+        Returns:
+            The saved version
+
+        Raises:
+            KeyError: If project_id does not exist
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            if project_id is None:
+                cursor = self._connection.execute(
+                    "INSERT INTO projects (name, latest_version, created_at, updated_at) "
+                    "VALUES (?, 1, ?, ?)",
+                    (formatted_data.project_name, now, now),
+                )
+                project_id, version = cursor.lastrowid, 1
+            else:
+                row = self._connection.execute(
+                    "SELECT latest_version FROM projects WHERE id = ?", (project_id,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(project_id)
+                version = row[0] + 1
+                self._connection.execute(
+                    "UPDATE projects SET name = ?, latest_version = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (formatted_data.project_name, version, now, project_id),
+                )
+            self._connection.execute(
+                "INSERT INTO versions (project_id, version, source_text, project_data, "
+                "formatted_data, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    project_id,
+                    version,
+                    source_text,
+                    project_data.model_dump_json() if project_data else None,
+                    formatted_data.model_dump_json(),
+                    now,
+                ),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO passport_search "
+                "(rowid, project_name, team, stakeholders, dates, stages) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (project_id, *_index_columns(formatted_data, project_data)),
+            )
+        return StoredPassport(
+            project_id=project_id,
+            version=version,
+            created_at=now,
+            formatted_data=formatted_data,
+            project_data=project_data,
+            source_text=source_text,
+        )
+
+    def get(self, project_id: int, version: Optional[int] = None) -> Optional[StoredPassport]:
+        """
+        Load a version of a passport.
+
+        Args:
+            project_id: Project id
+            version: Version number, None for the latest
+
+        Returns:
+            The version or None if it does not exist
+        """
+        query = (
+            "SELECT v.version, v.created_at, v.formatted_data, v.project_data, v.source_text "
+            "FROM versions v JOIN projects p ON p.id = v.project_id "
+            "WHERE v.project_id = ? AND v.version = "
+        )
+        with self._lock:
+            if version is None:
+                row = self._connection.execute(
+                    query + "p.latest_version", (project_id,)
+                ).fetchone()
+            else:
+                row = self._connection.execute(query + "?", (project_id, version)).fetchone()
+        if row is None:
+            return None
+        version, created_at, formatted_data, project_data, source_text = row
+        return StoredPassport(
+            project_id=project_id,
+            version=version,
+            created_at=created_at,
+            formatted_data=FormattedProjectData.model_validate_json(formatted_data),
+            project_data=(
+                ProjectData.model_validate_json(project_data) if project_data else None
+            ),
+            source_text=source_text,
+        )
+
+    def versions(self, project_id: int) -> list[tuple[int, float]]:
+        """
+        List the versions of a project.
+
+        Returns:
+            Pairs of (version, creation time), newest first
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT version, created_at FROM versions WHERE project_id = ? "
+                "ORDER BY version DESC",
+                (project_id,),
+            ).fetchall()
+
+    def sources(self) -> list[tuple[int, str]]:
+        """
+        List the latest description of every project that has one.
+
+        Returns:
+            Pairs of (project id, description)
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT v.project_id, v.source_text FROM versions v "
+                "JOIN (SELECT project_id, MAX(version) AS version FROM versions "
+                "WHERE source_text IS NOT NULL GROUP BY project_id) latest "
+                "ON latest.project_id = v.project_id AND latest.version = v.version"
+            ).fetchall()
+
+    def search(self, query: str, limit: int = 20) -> list[PassportSearchResult]:
+        """
+        Find projects by words from their latest versions.
+
+        Every word must occur in the project, as a whole word or a word prefix.
+        An empty query returns the most recently updated projects.
+
+        Args:
+            query: Words to search for
+            limit: Maximum number of results
+
+        Returns:
+            Projects ordered by relevance
+        """
+        match = build_match_query(query)
+        with self._lock:
+            if not match:
+                rows = self._connection.execute(
+                    "SELECT id, latest_version, name, updated_at, '' FROM projects "
+                    "ORDER BY updated_at DESC LIMIT ?",
+                    (limit,),
+                ).fetchall()
+            else:
+                rows = self._connection.execute(
+                    "SELECT p.id, p.latest_version, p.name, p.updated_at, "
+                    "snippet(passport_search, -1, '**', '**', '…', 12) "
+                    "FROM passport_search s JOIN projects p ON p.id = s.rowid "
+                    "WHERE passport_search MATCH ? ORDER BY s.rank LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+        return [
+            PassportSearchResult(
+                project_id=project_id,
+                version=version,
+                project_name=name,
+                updated_at=updated_at,
+                snippet=snippet,
+            )
+            for project_id, version, name, updated_at, snippet in rows
+        ]
+
+    def delete(self, project_id: int) -> None:
+        """Delete a project with all its versions."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM passport_search WHERE rowid = ?", (project_id,))
+            self._connection.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
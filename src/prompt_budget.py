@@ -0,0 +1,132 @@
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+from extraction_models import ProjectData
+from extraction_prompt import EXTRACTION_PROMPT
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: words and punctuation marks are counted separately."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str):
+    # tiktoken downloads the encoding on first use, offline machines fall back
+    # to the estimate instead of failing
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception:
+        logging.warning(f"Tokenizer {name} is not available, token counts are estimated")
+        return None
+
+
+def count_tokens(text: str, encoding: Optional[str] = "o200k_base") -> int:
+    """
+    Count the tokens of a text.
+
+    Args:
+        text: Text to count
+        encoding: tiktoken encoding, None to always use the estimate
+
+    Returns:
+        Number of tokens, estimated if the encoding cannot be loaded
+    """
+    tokenizer = _get_encoding(encoding) if encoding else None
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text))
+
+
+class FieldCost(BaseModel):
+    """
+    Tokens taken by one field of a structured output schema.
+    """
+
+    path: str
+    tokens: int
+    description_tokens: int
+    example_tokens: int
+
+
+class PromptBudget(BaseModel):
+    """
+    Tokens sent with every extraction request, apart from the description itself.
+    """
+
+    prompt_tokens: int
+    schema_tokens: int
+    fields: list[FieldCost]
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.schema_tokens
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _field_costs(
+    properties: dict, prefix: str, encoding: Optional[str]
+) -> Iterator[FieldCost]:
+    for name, prop in properties.items():
+        path = f"{prefix}{name}"
+        items = prop.get("items", {})
+        # Nested objects are reported as separate fields, so only the own part counts
+        own = {key: value for key, value in prop.items() if key != "properties"}
+        if "properties" in items:
+            own["items"] = {key: value for key, value in items.items() if key != "properties"}
+        examples = [prop[key] for key in ("examples", "example") if key in prop]
+        yield FieldCost(
+            path=path,
+            tokens=count_tokens(_dumps({name: own}), encoding),
+            description_tokens=count_tokens(
+                f"{prop.get('description', '')} {items.get('description', '')}".strip(),
+                encoding,
+            ),
+            example_tokens=count_tokens(_dumps(examples), encoding) if examples else 0,
+        )
+        if "properties" in prop:
+            yield from _field_costs(prop["properties"], f"{path}.", encoding)
+        if "properties" in items:
+            yield from _field_costs(items["properties"], f"{path}[].", encoding)
+
+
+def analyze_prompt_budget(
+    schema: type[BaseModel] = ProjectData,
+    prompt: str = EXTRACTION_PROMPT,
+    encoding: Optional[str] = "o200k_base",
+) -> PromptBudget:
+    """
+    Measure the tokens of the instructions and the tool schema of a structured call.
+
+    The schema is serialized the way it is sent to the provider, as an OpenAI tool.
+    Field costs include the field name, type, description and examples, but not the
+    fields of nested models, which are listed separately with dotted paths
+    ("project_stages[].smart_results[].specific").
+
+    Args:
+        schema: Model used for structured output
+        prompt: Instructions sent before the description
+        encoding: tiktoken encoding, None to use the estimate
+
+    Returns:
+        Token counts of the prompt, the whole schema and every field
+    """
+    tool = convert_to_openai_tool(schema)
+    return PromptBudget(
+        prompt_tokens=count_tokens(prompt, encoding),
+        schema_tokens=count_tokens(_dumps(tool), encoding),
+        fields=list(
+            _field_costs(tool["function"]["parameters"].get("properties", {}), "", encoding)
+        ),
+    )
@@ -0,0 +1,362 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+
+import groq
+import httpx
+import openai
+from langchain_core.exceptions import OutputParserException
+from pydantic import BaseModel, ValidationError
+
+from metrics import increment
+
+T = TypeVar("T")
+
+# Errors after which the same request may succeed: network problems, provider
+# overload and malformed structured output
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    httpx.TransportError,
+    groq.APIConnectionError,
+    groq.APITimeoutError,
+    groq.RateLimitError,
+    groq.InternalServerError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    ValidationError,
+    OutputParserException,
+)
+# Malformed output of a model that did answer: retried, but not a sign of an unhealthy provider
+MALFORMED_OUTPUT_ERRORS = (ValidationError, OutputParserException)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when calls are rejected because the provider keeps failing."""
+
+
+class ResiliencePolicy(BaseModel):
+    """
+    Settings of the retry, deadline, hedging and circuit breaker policy for LLM calls.
+    """
+
+    timeout: Optional[float] = 60.0
+    max_retries: int = 2
+    backoff_base: float = 1.0
+    backoff_max: float = 20.0
+    hedge_percentile: Optional[float] = None
+    hedge_min_samples: int = 20
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+
+class CircuitBreaker:
+    """
+    Rejects calls for `reset_timeout` seconds after `failure_threshold` consecutive
+    provider failures, then lets a single trial call through.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        """Check whether a call may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    """
+    Runs LLM calls with per-call deadlines, retries with exponential backoff and
+    full jitter, optional hedged duplicate requests and a circuit breaker.
+
+    Only transient errors (see TRANSIENT_ERRORS) are retried. When hedging is enabled,
+    a duplicate request is sent once a call runs longer than the configured percentile
+    of recently observed latencies, and the first successful response wins.
+    """
+
+    def __init__(self, policy: ResiliencePolicy, max_workers: int = 32):
+        """
+        Initialize the caller.
+
+        Args:
+            policy: Retry, deadline, hedging and circuit breaker settings
+            max_workers: Size of the thread pool used for calls with a deadline or hedging
+        """
+        self.policy = policy
+        self.breaker = CircuitBreaker(
+            policy.circuit_failure_threshold, policy.circuit_reset_timeout
+        )
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._latencies_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Latency after which a duplicate request is sent, None if hedging is off."""
+        if self.policy.hedge_percentile is None:
+            return None
+        with self._latencies_lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.policy.hedge_min_samples:
+            return None
+        return latencies[int(self.policy.hedge_percentile * (len(latencies) - 1))]
+
+    def _record_latency(self, latency: float) -> None:
+        with self._latencies_lock:
+            self._latencies.append(latency)
+
+    def _record_outcome(self, error: Optional[BaseException]) -> None:
+        """Update the circuit breaker after an attempt."""
+        if isinstance(error, TRANSIENT_ERRORS) and not isinstance(
+            error, MALFORMED_OUTPUT_ERRORS
+        ):
+            self.breaker.record_failure()
+        else:
+            # The provider answered, so other errors say nothing about its health
+            self.breaker.record_success()
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the retry after the given attempt."""
+        cap = min(self.policy.backoff_max, self.policy.backoff_base * 2**attempt)
+        return random.uniform(0, cap)
+
+    def call(self, func: Callable[[], T]) -> T:
+        """
+        Call a function under the policy.
+
+        Args:
+            func: Function that makes one LLM call
+
+        Returns:
+            Result of the first successful call
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the call
+            Exception: The last error if all attempts failed or the error is not transient
+        """
+        for attempt in range(self.policy.max_retries + 1):
+            self._check_circuit()
+            try:
+                result = self._call_once(func)
+            except TRANSIENT_ERRORS as e:
+                self._record_outcome(e)
+                if attempt == self.policy.max_retries:
+                    raise
+                increment("llm_retries")
+                time.sleep(self.backoff(attempt))
+                continue
+            except Exception as e:
+                self._record_outcome(e)
+                raise
+            self._record_outcome(None)
+            return result
+
+    async def acall(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call a coroutine function under the policy.
+
+        Args:
+            func: Coroutine function that makes one LLM call
+
+        Returns:
+            Result of the first successful call
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the call
+            Exception: The last error if all attempts failed or the error is not transient
+        """
+        for attempt in range(self.policy.max_retries + 1):
+            self._check_circuit()
+            try:
+                result = await self._acall_once(func)
+            except TRANSIENT_ERRORS as e:
+                self._record_outcome(e)
+                if attempt == self.policy.max_retries:
+                    raise
+                increment("llm_retries")
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            except Exception as e:
+                self._record_outcome(e)
+                raise
+            self._record_outcome(None)
+            return result
+
+    def stream(self, func: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """
+        Iterate over a streamed LLM call under the policy.
+
+        The circuit is checked before every attempt, and a transient error before
+        the first chunk retries the call. After the first chunk the stream cannot be
+        restarted without repeating output, so errors are raised. The deadline is
+        checked between chunks; a stream stalled inside a read is bounded by the HTTP
+        client timeout. Hedging is not applied to streams.
+
+        Args:
+            func: Function that starts one streamed LLM call
+
+        Yields:
+            Chunks of the first attempt that produced any
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the call
+            TimeoutError: If the stream runs past the deadline
+            Exception: The last error if all attempts failed or the error is not transient
+        """
+        for attempt in range(self.policy.max_retries + 1):
+            self._check_circuit()
+            started = time.monotonic()
+            streamed = False
+            try:
+                for chunk in func():
+                    if self._remaining(started) == 0.0:
+                        raise TimeoutError("LLM call exceeded its deadline")
+                    streamed = True
+                    yield chunk
+            except TRANSIENT_ERRORS as e:
+                self._record_outcome(e)
+                if streamed or attempt == self.policy.max_retries:
+                    raise
+                increment("llm_retries")
+                time.sleep(self.backoff(attempt))
+                continue
+            except GeneratorExit:
+                # The consumer stopped reading, the provider was answering
+                self._record_outcome(None)
+                raise
+            except Exception as e:
+                self._record_outcome(e)
+                raise
+            self._record_outcome(None)
+            return
+
+    def _check_circuit(self) -> None:
+        if not self.breaker.allow():
+            increment("llm_circuit_rejections")
+            raise CircuitOpenError("LLM calls are suspended after repeated failures")
+
+    def _remaining(self, started: float) -> Optional[float]:
+        if self.policy.timeout is None:
+            return None
+        return max(0.0, started + self.policy.timeout - time.monotonic())
+
+    def _next_wait(self, started: float, hedge_delay: Optional[float]) -> Optional[float]:
+        remaining = self._remaining(started)
+        if hedge_delay is None:
+            return remaining
+        until_hedge = max(0.0, started + hedge_delay - time.monotonic())
+        return until_hedge if remaining is None else min(until_hedge, remaining)
+
+    def _submit(self, func: Callable[[], T]) -> tuple[Future, threading.Event, list]:
+        """
+        Run a call on the pool, recording when it actually starts.
+
+        The time the call waits for a free worker is not LLM latency, so the deadline,
+        the hedge delay and the recorded latency are counted from the start.
+        """
+        running = threading.Event()
+        started: list[float] = []
+
+        def run() -> T:
+            started.append(time.monotonic())
+            running.set()
+            return func()
+
+        return self._executor.submit(run), running, started
+
+    def _call_once(self, func: Callable[[], T]) -> T:
+        hedge_delay = self.hedge_delay()
+        if self.policy.timeout is None and hedge_delay is None:
+            started = time.monotonic()
+            result = func()
+            self._record_latency(time.monotonic() - started)
+            return result
+
+        # Abandoned calls cannot be interrupted and finish in the background,
+        # the HTTP client timeout bounds how long they can take
+        future, running, first_started = self._submit(func)
+        running.wait()
+        started = first_started[0]
+        pending: set[Future] = {future}
+        starts = {future: first_started}
+        error: Optional[BaseException] = None
+        while True:
+            done, pending = wait(
+                pending,
+                timeout=self._next_wait(started, hedge_delay),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                if future.exception() is None:
+                    self._record_latency(time.monotonic() - starts[future][0])
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            if self._remaining(started) == 0.0:
+                raise TimeoutError("LLM call exceeded its deadline")
+            if hedge_delay is not None and time.monotonic() - started >= hedge_delay:
+                hedge_delay = None
+                increment("llm_hedged_requests")
+                hedge, _, hedge_started = self._submit(func)
+                pending.add(hedge)
+                starts[hedge] = hedge_started
+
+    async def _acall_once(self, func: Callable[[], Awaitable[T]]) -> T:
+        hedge_delay = self.hedge_delay()
+        started = time.monotonic()
+        pending = {asyncio.ensure_future(func())}
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self._next_wait(started, hedge_delay),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._record_latency(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                if self._remaining(started) == 0.0:
+                    raise TimeoutError("LLM call exceeded its deadline")
+                if hedge_delay is not None and time.monotonic() - started >= hedge_delay:
+                    hedge_delay = None
+                    increment("llm_hedged_requests")
+                    pending.add(asyncio.ensure_future(func()))
+        finally:
+            for task in pending:
+                task.cancel()
@@ -2,6 +2,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
 from pathlib import Path
 from typing import Optional
+from backend_config import BackendConfig
 
 
 class Settings(BaseSettings):
@@ -14,6 +15,44 @@ class Settings(BaseSettings):
     openai_model: str
     openai_temperature: float = 0.0
     template_path: str
+    llm_backends: list[BackendConfig] = []
+    llm_max_connections: int = 20
+    llm_keepalive_expiry: float = 60.0
+    llm_timeout: Optional[float] = 60.0
+    llm_max_retries: int = 2
+    llm_backoff_base: float = 1.0
+    llm_backoff_max: float = 20.0
+    llm_hedge_percentile: Optional[float] = None
+    llm_hedge_min_samples: int = 20
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_timeout: float = 30.0
+    extraction_mode: str = "single"
+    extraction_chunk_size: int = 6000
+    extraction_chunk_overlap: int = 500
+    extraction_max_workers: int = 4
+    extraction_repair_attempts: int = 2
+    extraction_schema_mode: str = "full"
+    extraction_rule_facts: bool = True
+    batch_packing: bool = False
+    batch_pack_max_chars: int = 3000
+    batch_pack_max_group_chars: int = 12000
+    batch_pack_max_items: int = 4
+    incremental_extraction: bool = True
+    incremental_max_changed_share: float = 0.5
+    extraction_cache_backend: str = "memory"
+    extraction_cache_path: str = "cache/extractions.sqlite3"
+    extraction_cache_max_size: int = 256
+    extraction_cache_ttl: Optional[float] = None
+    pdf_export_backend: str = "none"
+    pdf_export_workers: int = 2
+    pdf_soffice_path: str = "soffice"
+    pdf_font_path: Optional[str] = None
+    project_store_enabled: bool = True
+    project_store_path: str = "data/passports.sqlite3"
+    near_duplicate_threshold: Optional[float] = 0.8
+    metrics_enabled: bool = False
+    metrics_log_path: str = "logs/metrics.jsonl"
+    metrics_port: Optional[int] = None
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="ignore"
     )
@@ -24,5 +63,10 @@ class Settings(BaseSettings):
         project_root = Path(__file__).parent.parent
         return str(project_root / v)
 
+    @field_validator("extraction_cache_path", "project_store_path")
+    def get_absolute_data_path(cls, v):
+        """Convert a data file path to absolute path relative to project root."""
+        return str(Path(__file__).parent.parent / v)
+
 
 settings = Settings()
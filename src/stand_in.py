@@ -0,0 +1,214 @@
+import json
+import math
+import random
+import re
+from pathlib import Path
+from typing import Any, Literal, Optional
+from urllib.parse import parse_qsl, urlparse
+
+from pydantic import BaseModel
+
+STAND_IN_SCHEME = "stand-in"
+PROJECT_ROOT = Path(__file__).parent.parent
+NOT_SPECIFIED = "Не указано"
+
+
+class StandInError(TimeoutError):
+    """Error injected by the stand-in model, retried like a provider timeout."""
+
+
+class LatencyDistribution(BaseModel):
+    """
+    Distribution of the delay before a stand-in response starts.
+    """
+
+    kind: Literal["constant", "uniform", "normal", "lognormal", "exponential"] = "constant"
+    # Mean delay in seconds, the median for "lognormal"
+    mean: float = 0.0
+    # Half-width for "uniform", standard deviation for "normal", sigma for "lognormal"
+    spread: float = 0.0
+    max: Optional[float] = None
+
+    def sample(self, generator: random.Random) -> float:
+        """Draw a delay in seconds."""
+        if self.kind == "uniform":
+            value = generator.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            value = generator.gauss(self.mean, self.spread)
+        elif self.kind == "lognormal":
+            value = (
+                generator.lognormvariate(math.log(self.mean), self.spread) if self.mean else 0.0
+            )
+        elif self.kind == "exponential":
+            value = generator.expovariate(1 / self.mean) if self.mean else 0.0
+        else:
+            value = self.mean
+        value = max(value, 0.0)
+        return min(value, self.max) if self.max is not None else value
+
+
+class StandInConfig(BaseModel):
+    """
+    Behaviour of the stand-in LLM, shared by the in-process model and the server.
+    """
+
+    recordings: str = str(PROJECT_ROOT / "benchmarks" / "recordings")
+    latency: LatencyDistribution = LatencyDistribution()
+    # Output generation speed, None returns the whole output at once
+    tokens_per_second: Optional[float] = None
+    chunk_size: int = 16
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def parse_stand_in_url(url: str) -> StandInConfig:
+    """
+    Read the stand-in settings from a base URL.
+
+    The recordings directory is the path of the URL, relative to the project root
+    unless absolute, and the other settings are query parameters, e.g.
+    "stand-in://benchmarks/recordings?latency=lognormal&mean=2&spread=0.5&error_rate=0.05".
+
+    Args:
+        url: URL with the "stand-in" scheme
+
+    Returns:
+        Stand-in settings
+
+    Raises:
+        ValueError: If the URL does not use the "stand-in" scheme
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != STAND_IN_SCHEME:
+        raise ValueError(f"Not a stand-in URL: {url}")
+    query = dict(parse_qsl(parsed.query))
+    names = {"kind": "latency", "mean": "mean", "spread": "spread", "max": "max"}
+    latency = {key: query.pop(name) for key, name in names.items() if name in query}
+    path = f"{parsed.netloc}{parsed.path}"
+    if path and not Path(path).is_absolute():
+        path = str(PROJECT_ROOT / path)
+    return StandInConfig(
+        **({"recordings": path} if path else {}),
+        latency=LatencyDistribution(**latency),
+        **query,
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    # About 4 characters per token, the same estimate as the fake model's usage
+    return max(len(text) // 4, 1)
+
+
+def _resolve(schema: dict, root: dict) -> dict:
+    reference = schema.get("$ref")
+    if not reference:
+        return schema
+    node = root
+    for part in reference.lstrip("#/").split("/"):
+        node = node[part]
+    return _resolve(node, root)
+
+
+def _find_key(source: Any, key: str) -> Any:
+    """Find a value by key anywhere in a recorded result, depth first."""
+    if isinstance(source, dict):
+        if key in source:
+            return source[key]
+        values = source.values()
+    elif isinstance(source, list):
+        values = source
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+class ResponseSynthesizer:
+    """
+    Builds structured responses for any requested schema from recorded ProjectData.
+
+    Every field of the requested schema takes the value with the same name from a
+    recorded result, searched at the same level first and anywhere in the result
+    otherwise, so outlines, stage results and section models are answered from the
+    same recordings. Fields missing from the recordings get placeholder values.
+    """
+
+    def __init__(self, recordings: list[dict], seed: Optional[int] = None):
+        """
+        Initialize the synthesizer.
+
+        Args:
+            recordings: Recorded ProjectData results as dicts
+            seed: Seed of the choice of the recording for every response
+        """
+        self.recordings = recordings or [{}]
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_directory(cls, path: str, seed: Optional[int] = None) -> "ResponseSynthesizer":
+        """Load every *.json recording of a directory."""
+        recordings = [
+            json.loads(file.read_text(encoding="utf-8"))
+            for file in sorted(Path(path).glob("*.json"))
+        ]
+        return cls(recordings, seed)
+
+    def synthesize(self, schema: dict, prompt: str = "") -> Any:
+        """
+        Build a response matching a JSON schema.
+
+        Args:
+            schema: JSON schema of the tool parameters or the response format
+            prompt: Request text; lists of items with a "description_id" field get
+                one item per "### Описание N" header of the prompt
+
+        Returns:
+            Value matching the schema
+        """
+        source = self._random.choice(self.recordings)
+        return self._value(schema, source, schema, prompt)
+
+    def _value(self, schema: dict, source: Any, root: dict, prompt: str) -> Any:
+        schema = _resolve(schema, root)
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [option for option in schema[key] if option.get("type") != "null"]
+                return self._value(options[0] if options else {}, source, root, prompt)
+        if "allOf" in schema:
+            return self._value(schema["allOf"][0], source, root, prompt)
+        kind = schema.get("type")
+        if kind == "object" or "properties" in schema:
+            source = source if isinstance(source, dict) else {}
+            return {
+                name: self._value(
+                    prop,
+                    source[name] if name in source else _find_key(source, name),
+                    root,
+                    prompt,
+                )
+                for name, prop in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            items = _resolve(schema.get("items", {}), root)
+            if "description_id" in items.get("properties", {}):
+                numbers = re.findall(r"^### Описание (\d+)$", prompt, re.MULTILINE)
+                return [
+                    {
+                        **self._value(items, self._random.choice(self.recordings), root, prompt),
+                        "description_id": number,
+                    }
+                    for number in numbers
+                ]
+            if isinstance(source, list):
+                return [self._value(items, item, root, prompt) for item in source]
+            return []
+        if kind == "integer":
+            return source if isinstance(source, int) else 0
+        if kind == "number":
+            return source if isinstance(source, (int, float)) else 0.0
+        if kind == "boolean":
+            return source if isinstance(source, bool) else False
+        return source if isinstance(source, str) else NOT_SPECIFIED
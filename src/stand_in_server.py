@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Optional
+
+import uvicorn
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from logger import setup_logging
+from stand_in import (
+    NOT_SPECIFIED,
+    LatencyDistribution,
+    ResponseSynthesizer,
+    StandInConfig,
+    estimate_tokens,
+)
+
+# Statuses of the injected errors, the ones a real provider returns under load
+ERROR_STATUSES = (429, 500, 503)
+
+
+def _prompt_text(messages: list[dict]) -> str:
+    if not messages:
+        return ""
+    content = messages[-1].get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def _requested_output(request: dict) -> tuple[Optional[str], Optional[dict]]:
+    """Get the name and parameters of the tool to call, or None and the response schema."""
+    tools = request.get("tools") or []
+    if tools:
+        choice = request.get("tool_choice")
+        name = choice.get("function", {}).get("name") if isinstance(choice, dict) else None
+        for tool in tools:
+            function = tool.get("function", {})
+            if name is None or function.get("name") == name:
+                return function.get("name"), function.get("parameters", {})
+    response_format = request.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return None, response_format.get("json_schema", {}).get("schema", {})
+    return None, None
+
+
+def create_stand_in_app(config: StandInConfig) -> FastAPI:
+    """
+    Create an OpenAI-compatible chat completions server answering from recordings.
+
+    Tool calls, JSON schema response formats and plain text requests are answered,
+    with or without streaming. Every request waits for a delay drawn from the
+    latency distribution, fails with a 429, 500 or 503 error with the configured
+    probability, and generates its output at `tokens_per_second`.
+
+    Args:
+        config: Stand-in settings
+
+    Returns:
+        FastAPI application serving /v1/chat/completions and /v1/models
+    """
+    synthesizer = ResponseSynthesizer.from_directory(config.recordings, config.seed)
+    generator = random.Random(config.seed)
+    app = FastAPI(title="LLM stand-in")
+
+    @app.get("/v1/models")
+    async def models() -> dict:
+        model = {"id": "stand-in", "object": "model", "owned_by": "local"}
+        return {"object": "list", "data": [model]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: dict = Body(...)) -> Any:
+        await asyncio.sleep(config.latency.sample(generator))
+        if generator.random() < config.error_rate:
+            status = generator.choice(ERROR_STATUSES)
+            error = {"message": f"Injected error {status}", "type": "stand_in_error"}
+            return JSONResponse(status_code=status, content={"error": error})
+
+        prompt = _prompt_text(request.get("messages", []))
+        tool_name, schema = _requested_output(request)
+        if schema is None:
+            output = NOT_SPECIFIED
+        else:
+            output = json.dumps(synthesizer.synthesize(schema, prompt), ensure_ascii=False)
+        call_id = f"call_{uuid.uuid4().hex}"
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(output),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        finish_reason = "tool_calls" if tool_name else "stop"
+        common = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": request.get("model", "stand-in"),
+        }
+
+        if not request.get("stream"):
+            if config.tokens_per_second:
+                await asyncio.sleep(usage["completion_tokens"] / config.tokens_per_second)
+            message: dict = {"role": "assistant", "content": None if tool_name else output}
+            if tool_name:
+                function = {"name": tool_name, "arguments": output}
+                message["tool_calls"] = [{"id": call_id, "type": "function", "function": function}]
+            choice = {"index": 0, "message": message, "finish_reason": finish_reason}
+            return {**common, "object": "chat.completion", "choices": [choice], "usage": usage}
+
+        include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+
+        def event(delta: Optional[dict], finish: Optional[str] = None, **extra) -> str:
+            choices = [] if delta is None else [
+                {"index": 0, "delta": delta, "finish_reason": finish}
+            ]
+            chunk = {**common, "object": "chat.completion.chunk", "choices": choices, **extra}
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            for start in range(0, len(output), config.chunk_size):
+                piece = output[start : start + config.chunk_size]
+                if config.tokens_per_second:
+                    await asyncio.sleep(len(piece) / 4 / config.tokens_per_second)
+                if tool_name:
+                    call = {"index": 0, "function": {"arguments": piece}}
+                    if start == 0:
+                        call["function"]["name"] = tool_name
+                        call.update(id=call_id, type="function")
+                    delta = {"tool_calls": [call]}
+                else:
+                    delta = {"content": piece}
+                if start == 0:
+                    delta["role"] = "assistant"
+                yield event(delta)
+            yield event({}, finish_reason)
+            if include_usage:
+                yield event(None, usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the OpenAI-compatible LLM stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--recordings",
+        default=StandInConfig().recordings,
+        help="Directory of the recorded ProjectData results",
+    )
+    parser.add_argument(
+        "--latency",
+        default="constant",
+        choices=["constant", "uniform", "normal", "lognormal", "exponential"],
+        help="Distribution of the delay before a response",
+    )
+    parser.add_argument("--mean", type=float, default=0.0, help="Mean delay in seconds")
+    parser.add_argument("--spread", type=float, default=0.0, help="Spread of the delay")
+    parser.add_argument("--max-latency", type=float, default=None, help="Delay limit")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests failing with 429/5xx"
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=None,
+        help="Output generation speed, the whole output at once if not set",
+    )
+    parser.add_argument("--chunk-size", type=int, default=16, help="Characters per chunk")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    setup_logging()
+    args = parse_args()
+    config = StandInConfig(
+        recordings=args.recordings,
+        latency=LatencyDistribution(
+            kind=args.latency, mean=args.mean, spread=args.spread, max=args.max_latency
+        ),
+        tokens_per_second=args.tokens_per_second,
+        chunk_size=args.chunk_size,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_stand_in_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import copy
+import io
+import os
+import threading
+
+from docx import Document
+from docxtpl import DocxTemplate
+from jinja2 import Environment, Template
+
+
+class CompilingEnvironment(Environment):
+    """
+    Jinja environment that compiles every template source only once.
+
+    docxtpl renders the body, headers, footers and properties with
+    `jinja_env.from_string`, so passing this environment to `render` keeps the
+    compiled parts between documents while docxtpl still does its own processing.
+    The defaults are the same as for `Template(source)`, which docxtpl uses
+    without an environment.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._templates: dict[str, Template] = {}
+        self._templates_lock = threading.Lock()
+
+    def from_string(self, source, globals=None, template_class=None) -> Template:
+        if globals is not None or template_class is not None:
+            return super().from_string(source, globals, template_class)
+        with self._templates_lock:
+            template = self._templates.get(source)
+        if template is None:
+            template = super().from_string(source)
+            with self._templates_lock:
+                self._templates[source] = template
+        return template
+
+
+class PrecompiledDocxTemplate(DocxTemplate):
+    """
+    DocxTemplate that starts from an already parsed package and cleaned XML.
+
+    Every render of a DocxTemplate parses the .docx package and cleans the XML of
+    every part with `patch_xml`, which is the most expensive part of rendering.
+    Here the package is copied from the one parsed in CompiledDocxTemplate and the
+    cleaned XML is reused, so neither is repeated per document.
+    """
+
+    def __init__(self, compiled: "CompiledDocxTemplate"):
+        super().__init__(compiled.template_path)
+        self.compiled = compiled
+
+    def init_docx(self, reload: bool = True):
+        if not self.docx or (self.is_rendered and reload):
+            self.docx = self.compiled.copy_document()
+            self.is_rendered = False
+
+    def patch_xml(self, src_xml):
+        return self.compiled.patch_xml(src_xml)
+
+
+class CompiledDocxTemplate:
+    """
+    Template file parsed once and rendered into a fresh document on every call.
+    """
+
+    def __init__(self, template_path: str):
+        """
+        Read and parse the template.
+
+        Args:
+            template_path: Path to the .docx template file with placeholders
+        """
+        self.template_path = template_path
+        with open(template_path, "rb") as file:
+            self.document = Document(io.BytesIO(file.read()))
+        self.jinja_env = CompilingEnvironment()
+        self._patcher = DocxTemplate(template_path)
+        self._patched: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def copy_document(self):
+        """Get a copy of the parsed package that can be rendered into."""
+        with self._lock:
+            return copy.deepcopy(self.document)
+
+    def patch_xml(self, src_xml: str) -> str:
+        """Clean the XML of a template part, once per distinct part."""
+        with self._lock:
+            patched = self._patched.get(src_xml)
+        if patched is None:
+            patched = self._patcher.patch_xml(src_xml)
+            with self._lock:
+                self._patched[src_xml] = patched
+        return patched
+
+    def render(self, context: dict) -> DocxTemplate:
+        """
+        Render the template into a new document.
+
+        Args:
+            context: Values for the template placeholders
+
+        Returns:
+            Rendered document that can be saved with `save`
+        """
+        document = PrecompiledDocxTemplate(self)
+        document.render(context, self.jinja_env)
+        return document
+
+
+_cache_lock = threading.Lock()
+_compiled_templates: dict[str, tuple[tuple[int, int], CompiledDocxTemplate]] = {}
+
+
+def get_compiled_template(template_path: str) -> CompiledDocxTemplate:
+    """
+    Get the compiled template for a path, recompiling it when the file changes.
+
+    Args:
+        template_path: Path to the .docx template file with placeholders
+
+    Returns:
+        CompiledDocxTemplate shared by all callers
+    """
+    path = os.path.abspath(template_path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _compiled_templates.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        compiled = CompiledDocxTemplate(path)
+        _compiled_templates[path] = (version, compiled)
+        return compiled
@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from compact_schema import compact_model
+from extraction_models import (
+    ProjectData,
+    ProjectOutline,
+    ProjectStage,
+    ProjectStageOutline,
+    StageResults,
+)
+from extraction_prompt import OUTLINE_PROMPT, STAGE_RESULTS_PROMPT
+from fact_extractor import ProjectFacts, extract_facts
+from metrics import llm_config, timed
+from resilience import ResilientCaller
+
+
+class TwoPhaseProjectDataExtractor:
+    """
+    Class for extracting project data in two phases: a project outline first,
+    then SMART results for every stage generated concurrently.
+
+    A single structured call has to generate the SMART fields of all stages one after
+    another. Splitting the output lets the long per-stage parts be generated in parallel.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        max_workers: int = 4,
+        resilience: Optional[ResilientCaller] = None,
+        schema_mode: str = "full",
+        rule_facts: bool = False,
+    ):
+        """
+        Initialize the extractor with LLM.
+
+        Args:
+            llm: LLM model - LLM must support structured decoding.
+            max_workers: Maximum number of stages processed concurrently
+            resilience: Optional retry, deadline and hedging policy for LLM calls
+            schema_mode: "full", "compact" or "minimal" - how much of the field
+                descriptions and examples is sent with the schemas
+            rule_facts: Give the dates, the start order form and team members found
+                by deterministic rules to the outline call and set them in the outline
+        """
+        self.llm = llm
+        self.outline_llm = self.llm.with_structured_output(
+            compact_model(ProjectOutline, schema_mode)
+        )
+        self.stage_results_llm = self.llm.with_structured_output(
+            compact_model(StageResults, schema_mode)
+        )
+        self.max_workers = max_workers
+        self.resilience = resilience
+        self.rule_facts = rule_facts
+
+    def _invoke(self, structured_llm: Runnable, prompt: str):
+        """Make a structured LLM call, under the resilience policy if configured."""
+
+        def call():
+            result = structured_llm.invoke(prompt, config=llm_config())
+            if result is None:
+                raise OutputParserException("Model did not return structured output")
+            return result
+
+        return self.resilience.call(call) if self.resilience else call()
+
+    def extract_outline(self, text_description: str) -> ProjectOutline:
+        """
+        Extract everything except the stage results.
+
+        Args:
+            text_description: Text description of the project
+
+        Returns:
+            ProjectOutline object with stage names and dates
+        """
+        facts: Optional[ProjectFacts] = (
+            extract_facts(text_description) if self.rule_facts else None
+        )
+        prompt = f"{OUTLINE_PROMPT}\n\n{text_description}"
+        if facts is None or facts.is_empty():
+            return self._invoke(self.outline_llm, prompt)
+        outline = self._invoke(self.outline_llm, f"{prompt}\n\n{facts.to_prompt()}")
+        # Stage dates must be final here, the stage results are generated for them
+        return ProjectOutline.model_validate(facts.apply(outline.model_dump()))
+
+    def extract_stage_results(
+        self, text_description: str, stage: ProjectStageOutline
+    ) -> StageResults:
+        """
+        Generate SMART results for one stage.
+
+        Args:
+            text_description: Text description of the project
+            stage: Stage from the outline
+
+        Returns:
+            StageResults object with the SMART results of the stage
+        """
+        instructions = STAGE_RESULTS_PROMPT.format(
+            stage_name=stage.stage_name,
+            stage_start_date=stage.stage_start_date,
+            stage_end_date=stage.stage_end_date,
+        )
+        prompt = f"{instructions}\n\n{text_description}"
+        return self._invoke(self.stage_results_llm, prompt)
+
+    @timed("extract")
+    def extract_data(self, text_description: str) -> ProjectData:
+        """
+        Extract project data from a text description.
+
+        Args:
+            text_description: Text description of the project
+
+        Returns:
+            ProjectData object containing the extracted information
+
+        Raises:
+            ValueError: If there's an error in the extraction process
+        """
+        try:
+            outline = self.extract_outline(text_description)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                stage_results = list(
+                    executor.map(
+                        lambda stage: self.extract_stage_results(text_description, stage),
+                        outline.project_stages,
+                    )
+                )
+
+            return ProjectData(
+                **outline.model_dump(exclude={"project_stages"}),
+                project_stages=[
+                    ProjectStage(**stage.model_dump(), smart_results=results.smart_results)
+                    for stage, results in zip(outline.project_stages, stage_results)
+                ],
+            )
+        except Exception as e:
+            raise ValueError("Error during extraction") from e
@@ -0,0 +1,35 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+# settings.py is loaded on import; the tests never call a real provider
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_MODEL", "test")
+os.environ.setdefault("TEMPLATE_PATH", "templates/template.docx")
+
+from extraction_models import ProjectData  # noqa: E402
+
+RECORDINGS_DIR = ROOT / "benchmarks" / "recordings"
+
+
+@pytest.fixture(scope="session")
+def template_path() -> str:
+    return str(ROOT / "templates" / "template.docx")
+
+
+@pytest.fixture(scope="session")
+def project_data() -> ProjectData:
+    """Recorded extraction result of input_examples/example_1.md."""
+    return ProjectData.model_validate_json(
+        (RECORDINGS_DIR / "example_1.json").read_text(encoding="utf-8")
+    )
+
+
+@pytest.fixture(scope="session")
+def description() -> str:
+    return (ROOT / "input_examples" / "example_1.md").read_text(encoding="utf-8")
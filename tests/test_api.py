@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from api import create_app
+from docx_filler import ProjectPassportFiller
+from extraction_cache import InMemoryExtractionCache
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+
+
+def wait_for(client: TestClient, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
+
+
+def make_app(project_data, template_path, latency: float = 0.0, **kwargs):
+    llm = FakeProjectDataChatModel(responses=[project_data.model_dump()], latency=latency)
+    return create_app(
+        ProjectDataExtractor(llm), ProjectPassportFiller(template_path), **kwargs
+    )
+
+
+def test_passport_job_returns_data_and_document(project_data, template_path):
+    with TestClient(make_app(project_data, template_path, workers=2)) as client:
+        response = client.post("/passport", json={"text_description": "Проект"})
+        assert response.status_code == 202
+
+        job = wait_for(client, response.json()["id"])
+        assert job["status"] == "done"
+        assert job["project_data"]["project_name"] == project_data.project_name
+        document = client.get(f"/jobs/{job['id']}/document")
+        assert document.status_code == 200
+        assert document.content[:2] == b"PK"
+
+
+def test_unknown_job_is_not_found(project_data, template_path):
+    with TestClient(make_app(project_data, template_path)) as client:
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.get("/jobs/missing/document").status_code == 404
+
+
+def test_full_queue_rejects_new_jobs(project_data, template_path):
+    app = make_app(project_data, template_path, latency=1.0, workers=1, max_pending=1)
+    with TestClient(app) as client:
+        statuses = [
+            client.post("/extract", json={"text_description": f"Проект {index}"})
+            for index in range(3)
+        ]
+        codes = [response.status_code for response in statuses]
+        assert codes.count(202) <= 2 and codes[-1] == 429
+        assert statuses[-1].headers["Retry-After"] == "1"
+
+
+def test_finished_jobs_beyond_max_jobs_are_evicted(project_data, template_path):
+    with TestClient(make_app(project_data, template_path, max_jobs=2)) as client:
+        first = client.post("/extract", json={"text_description": "Проект"}).json()
+        wait_for(client, first["id"])
+        for _ in range(2):
+            wait_for(client, client.post("/extract", json={"text_description": "П"}).json()["id"])
+        assert client.get(f"/jobs/{first['id']}").status_code == 404
+
+
+class ThreadRecordingCache(InMemoryExtractionCache):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def _get(self, key):
+        self.threads.add(threading.current_thread())
+        return super()._get(key)
+
+
+def test_async_extraction_uses_the_cache_off_the_event_loop(project_data):
+    cache = ThreadRecordingCache()
+    llm = FakeProjectDataChatModel(responses=[project_data.model_dump()])
+    extractor = ProjectDataExtractor(llm, cache)
+
+    async def run():
+        await extractor.aextract_data("Проект")
+        return await extractor.aextract_data("Проект")
+
+    assert asyncio.run(run()) == project_data
+    assert cache.stats()["hits"] == 1
+    assert threading.main_thread() not in cache.threads
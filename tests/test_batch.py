@@ -0,0 +1,96 @@
+import time
+from pathlib import Path
+
+from batch import BatchPassportGenerator, RateLimiter
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+
+
+def make_generator(response_factory, template_path, **kwargs) -> BatchPassportGenerator:
+    llm = FakeProjectDataChatModel(response_factory=response_factory)
+    return BatchPassportGenerator(ProjectDataExtractor(llm), template_path, **kwargs)
+
+
+def test_run_reports_every_item_in_input_order(tmp_path, template_path, project_data):
+    generator = make_generator(lambda prompt, tool: project_data.model_dump(), template_path)
+    items = [(f"project_{index}.md", f"Проект {index}") for index in range(5)]
+
+    report = generator.run(items, str(tmp_path))
+
+    assert [result.source for result in report.results] == [source for source, _ in items]
+    assert len(report.succeeded) == 5 and not report.failed
+    for result in report.results:
+        assert Path(result.output_path).exists()
+        assert Path(result.output_path).name == result.source.replace(".md", ".docx")
+
+
+def test_failed_item_is_reported_without_stopping_the_batch(
+    tmp_path, template_path, project_data
+):
+    def respond(prompt: str, tool_name: str) -> dict:
+        if "сломанный" in prompt:
+            raise RuntimeError("provider is down")
+        return project_data.model_dump()
+
+    generator = make_generator(respond, template_path)
+    report = generator.run(
+        [("good.md", "Проект"), ("bad.md", "сломанный проект"), ("other.md", "Проект")],
+        str(tmp_path),
+    )
+
+    assert [result.source for result in report.failed] == ["bad.md"]
+    assert report.failed[0].error == "Error during extraction"
+    assert report.failed[0].output_path is None
+    assert len(report.succeeded) == 2
+
+
+def test_run_directory_processes_matching_files(tmp_path, template_path, project_data):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "b.md").write_text("Проект Б", encoding="utf-8")
+    (input_dir / "a.md").write_text("Проект А", encoding="utf-8")
+    (input_dir / "notes.txt").write_text("не описание", encoding="utf-8")
+    generator = make_generator(lambda prompt, tool: project_data.model_dump(), template_path)
+
+    report = generator.run_directory(str(input_dir), str(tmp_path / "output"))
+
+    assert [result.source for result in report.results] == ["a.md", "b.md"]
+    assert all(result.ok for result in report.results)
+
+
+class RecordingConverter:
+    def __init__(self):
+        self.documents = []
+
+    def convert(self, document: bytes) -> bytes:
+        self.documents.append(document)
+        return b"%PDF-stub"
+
+
+def test_pdf_is_converted_from_the_rendered_document(tmp_path, template_path, project_data):
+    converter = RecordingConverter()
+    generator = make_generator(
+        lambda prompt, tool: project_data.model_dump(), template_path, pdf_converter=converter
+    )
+
+    report = generator.run([("a.md", "Проект")], str(tmp_path))
+
+    output = Path(report.results[0].output_path)
+    assert converter.documents == [output.read_bytes()]
+    assert output.with_suffix(".pdf").read_bytes() == b"%PDF-stub"
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(20)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.14
+
+
+def test_rate_limiter_without_rate_does_not_wait():
+    limiter = RateLimiter(None)
+    started = time.monotonic()
+    for _ in range(100):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.05
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from bench_pipeline import find_regressions, timing_stats  # noqa: E402
+
+
+def case(extract: tuple, render: tuple = (100.0, 95.0, 2.0), memory: float = 500.0) -> dict:
+    def stage(median: float, minimum: float, mad: float) -> dict:
+        return {"median_ms": median, "min_ms": minimum, "mad_ms": mad}
+
+    return {
+        "extract": stage(*extract),
+        "format": stage(0.1, 0.1, 0.0),
+        "render": stage(*render),
+        "peak_memory_kb": memory,
+        "prompt_tokens": 1000,
+        "output_tokens": 500,
+        "missing_in_document": [],
+    }
+
+
+BASELINE = {"cases": {"example": case((10.0, 9.0, 0.5))}}
+
+
+def regressions(current: dict) -> list[str]:
+    return find_regressions({"cases": {"example": current}}, BASELINE, 0.25)
+
+
+def test_timing_stats():
+    assert timing_stats([3.0, 1.0, 2.0, 10.0, 2.0]) == {
+        "median_ms": 2.0,
+        "min_ms": 1.0,
+        "mad_ms": 1.0,
+    }
+
+
+def test_clear_slowdown_is_a_regression():
+    assert regressions(case((20.0, 18.0, 0.5))) == [
+        "example: extract median_ms 10.00 -> 20.00 (+100%)"
+    ]
+
+
+def test_noisy_or_jittery_timings_are_not_regressions():
+    # Median grew within the spread of the repeats
+    assert regressions(case((14.0, 12.0, 1.5))) == []
+    # Median grew, but the fastest run did not: interference, not slower code
+    assert regressions(case((14.0, 9.5, 0.2))) == []
+
+
+def test_memory_tokens_and_missing_fields_are_compared_exactly():
+    current = case((10.0, 9.0, 0.5), memory=700.0)
+    current["missing_in_document"] = ["project_goal"]
+
+    assert regressions(current) == [
+        "example: missing in document ['project_goal']",
+        "example: peak_memory_kb 500.00 -> 700.00 (+40%)",
+    ]
+
+
+def test_new_cases_without_a_baseline_are_skipped():
+    report = {"cases": {"other": case((50.0, 50.0, 0.0))}}
+    assert find_regressions(report, BASELINE, 0.25) == []
@@ -0,0 +1,104 @@
+import io
+import tempfile
+import threading
+import zipfile
+
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+
+import api
+from api import create_app
+from bulk_export import BulkPassportExporter, passport_file_name
+from docx_filler import ProjectPassportFiller
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+from formatted_data import FormattedProjectData
+
+
+@pytest.fixture
+def processed(monkeypatch) -> threading.Semaphore:
+    """Released each time the API finishes a job, done or failed."""
+    processed = threading.Semaphore(0)
+
+    class SignallingJobQueue(api.JobQueue):
+        def start(self) -> None:
+            super().start()
+            task_done = self._queue.task_done
+
+            def signal() -> None:
+                task_done()
+                processed.release()
+
+            self._queue.task_done = signal
+
+    monkeypatch.setattr(api, "JobQueue", SignallingJobQueue)
+    return processed
+
+
+@pytest.fixture
+def portfolio(project_data) -> list[FormattedProjectData]:
+    formatted = FormattedProjectData.from_project_data(project_data)
+    return [
+        formatted.model_copy(update={"project_name": f"Проект №{index}: пилот"})
+        for index in range(1, 6)
+    ]
+
+
+def test_file_names_are_unique_and_safe(portfolio):
+    assert passport_file_name(7, portfolio[0]) == "007_Проект_№1_пилот.docx"
+
+
+def test_zip_has_one_document_per_project_in_order(tmp_path, template_path, portfolio):
+    path = tmp_path / "passports.zip"
+    with BulkPassportExporter(template_path, max_workers=2, max_pending=2) as exporter:
+        assert exporter.export_zip(iter(portfolio), str(path)) == len(portfolio)
+
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        assert names == [passport_file_name(i, p) for i, p in enumerate(portfolio, 1)]
+        document = Document(io.BytesIO(archive.read(names[2])))
+    assert any("Проект №3: пилот" in p.text for p in document.paragraphs)
+
+
+def test_merged_document_contains_every_project(tmp_path, template_path, portfolio):
+    path = tmp_path / "passports.docx"
+    with BulkPassportExporter(template_path, max_workers=2) as exporter:
+        assert exporter.export_merged(portfolio, str(path)) == len(portfolio)
+        with pytest.raises(ValueError):
+            exporter.export_merged([], str(tmp_path / "empty.docx"))
+
+    text = "\n".join(paragraph.text for paragraph in Document(str(path)).paragraphs)
+    assert all(item.project_name in text for item in portfolio)
+
+
+def test_api_keeps_bulk_exports_on_disk_until_evicted(
+    monkeypatch, processed, tmp_path, template_path, project_data, portfolio
+):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    llm = FakeProjectDataChatModel(responses=[project_data.model_dump()])
+    app = create_app(
+        ProjectDataExtractor(llm),
+        ProjectPassportFiller(template_path),
+        max_jobs=1,
+        render_processes=1,
+    )
+    body = {"formatted_data": [item.model_dump() for item in portfolio]}
+    with TestClient(app) as client:
+        job = client.post("/render/bulk", json=body).json()
+        assert processed.acquire(timeout=30)
+        job = client.get(f"/jobs/{job['id']}").json()
+        assert job["status"] == "done" and job["document_format"] == "zip"
+
+        response = client.get(f"/jobs/{job['id']}/document")
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert len(archive.namelist()) == len(portfolio)
+        assert len(list(tmp_path.glob("passports_*.zip"))) == 1
+
+        # A newer finished job pushes the export out
+        client.post("/extract", json={"text_description": "Проект"})
+        assert processed.acquire(timeout=30)
+        client.post("/extract", json={"text_description": "Проект"})
+        assert client.get(f"/jobs/{job['id']}").status_code == 404
+        assert not list(tmp_path.glob("passports_*"))
@@ -0,0 +1,95 @@
+from chunked_extractor import (
+    NOT_SPECIFIED,
+    ChunkedProjectDataExtractor,
+    merge_project_data,
+    split_text,
+)
+from extraction_models import ProjectStage, SMARTResult
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+
+
+def test_short_text_is_one_chunk():
+    assert split_text("Первый абзац.\n\nВторой абзац.", 1000) == [
+        "Первый абзац.\n\nВторой абзац."
+    ]
+
+
+def test_chunks_fit_the_size_and_repeat_the_overlap():
+    paragraphs = [f"Абзац {index}. " + "слово " * 30 for index in range(10)]
+    chunks = split_text("\n\n".join(paragraphs), chunk_size=500, overlap=200)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split("\n\n")[0] in previous.split("\n\n")
+    assert all(any(p.strip() in chunk for chunk in chunks) for p in paragraphs)
+
+
+def test_long_paragraph_is_split_on_sentences():
+    paragraph = " ".join(f"Предложение номер {index}." for index in range(50))
+    chunks = split_text(paragraph, chunk_size=100)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def stage(name: str, start: str, end: str, *results: str) -> ProjectStage:
+    return ProjectStage(
+        stage_name=name,
+        stage_start_date=start,
+        stage_end_date=end,
+        smart_results=[SMARTResult(result_description=result) for result in results],
+    )
+
+
+def test_merge_takes_first_specified_values_and_deduplicates(project_data):
+    first = project_data.model_copy(
+        update={
+            "project_name": NOT_SPECIFIED,
+            "project_stakeholders": ["Минцифры", "ФСТЭК"],
+            "project_stages": [stage("Анализ", "01.01.2024", NOT_SPECIFIED, "Отчёт")],
+        }
+    )
+    second = project_data.model_copy(
+        update={
+            "project_name": "Платформа",
+            "project_goal": "Другая цель",
+            "project_stakeholders": ["минцифры!", "Банк России"],
+            "project_stages": [
+                stage("анализ", "02.02.2024", "31.03.2024", "отчёт", "Модель угроз"),
+                stage("Разработка", "01.04.2024", "30.09.2024"),
+            ],
+        }
+    )
+
+    merged = merge_project_data([first, second])
+
+    assert merged.project_name == "Платформа"
+    assert merged.project_goal == project_data.project_goal
+    assert merged.project_stakeholders == ["Минцифры", "ФСТЭК", "Банк России"]
+    assert [s.stage_name for s in merged.project_stages] == ["Анализ", "Разработка"]
+    analysis = merged.project_stages[0]
+    assert (analysis.stage_start_date, analysis.stage_end_date) == ("01.01.2024", "31.03.2024")
+    assert [r.result_description for r in analysis.smart_results] == ["Отчёт", "Модель угроз"]
+    # The parts are not changed by the merge
+    assert first.project_stages[0].stage_end_date == NOT_SPECIFIED
+
+
+def test_long_description_is_extracted_per_chunk_and_merged(project_data):
+    def respond(prompt: str, tool_name: str) -> dict:
+        data = project_data.model_dump()
+        data["project_risks_assumptions"] = ["Риск второй части"] if "Вторая" in prompt else []
+        return data
+
+    extractor = ChunkedProjectDataExtractor(
+        ProjectDataExtractor(FakeProjectDataChatModel(response_factory=respond)),
+        chunk_size=300,
+        chunk_overlap=0,
+    )
+    text = "Первая часть. " + "текст " * 40 + "\n\nВторая часть. " + "текст " * 40
+
+    result = extractor.extract_data(text)
+
+    assert result.project_name == project_data.project_name
+    assert result.project_risks_assumptions == ["Риск второй части"]
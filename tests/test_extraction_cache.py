@@ -0,0 +1,104 @@
+import pytest
+
+import extraction_cache
+from compact_schema import get_extraction_schema
+from extraction_cache import (
+    InMemoryExtractionCache,
+    SQLiteExtractionCache,
+    create_extraction_cache,
+    make_cache_key,
+)
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(extraction_cache.time, "time", clock)
+    return clock
+
+
+def test_cache_key_depends_on_every_part_of_the_request():
+    key = make_cache_key("Проект", "model", 0.0)
+    assert key == make_cache_key("Проект", "model", 0.0)
+    assert key != make_cache_key("Проект!", "model", 0.0)
+    assert key != make_cache_key("Проект", "other-model", 0.0)
+    assert key != make_cache_key("Проект", "model", 0.5)
+    assert key != make_cache_key("Проект", "model", 0.0, get_extraction_schema("compact"))
+
+
+def test_memory_cache_evicts_least_recently_used(project_data):
+    cache = InMemoryExtractionCache(max_size=2)
+    cache.set("a", project_data)
+    cache.set("b", project_data)
+    assert cache.get("a") == project_data
+    cache.set("c", project_data)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == project_data
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2}
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_entries_expire_after_ttl(backend, tmp_path, clock, project_data):
+    cache = create_extraction_cache(backend, str(tmp_path / "cache.sqlite3"), 10, ttl=60)
+    cache.set("key", project_data)
+
+    clock.now += 59
+    assert cache.get("key") == project_data
+    clock.now += 2
+    assert cache.get("key") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_sqlite_cache_survives_restart(tmp_path, project_data):
+    path = str(tmp_path / "nested" / "cache.sqlite3")
+    SQLiteExtractionCache(path).set("key", project_data)
+    assert SQLiteExtractionCache(path).get("key") == project_data
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path, clock, project_data):
+    cache = SQLiteExtractionCache(str(tmp_path / "cache.sqlite3"), max_size=2)
+    for key in ("a", "b"):
+        clock.now += 1
+        cache.set(key, project_data)
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("c", project_data)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    assert create_extraction_cache("none", str(tmp_path), 10) is None
+    with pytest.raises(ValueError):
+        create_extraction_cache("redis", str(tmp_path), 10)
+
+
+def test_extractor_answers_repeated_descriptions_from_cache(project_data):
+    calls = []
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        calls.append(prompt)
+        return project_data.model_dump()
+
+    extractor = ProjectDataExtractor(
+        FakeProjectDataChatModel(response_factory=respond), InMemoryExtractionCache()
+    )
+    first = extractor.extract_data("Проект А")
+    second = extractor.extract_data("Проект А")
+    extractor.extract_data("Проект Б")
+
+    assert first == second == project_data
+    assert len(calls) == 2
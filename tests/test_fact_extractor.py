@@ -0,0 +1,85 @@
+from extraction_models import ProjectData
+from fact_extractor import extract_facts, normalize_date, schema_without_facts
+
+STAGES = """
+1. **Анализ требований** (01.03.2024 – 30.06.2024)
+2. **Разработка прототипа** (с 1 июля 2024 года по 31.12.2024)
+"""
+
+
+def test_dates_are_normalized():
+    assert normalize_date("01.03.2024") == "2024-03-01"
+    assert normalize_date("2024-03-01") == "2024-03-01"
+    assert normalize_date("1 марта 2024 года") == "2024-03-01"
+    assert normalize_date("31.02.2024") is None
+
+
+def test_stage_lines_and_team_lists_are_facts():
+    facts = extract_facts(
+        f"Проект стартует 01.03.2024 по письменному поручению.\n{STAGES}\n"
+        "Руководитель проекта: Н.С. Васильев\n"
+        "Независимые эксперты: Е.В. Михайлова, А.С. Волков\n"
+    )
+
+    assert facts.project_start_date == "2024-03-01"
+    assert facts.project_start_order_form == "Письменное поручение"
+    assert [(stage.stage_name, stage.stage_end_date) for stage in facts.project_stages] == [
+        ("Анализ требований", "2024-06-30"),
+        ("Разработка прототипа", "2024-12-31"),
+    ]
+    assert facts.team == {
+        "project_leader": "Н.С. Васильев",
+        "independent_experts": ["Е.В. Михайлова", "А.С. Волков"],
+    }
+    assert facts.hints == {}
+
+
+def test_words_that_only_look_like_a_start_are_ignored():
+    facts = extract_facts("Начальник отдела 12.03.2024 согласовал.")
+
+    assert facts.project_start_date is None
+    assert facts.is_empty()
+
+
+def test_stage_starts_are_not_the_project_start():
+    facts = extract_facts("Проект стартует 01.03.2024. Начало второго этапа 01.07.2024.")
+    assert facts.project_start_date == "2024-03-01"
+
+    facts = extract_facts(STAGES)
+    assert facts.project_start_date is None
+    assert facts.hints == {"Дата начала проекта": "2024-03-01"}
+
+
+def test_conflicting_matches_are_only_hints():
+    facts = extract_facts(
+        "Старт проекта 01.03.2024, запуск системы 01.09.2024. "
+        "Устное поручение дано, затем письменное поручение оформлено.\n"
+        "Руководитель проекта: Н.С. Васильев\n"
+        "Руководитель проекта: П.Р. Соколов\n"
+    )
+
+    assert facts.project_start_date is None
+    assert facts.project_start_order_form is None
+    assert "project_leader" not in facts.team
+    assert facts.hints == {
+        "Дата начала проекта": "2024-03-01 или 2024-09-01",
+        "Поручение о старте проекта": "Устное поручение или Письменное поручение",
+        "Руководитель проекта (РП)": "Н.С. Васильев или П.Р. Соколов",
+    }
+    prompt = facts.to_prompt()
+    assert "Возможные значения" in prompt and "2024-03-01 или 2024-09-01" in prompt
+    assert schema_without_facts(ProjectData, facts) is ProjectData
+    assert facts.apply({"project_start_date": "Не указано"})["project_start_date"] == "Не указано"
+
+
+def test_facts_are_removed_from_the_schema_and_applied():
+    facts = extract_facts("Проект стартует 01.03.2024.\nРуководитель проекта: Н.С. Васильев")
+    schema = schema_without_facts(ProjectData, facts)
+    properties = schema.model_json_schema()["properties"]
+
+    assert "project_start_date" not in properties
+    assert "project_start_date" in ProjectData.model_json_schema()["properties"]
+
+    data = facts.apply({"project_start_date": "Не указано", "project_team": {}})
+    assert data["project_start_date"] == "2024-03-01"
+    assert data["project_team"]["project_leader"] == "Н.С. Васильев"
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+
+from form_spec import FORM_SPEC, build_form_spec, form_values, missing_fields, parse_form
+from formatted_data import FormattedProjectData
+
+
+def test_spec_covers_every_field_in_display_order():
+    names = [field.name for field in FORM_SPEC]
+
+    assert sorted(names) == sorted(FormattedProjectData.model_fields)
+    assert names[:3] == ["project_name", "project_start_order_form", "project_goal"]
+    experts = next(field for field in FORM_SPEC if field.name == "independent_experts")
+    assert experts.is_list and experts.multiline and not experts.required
+
+
+def test_fields_without_options_get_a_default_widget():
+    class Extended(BaseModel):
+        project_name: str
+        new_field: str
+
+    spec = build_form_spec(Extended)
+
+    assert [field.name for field in spec] == ["project_name", "new_field"]
+    assert (spec[1].label, spec[1].multiline, spec[1].height) == ("new_field", True, 100)
+
+
+def test_form_round_trips_the_data(project_data):
+    formatted = FormattedProjectData.from_project_data(project_data)
+    values = form_values(FORM_SPEC, formatted)
+
+    assert formatted.model_copy(update=parse_form(FORM_SPEC, values)) == formatted
+    assert missing_fields(FORM_SPEC, values) == []
+
+
+def test_list_fields_drop_blank_lines_and_missing_fields_are_found(project_data):
+    values = form_values(FORM_SPEC, FormattedProjectData.from_project_data(project_data))
+    values.update(independent_experts=" А.А. Иванов \n\n Б.Б. Петров\n", project_goal="  ")
+
+    parsed = parse_form(FORM_SPEC, values)
+    missing = missing_fields(FORM_SPEC, {**values, "independent_experts": ""})
+
+    assert parsed["independent_experts"] == ["А.А. Иванов", "Б.Б. Петров"]
+    assert [field.name for field in missing] == ["project_goal"]
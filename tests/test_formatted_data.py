@@ -0,0 +1,36 @@
+from formatted_data import NOT_SPECIFIED, FormattedProjectData
+
+
+def test_team_string_lists_every_role_and_expert(project_data):
+    formatted = FormattedProjectData.from_project_data(project_data)
+    lines = formatted.project_team.split("\n")
+
+    assert lines[0] == f"Инициатор проекта: {formatted.project_initiator}"
+    assert lines[3] == f"Руководитель проекта: {formatted.project_leader}"
+    assert lines[8:] == [
+        f"Независимый эксперт: {expert}" for expert in formatted.independent_experts
+    ]
+    assert formatted.model_dump()["project_team"] == formatted.project_team
+
+
+def test_missing_team_members_are_not_specified(project_data):
+    team = project_data.project_team.model_copy(update={"project_manager": None})
+    formatted = FormattedProjectData.from_project_data(
+        project_data.model_copy(update={"project_team": team})
+    )
+
+    assert formatted.project_manager == NOT_SPECIFIED
+
+
+def test_team_string_follows_edits(project_data):
+    formatted = FormattedProjectData.from_project_data(project_data)
+    original = formatted.project_team
+
+    copied = formatted.model_copy(update={"project_leader": "П.Р. Соколов"})
+    assert "Руководитель проекта: П.Р. Соколов" in copied.project_team
+    assert formatted.project_team == original
+
+    formatted.independent_experts = []
+    assert "Независимый эксперт" not in formatted.project_team
+    formatted.project_goal = "Другая цель"
+    assert formatted.project_team == formatted.model_dump()["project_team"]
@@ -0,0 +1,85 @@
+from extraction_models import ProjectData
+from fake_llm import FakeProjectDataChatModel
+from formatted_data import FormattedProjectData
+from incremental_extractor import (
+    SECTION_FIELDS,
+    IncrementalProjectDataExtractor,
+    affected_sections,
+    diff_paragraphs,
+    keep_manual_edits,
+)
+
+NEW_RISK = "Риск задержки поставок серверного оборудования."
+
+
+def make_responder(project_data: ProjectData, calls: list):
+    recording = project_data.model_dump()
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        calls.append((tool_name, prompt))
+        fields = next(
+            fields
+            for section, fields in SECTION_FIELDS.items()
+            if tool_name == f"Project{section.title()}Section"
+        )
+        response = {field: recording[field] for field in fields}
+        if "project_risks_assumptions" in response:
+            response["project_risks_assumptions"] = [
+                *response["project_risks_assumptions"],
+                NEW_RISK,
+            ]
+        return response
+
+    return respond
+
+
+def test_diff_finds_changed_paragraphs_only():
+    removed, added = diff_paragraphs("Один.\n\nДва.\n\nТри.", "один\n\nДва!\n\nЧетыре.")
+
+    assert (removed, added) == (["Три."], ["Четыре."])
+
+
+def test_paragraphs_are_attributed_to_sections():
+    assert affected_sections([NEW_RISK]) == {"risks"}
+    assert affected_sections(["Этап 2 завершится 31.12.2024."]) == {"stages"}
+    assert affected_sections(["---"]) == set()
+    assert affected_sections(["Текст без признаков какого-либо раздела паспорта."]) is None
+
+
+def test_only_changed_sections_are_extracted_with_their_own_prompt(project_data, description):
+    calls = []
+    extractor = IncrementalProjectDataExtractor(
+        FakeProjectDataChatModel(response_factory=make_responder(project_data, calls))
+    )
+
+    updated = extractor.extract_update(
+        description, project_data, f"{description}\n\n{NEW_RISK}"
+    )
+
+    assert [tool_name for tool_name, _ in calls] == ["ProjectRisksSection"]
+    prompt = calls[0][1]
+    assert "project_risks_assumptions" in prompt and "project_goal" not in prompt
+    assert "SMART" not in prompt
+    assert updated.project_risks_assumptions[-1] == NEW_RISK
+    assert updated.project_stages == project_data.project_stages
+
+
+def test_unchanged_and_rewritten_descriptions(project_data, description):
+    calls = []
+    extractor = IncrementalProjectDataExtractor(
+        FakeProjectDataChatModel(response_factory=make_responder(project_data, calls))
+    )
+
+    assert extractor.extract_update(description, project_data, description) is project_data
+    assert extractor.extract_update(description, project_data, "Совсем другой проект.") is None
+    assert calls == []
+
+
+def test_manual_edits_survive_a_new_extraction(project_data):
+    extracted = FormattedProjectData.from_project_data(project_data)
+    edited = extracted.model_copy(update={"project_goal": "Исправлено вручную"})
+    updated = extracted.model_copy(update={"project_name": "Новое имя", "project_goal": "Новая"})
+
+    result = keep_manual_edits(extracted, edited, updated)
+
+    assert (result.project_name, result.project_goal) == ("Новое имя", "Исправлено вручную")
@@ -0,0 +1,46 @@
+import gc
+import weakref
+
+import llm
+from extraction_cache import InMemoryExtractionCache
+from settings import settings
+
+
+def test_llm_is_created_once_per_settings(monkeypatch):
+    first = llm.init_llm()
+    assert llm.init_llm() is first
+
+    monkeypatch.setattr(settings, "openai_temperature", 0.7)
+    assert llm.init_llm() is not first
+
+
+def test_extractor_is_shared_and_bound_to_the_given_cache():
+    cache = InMemoryExtractionCache()
+    other_cache = InMemoryExtractionCache()
+
+    shared = llm.get_extractor()
+    cached = llm.get_extractor(cache)
+    other = llm.get_extractor(other_cache)
+
+    assert llm.get_extractor() is shared and shared.cache is None
+    assert cached.cache is cache and other.cache is other_cache
+    assert cached.structured_llm is shared.structured_llm is other.structured_llm
+
+
+def test_streaming_runnable_is_built_once():
+    cache = InMemoryExtractionCache()
+
+    assert llm.get_extractor(cache).streaming_llm is llm.get_extractor(cache).streaming_llm
+    assert llm.get_extractor(cache).streaming_llm is llm.get_extractor().streaming_llm
+
+
+def test_registry_does_not_keep_caches_alive():
+    cache = InMemoryExtractionCache()
+    extractor = llm.get_extractor(cache)
+    reference = weakref.ref(cache)
+
+    del cache, extractor
+    gc.collect()
+
+    assert reference() is None
+    assert llm.get_extractor(InMemoryExtractionCache()).cache is not None
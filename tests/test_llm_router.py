@@ -0,0 +1,113 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from extraction_models import ProjectData
+from fake_llm import FakeProjectDataChatModel
+from llm_router import RoutedChatModel, RouterBackend
+
+
+ROOT = Path(__file__).parent.parent
+
+
+def backend(name: str, project_data: ProjectData, calls: list, error=None) -> RouterBackend:
+    def respond(prompt: str, tool_name: str) -> dict:
+        calls.append(name)
+        if error is not None:
+            raise error
+        return project_data.model_dump()
+
+    return RouterBackend(name, FakeProjectDataChatModel(response_factory=respond))
+
+
+def test_transient_failure_fails_over_and_cools_the_backend_down(project_data):
+    calls = []
+    router = RoutedChatModel(
+        backends=[
+            backend("down", project_data, calls, TimeoutError("slow")),
+            backend("up", project_data, calls),
+        ]
+    )
+    structured = router.with_structured_output(ProjectData)
+
+    assert structured.invoke("Проект") == project_data
+    assert structured.invoke("Проект") == project_data
+    # The failed backend is skipped while on cooldown
+    assert calls == ["down", "up", "up"]
+    assert router.backends[0].error_rate == 1.0
+
+
+def test_other_errors_do_not_fail_over(project_data):
+    calls = []
+    router = RoutedChatModel(
+        backends=[
+            backend("broken", project_data, calls, KeyError("bug")),
+            backend("up", project_data, calls),
+        ]
+    )
+    with pytest.raises(KeyError):
+        router.with_structured_output(ProjectData).invoke("Проект")
+    assert calls == ["broken"]
+    assert router.backends[0].in_flight == 0
+
+
+def test_closing_a_stream_early_frees_the_backend(project_data):
+    router = RoutedChatModel(
+        backends=[
+            RouterBackend(
+                "up",
+                FakeProjectDataChatModel(
+                    responses=[project_data.model_dump()], chunk_size=8
+                ),
+            )
+        ]
+    )
+    stream = router.bind_tools([ProjectData], tool_choice="ProjectData").stream("Проект")
+
+    next(stream)
+    stream.close()
+
+    assert router.backends[0].in_flight == 0
+
+
+def test_requests_go_to_the_faster_backend(project_data):
+    calls = []
+    slow = backend("slow", project_data, calls)
+    fast = backend("fast", project_data, calls)
+    slow.latencies.extend([2.0] * 10)
+    fast.latencies.extend([0.5] * 10)
+    router = RoutedChatModel(backends=[slow, fast])
+
+    router.with_structured_output(ProjectData).invoke("Проект")
+    assert calls == ["fast"]
+
+
+def test_saturated_backend_is_used_last(project_data):
+    calls = []
+    fast = backend("fast", project_data, calls)
+    fast.latencies.extend([0.1] * 10)
+    fast.in_flight = fast.max_concurrency
+    router = RoutedChatModel(backends=[fast, backend("idle", project_data, calls)])
+
+    router.with_structured_output(ProjectData).invoke("Проект")
+    assert calls == ["idle"]
+
+
+def test_settings_do_not_load_the_llm_clients():
+    code = (
+        "import sys, settings; "
+        "print(sorted(m for m in ('llm_router', 'groq', 'openai') if m in sys.modules))"
+    )
+    env = {
+        "PYTHONPATH": str(ROOT / "src"),
+        "OPENAI_API_KEY": "test",
+        "OPENAI_MODEL": "test",
+        "TEMPLATE_PATH": "templates/template.docx",
+        "LLM_BACKENDS": '[{"name": "local", "provider": "openai", "model": "m"}]',
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+import metrics
+from metrics import MetricsRegistry, configure_metrics, increment, observe, timed
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch) -> MetricsRegistry:
+    monkeypatch.setattr(metrics, "_registry", None)
+    return configure_metrics(str(tmp_path / "logs" / "metrics.jsonl"))
+
+
+def read_events(tmp_path) -> list[dict]:
+    lines = (tmp_path / "logs" / "metrics.jsonl").read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+@timed("work")
+def work(fail: bool = False) -> str:
+    if fail:
+        raise RuntimeError("failed")
+    return "done"
+
+
+@timed("async_work")
+async def async_work() -> str:
+    return "done"
+
+
+def test_events_are_written_as_json_lines(registry, tmp_path):
+    increment("llm_requests", backend="groq")
+    observe("llm_latency_seconds", 0.5, backend="groq")
+    assert work() == "done"
+    with pytest.raises(RuntimeError):
+        work(fail=True)
+    assert asyncio.run(async_work()) == "done"
+
+    events = read_events(tmp_path)
+
+    assert [event["event"] for event in events] == [
+        "llm_requests",
+        "llm_latency_seconds",
+        "stage",
+        "stage",
+        "stage",
+    ]
+    assert events[0]["backend"] == "groq" and events[0]["value"] == 1
+    assert [(event["stage"], event["status"]) for event in events[2:]] == [
+        ("work", "ok"),
+        ("work", "error"),
+        ("async_work", "ok"),
+    ]
+    assert all(event["duration_ms"] >= 0 for event in events[2:])
+
+
+def test_prometheus_rendering(registry):
+    increment("llm_requests", backend="groq")
+    increment("llm_requests", 2, backend="groq")
+    observe("llm_latency_seconds", 0.5, backend="groq")
+    observe("llm_latency_seconds", 1.5, backend="groq")
+
+    lines = registry.render_prometheus().splitlines()
+
+    assert lines == [
+        "# TYPE passport_llm_requests_total counter",
+        'passport_llm_requests_total{backend="groq"} 3',
+        "# TYPE passport_llm_latency_seconds summary",
+        'passport_llm_latency_seconds_count{backend="groq"} 2',
+        'passport_llm_latency_seconds_sum{backend="groq"} 2.0',
+    ]
+
+
+def test_label_values_are_escaped(registry):
+    increment("llm_errors", error='bad "json"\nat C:\\path')
+
+    line = registry.render_prometheus().splitlines()[1]
+
+    assert line == 'passport_llm_errors_total{error="bad \\"json\\"\\nat C:\\\\path"} 1'
+
+
+def test_disabled_instrumentation_records_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "_registry", None)
+
+    def no_clock():
+        raise AssertionError("disabled instrumentation must not read the clock")
+
+    monkeypatch.setattr(metrics.time, "perf_counter", no_clock)
+    increment("llm_requests")
+    observe("llm_latency_seconds", 1.0)
+
+    assert work() == "done"
+    assert asyncio.run(async_work()) == "done"
+    assert metrics.get_registry() is None
+    assert metrics.llm_config() is None
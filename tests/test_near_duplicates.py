@@ -0,0 +1,45 @@
+from near_duplicates import NearDuplicateIndex, shingles
+
+OTHER = "Проект внедрения системы электронного документооборота в региональных филиалах."
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Этап  №1: анализ!") == shingles("этап 1 - АНАЛИЗ")
+    assert len(shingles("abc")) == 1
+
+
+def test_reworded_description_is_found(description):
+    index = NearDuplicateIndex()
+    index.add(1, description)
+    index.add(2, OTHER)
+
+    match = index.find(description.replace("Проект", "Инициатива", 1), threshold=0.8)
+
+    assert match.key == 1 and 0.8 <= match.similarity < 1.0
+    assert index.find(description).similarity == 1.0
+    assert index.find("Совсем другой короткий текст", threshold=0.5) is None
+
+
+def test_remove_keeps_the_other_keys_findable(description):
+    index = NearDuplicateIndex()
+    index.add(1, description)
+    index.add(2, OTHER)
+    index.add(3, "Третий проект о модернизации котельных.")
+
+    index.remove(1)
+    index.remove(1)
+
+    assert len(index) == 2
+    assert index.find(description, threshold=0.8) is None
+    assert index.find(OTHER).key == 2
+    assert index.find("Третий проект о модернизации котельных").key == 3
+
+
+def test_adding_a_key_again_replaces_its_text(description):
+    index = NearDuplicateIndex()
+    for key in range(20):
+        index.add(key, f"{OTHER} Филиал номер {key}.")
+    index.add(5, description)
+
+    assert len(index) == 20
+    assert index.find(description).key == 5
@@ -0,0 +1,76 @@
+import pytest
+from pydantic import ValidationError
+
+from extraction_models import ProjectData
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+from output_repair import apply_patch, build_patch_model, repair_targets
+
+
+def broken_output(project_data: ProjectData) -> dict:
+    output = project_data.model_dump()
+    del output["project_name"]
+    output["project_stages"][1]["smart_results"][0]["result_description"] = None
+    return output
+
+
+def validation_error(output: dict) -> ValidationError:
+    with pytest.raises(ValidationError) as error:
+        ProjectData.model_validate(output)
+    return error.value
+
+
+def test_targets_are_the_smallest_broken_parts(project_data):
+    targets = repair_targets(ProjectData, validation_error(broken_output(project_data)))
+    assert targets == [
+        ("project_name",),
+        ("project_stages", 1, "smart_results", 0, "result_description"),
+    ]
+
+
+def test_patch_is_written_back_into_the_output(project_data):
+    output = broken_output(project_data)
+    targets = repair_targets(ProjectData, validation_error(output))
+    patch_model = build_patch_model(ProjectData, targets)
+
+    patch = patch_model(
+        project_name="Платформа",
+        project_stages__1__smart_results__0__result_description="Отчёт",
+    )
+    apply_patch(output, targets, patch)
+
+    repaired = ProjectData.model_validate(output)
+    assert repaired.project_name == "Платформа"
+    assert repaired.project_stages[1].smart_results[0].result_description == "Отчёт"
+    assert repaired.project_stages[0] == project_data.project_stages[0]
+
+
+def test_extractor_regenerates_only_the_broken_fields(project_data):
+    requests = []
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        requests.append(tool_name)
+        if tool_name == "ProjectDataRepair":
+            return {
+                "project_name": "Платформа",
+                "project_stages__1__smart_results__0__result_description": "Отчёт",
+            }
+        return broken_output(project_data)
+
+    llm = FakeProjectDataChatModel(response_factory=respond)
+    result = ProjectDataExtractor(llm, repair_attempts=1).extract_data("Проект")
+
+    assert requests == ["ProjectData", "ProjectDataRepair"]
+    assert result.project_name == "Платформа"
+    assert result.project_goal == project_data.project_goal
+
+
+def test_extraction_fails_when_repair_does_not_help(project_data):
+    def respond(prompt: str, tool_name: str) -> dict:
+        if tool_name == "ProjectDataRepair":
+            return {"project_name": "Платформа"}
+        return broken_output(project_data)
+
+    llm = FakeProjectDataChatModel(response_factory=respond)
+    with pytest.raises(ValueError, match="Error during extraction"):
+        ProjectDataExtractor(llm, repair_attempts=2).extract_data("Проект")
@@ -0,0 +1,100 @@
+import re
+
+from batch import BatchPassportGenerator
+from extraction_cache import InMemoryExtractionCache
+from extractor import ProjectDataExtractor
+from fake_llm import FakeProjectDataChatModel
+from packed_extractor import PackedProjectDataExtractor
+
+TEXTS = ["Проект один", "Проект два", "Проект три"]
+
+
+def make_packer(respond, cache=None, **kwargs) -> PackedProjectDataExtractor:
+    llm = FakeProjectDataChatModel(response_factory=respond)
+    return PackedProjectDataExtractor(ProjectDataExtractor(llm, cache=cache), **kwargs)
+
+
+def packed_response(project_data, prompt: str, skip: set = (), invalid: set = ()) -> dict:
+    numbers = re.findall(r"### Описание (\d+)", prompt)
+    projects = []
+    for number in numbers:
+        if number in skip:
+            continue
+        item = {**project_data.model_dump(), "description_id": number}
+        item["project_name"] = f"Проект {number}"
+        if number in invalid:
+            del item["project_stages"]
+        projects.append(item)
+    return {"projects": projects}
+
+
+def test_short_descriptions_are_grouped_within_the_limits():
+    packer = make_packer(lambda prompt, tool: {}, max_chars=10, max_group_chars=25, max_items=2)
+    texts = ["a" * 8, "b" * 8, "c" * 8, "d" * 30, "e" * 8, "f" * 9, "g" * 9]
+
+    assert packer.pack(texts) == [[0, 1], [2, 4], [5, 6]]
+
+
+def test_results_are_mapped_back_by_description_id(project_data):
+    calls = []
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        calls.append(tool_name)
+        return packed_response(project_data, prompt)
+
+    results = make_packer(respond).extract_group(TEXTS)
+
+    assert calls == ["PackedProjectDataList"]
+    assert [result.project_name for result in results] == ["Проект 1", "Проект 2", "Проект 3"]
+
+
+def test_skipped_and_invalid_items_are_left_for_single_extraction(project_data):
+    packer = make_packer(
+        lambda prompt, tool: packed_response(project_data, prompt, skip={"1"}, invalid={"3"})
+    )
+
+    results = packer.extract_group(TEXTS)
+
+    assert results[0] is None and results[2] is None
+    assert results[1].project_name == "Проект 2"
+
+
+def test_failed_request_leaves_every_item_for_single_extraction():
+    def respond(prompt: str, tool_name: str) -> dict:
+        raise RuntimeError("provider is down")
+
+    assert make_packer(respond).extract_group(TEXTS) == [None, None, None]
+
+
+def test_cached_items_are_not_sent_again(project_data):
+    prompts = []
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        prompts.append(prompt)
+        return packed_response(project_data, prompt)
+
+    packer = make_packer(respond, cache=InMemoryExtractionCache())
+    packer.extract_group(TEXTS[:2])
+    results = packer.extract_group(TEXTS)
+
+    assert len(prompts) == 1
+    assert [result is None for result in results] == [False, False, True]
+
+
+def test_batch_extracts_skipped_items_alone(tmp_path, template_path, project_data):
+    calls = []
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        calls.append(tool_name)
+        if tool_name == "PackedProjectDataList":
+            return packed_response(project_data, prompt, skip={"2"})
+        return project_data.model_dump()
+
+    packer = make_packer(respond)
+    generator = BatchPassportGenerator(packer.extractor, template_path, packer=packer)
+    report = generator.run(
+        [(f"{index}.md", text) for index, text in enumerate(TEXTS)], str(tmp_path)
+    )
+
+    assert len(report.succeeded) == 3
+    assert sorted(calls) == ["PackedProjectDataList", "ProjectData"]
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import pdf_export
+from docx_filler import ProjectPassportFiller
+from formatted_data import FormattedProjectData
+from pdf_export import DEFAULT_FONT_PATH, LibreOfficePdfConverter, create_pdf_converter
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(DEFAULT_FONT_PATH), reason="Cyrillic font for fpdf is not installed"
+)
+
+
+@pytest.fixture(scope="module")
+def converter():
+    with create_pdf_converter("fpdf", workers=2) as converter:
+        yield converter
+
+
+def render(template_path, formatted_data: FormattedProjectData) -> bytes:
+    return ProjectPassportFiller(template_path).render_bytes(formatted_data)
+
+
+@pytest.fixture(scope="module")
+def document(template_path, project_data) -> bytes:
+    return render(template_path, FormattedProjectData.from_project_data(project_data))
+
+
+def test_document_is_converted_to_pdf(converter, document):
+    assert converter.convert(document).startswith(b"%PDF")
+
+
+def test_many_documents_are_converted_in_order(converter, template_path, project_data):
+    formatted = FormattedProjectData.from_project_data(project_data)
+    longer = formatted.model_copy(update={"project_goal": "Длинная цель. " * 500})
+    documents = [render(template_path, formatted), render(template_path, longer)] * 2
+
+    sizes = [len(result) for result in converter.convert_many(documents)]
+
+    assert sizes[1] > sizes[0] and sizes[3] > sizes[2]
+
+
+def test_disabled_and_unknown_backends():
+    assert create_pdf_converter("none") is None
+    with pytest.raises(ValueError):
+        create_pdf_converter("word")
+
+
+def test_failed_libreoffice_startup_stops_the_started_workers(monkeypatch, tmp_path):
+    started = []
+
+    class Worker:
+        def __init__(self, soffice_path, profile_dir, startup_timeout):
+            if started:
+                raise RuntimeError("LibreOffice did not start")
+            self.closed = False
+            started.append(self)
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(pdf_export, "_LibreOfficeWorker", Worker)
+    monkeypatch.setattr(pdf_export.tempfile, "tempdir", str(tmp_path))
+
+    with pytest.raises(RuntimeError):
+        LibreOfficePdfConverter(workers=3)
+
+    assert [worker.closed for worker in started] == [True]
+    assert list(tmp_path.iterdir()) == []
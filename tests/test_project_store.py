@@ -0,0 +1,75 @@
+import pytest
+
+from formatted_data import FormattedProjectData
+from project_store import ProjectStore, build_match_query
+
+
+@pytest.fixture
+def store(tmp_path) -> ProjectStore:
+    return ProjectStore(str(tmp_path / "data" / "passports.sqlite3"))
+
+
+@pytest.fixture
+def formatted(project_data) -> FormattedProjectData:
+    return FormattedProjectData.from_project_data(project_data)
+
+
+def test_saving_a_project_again_adds_a_version(store, formatted, project_data):
+    first = store.save(formatted, project_data, source_text="v1")
+    renamed = formatted.model_copy(update={"project_name": "Новое название"})
+    second = store.save(renamed, source_text="v2", project_id=first.project_id)
+
+    assert (first.version, second.version) == (1, 2)
+    assert [version for version, _ in store.versions(first.project_id)] == [2, 1]
+    assert store.get(first.project_id).formatted_data.project_name == "Новое название"
+    earlier = store.get(first.project_id, version=1)
+    assert earlier.project_data == project_data
+    assert earlier.source_text == "v1"
+    assert store.sources() == [(first.project_id, "v2")]
+    assert len(store) == 1
+
+
+def test_saving_to_a_missing_project_fails(store, formatted):
+    with pytest.raises(KeyError):
+        store.save(formatted, project_id=42)
+    assert store.get(42) is None
+
+
+def test_search_matches_word_prefixes_of_the_latest_version(store, formatted, project_data):
+    saved = store.save(formatted, project_data)
+    store.save(
+        formatted.model_copy(
+            update={"project_name": "Платформа учёта", "project_leader": "П.П. Петров"}
+        )
+    )
+
+    results = store.search("Васильев Национальн")
+
+    assert [result.project_id for result in results] == [saved.project_id]
+    assert "**" in results[0].snippet
+
+    store.save(
+        formatted.model_copy(update={"project_leader": "С.С. Белозёров"}),
+        project_id=saved.project_id,
+    )
+    assert [result.project_id for result in store.search("Белозёров")] == [saved.project_id]
+    assert store.search("Васильев Национальн") == []
+
+
+def test_empty_search_lists_recent_projects_and_delete_removes_them(store, formatted):
+    first = store.save(formatted)
+    second = store.save(formatted)
+
+    assert {result.project_id for result in store.search("")} == {
+        first.project_id,
+        second.project_id,
+    }
+
+    store.delete(first.project_id)
+    assert store.get(first.project_id) is None
+    assert [result.project_id for result in store.search("Национальн")] == [second.project_id]
+
+
+def test_match_query_ignores_fts_syntax():
+    assert build_match_query('cyber" OR NOT (x*') == '"cyber"* AND "OR"* AND "NOT"* AND "x"*'
+    assert build_match_query("  -- ") == ""
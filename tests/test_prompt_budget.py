@@ -0,0 +1,29 @@
+from compact_schema import get_extraction_schema, to_project_data
+from extraction_prompt import EXTRACTION_PROMPT
+from prompt_budget import analyze_prompt_budget, count_tokens, estimate_tokens
+
+
+def test_estimate_counts_words_and_punctuation():
+    assert estimate_tokens("Этап №1, до 30.06.2024.") == 11
+    assert count_tokens("Этап №1, до 30.06.2024.", encoding=None) == 11
+
+
+def test_budget_lists_nested_fields():
+    budget = analyze_prompt_budget(encoding=None)
+    paths = {field.path for field in budget.fields}
+
+    assert budget.prompt_tokens == estimate_tokens(EXTRACTION_PROMPT)
+    assert budget.total_tokens == budget.prompt_tokens + budget.schema_tokens
+    assert {"project_name", "project_stages", "project_stages[].smart_results[].specific"} <= paths
+    assert all(field.tokens >= field.description_tokens for field in budget.fields)
+
+
+def test_compact_schemas_are_smaller_and_convert_back(project_data):
+    tokens = [
+        analyze_prompt_budget(get_extraction_schema(mode), encoding=None).schema_tokens
+        for mode in ("full", "compact", "minimal")
+    ]
+    compact = get_extraction_schema("minimal").model_validate(project_data.model_dump())
+
+    assert tokens == sorted(tokens, reverse=True) and tokens[0] > tokens[2]
+    assert to_project_data(compact) == project_data
@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import httpx
+import pytest
+from langchain_core.exceptions import OutputParserException
+
+from resilience import CircuitOpenError, ResiliencePolicy, ResilientCaller
+
+
+def make_caller(**settings) -> ResilientCaller:
+    return ResilientCaller(ResiliencePolicy(**{"backoff_base": 0.0, "timeout": None, **settings}))
+
+
+def flaky(failures: int, error: Exception = TimeoutError("slow")):
+    calls = itertools.count(1)
+
+    def call() -> str:
+        if next(calls) <= failures:
+            raise error
+        return "ok"
+
+    return call
+
+
+def test_transient_errors_are_retried():
+    assert make_caller(max_retries=2).call(flaky(2)) == "ok"
+    with pytest.raises(TimeoutError):
+        make_caller(max_retries=1).call(flaky(2))
+
+
+def test_other_errors_are_not_retried():
+    call = flaky(1, KeyError("bug"))
+    with pytest.raises(KeyError):
+        make_caller(max_retries=3).call(call)
+    assert call() == "ok"
+
+
+def test_httpx_transport_errors_are_transient():
+    assert make_caller(max_retries=1).call(flaky(1, httpx.ConnectError("refused"))) == "ok"
+
+
+def test_call_exceeding_the_deadline_times_out():
+    caller = make_caller(timeout=0.1, max_retries=0)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        caller.call(lambda: time.sleep(1))
+    assert time.monotonic() - started < 0.5
+
+
+def test_circuit_opens_after_repeated_failures_and_lets_a_trial_through():
+    caller = make_caller(max_retries=0, circuit_failure_threshold=2, circuit_reset_timeout=0.2)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            caller.call(flaky(1))
+    with pytest.raises(CircuitOpenError):
+        caller.call(lambda: "ok")
+
+    time.sleep(0.25)
+    assert caller.call(lambda: "ok") == "ok"
+    assert caller.call(lambda: "ok") == "ok"
+
+
+def test_slow_call_is_hedged():
+    caller = make_caller(hedge_percentile=0.5, hedge_min_samples=3, timeout=5.0)
+    for _ in range(3):
+        caller.call(lambda: time.sleep(0.01))
+    calls = itertools.count(1)
+    lock = threading.Lock()
+
+    def first_call_hangs() -> int:
+        with lock:
+            number = next(calls)
+        if number == 1:
+            time.sleep(1)
+        return number
+
+    started = time.monotonic()
+    assert caller.call(first_call_hangs) == 2
+    assert time.monotonic() - started < 0.5
+
+
+def test_async_calls_are_retried():
+    attempts = []
+
+    async def call() -> str:
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise TimeoutError("slow")
+        return "ok"
+
+    assert asyncio.run(make_caller(max_retries=1).acall(call)) == "ok"
+    assert len(attempts) == 2
+
+
+def test_malformed_output_is_retried_without_opening_the_circuit():
+    caller = make_caller(max_retries=2, circuit_failure_threshold=1)
+
+    with pytest.raises(OutputParserException):
+        caller.call(flaky(5, OutputParserException("not json")))
+
+    assert caller.call(lambda: "ok") == "ok"
+
+
+def test_waiting_for_a_worker_does_not_count_against_the_deadline():
+    caller = ResilientCaller(
+        ResiliencePolicy(timeout=0.2, max_retries=0, backoff_base=0.0), max_workers=1
+    )
+    caller._executor.submit(time.sleep, 0.3)
+
+    assert caller.call(lambda: time.sleep(0.05) or "ok") == "ok"
+    assert caller._latencies[-1] < 0.2
+
+
+def test_latencies_can_be_recorded_while_the_hedge_delay_is_read():
+    caller = make_caller(hedge_percentile=0.5, hedge_min_samples=1)
+    stop = threading.Event()
+
+    def record():
+        while not stop.is_set():
+            caller._record_latency(0.01)
+
+    writers = [threading.Thread(target=record) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    try:
+        for _ in range(2000):
+            caller.hedge_delay()
+    finally:
+        stop.set()
+        for writer in writers:
+            writer.join()
+
+
+def chunks(failures: int, fail_after: int = 0):
+    attempts = itertools.count(1)
+
+    def stream():
+        attempt = next(attempts)
+        for number in range(3):
+            if attempt <= failures and number == fail_after:
+                raise TimeoutError("slow")
+            yield number
+
+    return stream
+
+
+def test_stream_is_retried_before_the_first_chunk():
+    assert list(make_caller(max_retries=1).stream(chunks(1))) == [0, 1, 2]
+
+
+def test_stream_error_after_a_chunk_is_raised():
+    received = []
+    with pytest.raises(TimeoutError):
+        for chunk in make_caller(max_retries=3).stream(chunks(1, fail_after=1)):
+            received.append(chunk)
+    assert received == [0]
+
+
+def test_stream_respects_the_circuit_and_the_deadline():
+    caller = make_caller(max_retries=0, timeout=0.05, circuit_failure_threshold=1)
+
+    def slow():
+        for number in range(3):
+            time.sleep(0.04)
+            yield number
+
+    with pytest.raises(TimeoutError):
+        list(caller.stream(slow))
+    with pytest.raises(CircuitOpenError):
+        list(caller.stream(slow))
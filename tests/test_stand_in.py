@@ -0,0 +1,145 @@
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from extraction_models import ProjectData, ProjectOutline, StageResults
+from llm_router import create_chat_model
+from packed_extractor import packed_schema
+from resilience import TRANSIENT_ERRORS, ResiliencePolicy, ResilientCaller
+from stand_in import (
+    LatencyDistribution,
+    ResponseSynthesizer,
+    StandInError,
+    parse_stand_in_url,
+)
+from stand_in_server import create_stand_in_app
+
+ROOT = Path(__file__).parent.parent
+RECORDINGS = ROOT / "benchmarks" / "recordings"
+
+
+def parameters(model) -> dict:
+    return convert_to_openai_tool(model)["function"]["parameters"]
+
+
+@pytest.fixture(scope="module")
+def synthesizer() -> ResponseSynthesizer:
+    return ResponseSynthesizer.from_directory(str(RECORDINGS), seed=1)
+
+
+def test_url_sets_the_recordings_and_the_behaviour():
+    config = parse_stand_in_url(
+        "stand-in://benchmarks/recordings?latency=lognormal&mean=2&spread=0.5&error_rate=0.05"
+    )
+
+    assert config.recordings == str(RECORDINGS)
+    assert (config.latency.kind, config.latency.mean, config.latency.spread) == (
+        "lognormal",
+        2.0,
+        0.5,
+    )
+    assert config.error_rate == 0.05
+    with pytest.raises(ValueError):
+        parse_stand_in_url("http://localhost/v1")
+
+
+def test_latency_is_clipped():
+    generator = random.Random(1)
+    latency = LatencyDistribution(kind="normal", mean=1.0, spread=5.0, max=2.0)
+
+    assert all(0.0 <= latency.sample(generator) <= 2.0 for _ in range(100))
+
+
+def test_any_schema_is_answered_from_the_recordings(synthesizer):
+    for model in (ProjectData, ProjectOutline, StageResults):
+        model.model_validate(synthesizer.synthesize(parameters(model)))
+
+
+def test_packed_responses_follow_the_description_headers(synthesizer):
+    prompt = "### Описание 1\nПервый\n\n### Описание 2\nВторой"
+
+    response = synthesizer.synthesize(parameters(packed_schema(ProjectData)), prompt)
+
+    assert [item["description_id"] for item in response["projects"]] == ["1", "2"]
+
+
+def chat_request(**extra) -> dict:
+    tool = convert_to_openai_tool(ProjectData)
+    return {
+        "model": "stand-in",
+        "messages": [{"role": "user", "content": "Проект"}],
+        "tools": [tool],
+        "tool_choice": {"type": "function", "function": {"name": "ProjectData"}},
+        **extra,
+    }
+
+
+def test_server_answers_tool_calls_with_and_without_streaming():
+    client = TestClient(create_stand_in_app(parse_stand_in_url("stand-in://?seed=1")))
+
+    response = client.post("/v1/chat/completions", json=chat_request())
+    call = response.json()["choices"][0]["message"]["tool_calls"][0]["function"]
+    ProjectData.model_validate_json(call["arguments"])
+
+    with client.stream("POST", "/v1/chat/completions", json=chat_request(stream=True)) as stream:
+        events = [line[6:] for line in stream.iter_lines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    arguments = "".join(
+        delta["tool_calls"][0]["function"]["arguments"]
+        for delta in (json.loads(event)["choices"][0]["delta"] for event in events[:-1])
+        if "tool_calls" in delta
+    )
+    ProjectData.model_validate_json(arguments)
+
+
+def test_server_injects_provider_errors():
+    client = TestClient(create_stand_in_app(parse_stand_in_url("stand-in://?error_rate=1")))
+
+    response = client.post("/v1/chat/completions", json=chat_request())
+
+    assert response.status_code in (429, 500, 503)
+
+
+def test_in_process_model_waits_and_fails_as_configured():
+    model = create_chat_model(
+        "openai", "key", "stand-in", 0.0, "stand-in://?latency=constant&mean=0.2"
+    )
+    started = time.perf_counter()
+    model.with_structured_output(ProjectData).invoke("Проект")
+    assert time.perf_counter() - started >= 0.2
+
+    failing = create_chat_model("openai", "key", "stand-in", 0.0, "stand-in://?error_rate=1")
+    with pytest.raises(StandInError) as error:
+        failing.with_structured_output(ProjectData).invoke("Проект")
+    assert isinstance(error.value, TRANSIENT_ERRORS)
+
+
+def test_injected_errors_are_retried():
+    model = create_chat_model(
+        "openai", "key", "stand-in", 0.0, "stand-in://?error_rate=0.5&seed=3"
+    ).with_structured_output(ProjectData)
+    caller = ResilientCaller(ResiliencePolicy(max_retries=10, backoff_base=0.0, timeout=None))
+
+    assert isinstance(caller.call(lambda: model.invoke("Проект")), ProjectData)
+
+
+def test_router_does_not_load_the_stand_in():
+    code = (
+        "import sys, llm_router; "
+        "print(sorted(m for m in ('fake_llm', 'stand_in') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env={"PYTHONPATH": str(ROOT / "src")},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,56 @@
+import pytest
+
+from extractor import ProjectDataExtractor
+from extraction_cache import InMemoryExtractionCache
+from fake_llm import FakeProjectDataChatModel
+from resilience import ResiliencePolicy, ResilientCaller
+
+
+def test_updates_grow_until_the_complete_result(project_data):
+    llm = FakeProjectDataChatModel(responses=[project_data.model_dump()], chunk_size=32)
+    updates = []
+
+    result = ProjectDataExtractor(llm).extract_data_streaming("Проект", updates.append)
+
+    assert result == project_data
+    assert len(updates) > 10
+    assert updates[0].keys() <= updates[-1].keys()
+    assert updates[-1]["project_name"] == project_data.project_name
+    # The preview shows text before the whole output is generated
+    assert any("project_name" in update and "project_stages" not in update for update in updates)
+
+
+def test_streamed_result_is_cached(project_data):
+    llm = FakeProjectDataChatModel(responses=[project_data.model_dump()], chunk_size=256)
+    extractor = ProjectDataExtractor(llm, InMemoryExtractionCache())
+    extractor.extract_data_streaming("Проект", lambda update: None)
+
+    updates = []
+    assert extractor.extract_data_streaming("Проект", updates.append) == project_data
+    assert updates == []
+
+
+def test_invalid_streamed_output_fails_the_extraction(project_data):
+    output = project_data.model_dump()
+    del output["project_name"]
+    llm = FakeProjectDataChatModel(responses=[output], chunk_size=256)
+
+    with pytest.raises(ValueError, match="Error during extraction"):
+        ProjectDataExtractor(llm).extract_data_streaming("Проект", lambda update: None)
+
+
+def test_stream_is_retried_under_the_resilience_policy(project_data):
+    attempts = []
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TimeoutError("slow")
+        return project_data.model_dump()
+
+    llm = FakeProjectDataChatModel(response_factory=respond, chunk_size=256)
+    resilience = ResilientCaller(ResiliencePolicy(backoff_base=0.0, max_retries=1))
+    extractor = ProjectDataExtractor(llm, resilience=resilience)
+
+    assert extractor.extract_data_streaming("Проект", lambda update: None) == project_data
+    assert len(attempts) == 2
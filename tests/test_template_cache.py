@@ -0,0 +1,68 @@
+import io
+import os
+import shutil
+
+import docxtpl.template
+from docx import Document
+from docxtpl import DocxTemplate
+
+import template_cache
+from docx_filler import ProjectPassportFiller
+from formatted_data import FormattedProjectData
+from template_cache import get_compiled_template
+
+
+def document_text(source) -> str:
+    document = Document(source)
+    cells = [cell.text for table in document.tables for row in table.rows for cell in row.cells]
+    return "\n".join([paragraph.text for paragraph in document.paragraphs] + cells)
+
+
+def saved(document: DocxTemplate) -> io.BytesIO:
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_render_matches_docxtpl(template_path, project_data):
+    context = FormattedProjectData.from_project_data(project_data).model_dump()
+    expected = DocxTemplate(template_path)
+    expected.render(context)
+
+    compiled = get_compiled_template(template_path)
+    first = compiled.render(context)
+    second = compiled.render(context)
+
+    assert document_text(saved(first)) == document_text(saved(expected))
+    assert document_text(saved(second)) == document_text(saved(expected))
+    assert project_data.project_name in document_text(saved(second))
+
+
+def test_render_does_not_parse_the_package_again(monkeypatch, template_path, project_data):
+    compiled = get_compiled_template(template_path)
+    context = FormattedProjectData.from_project_data(project_data).model_dump()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("template package parsed again")
+
+    monkeypatch.setattr(docxtpl.template, "Document", fail)
+    monkeypatch.setattr(template_cache, "Document", fail)
+    assert document_text(saved(compiled.render(context)))
+
+
+def test_template_is_compiled_again_after_the_file_changes(tmp_path, template_path):
+    path = tmp_path / "template.docx"
+    shutil.copy(template_path, path)
+    compiled = get_compiled_template(str(path))
+    assert get_compiled_template(str(path)) is compiled
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_compiled_template(str(path)) is not compiled
+
+
+def test_filler_renders_to_bytes(template_path, project_data):
+    filler = ProjectPassportFiller(template_path)
+    content = filler.render_bytes(FormattedProjectData.from_project_data(project_data))
+    assert project_data.project_name in document_text(io.BytesIO(content))
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from extraction_models import ProjectData
+from fake_llm import FakeProjectDataChatModel
+from two_phase_extractor import TwoPhaseProjectDataExtractor
+
+
+def make_responder(project_data: ProjectData, stage_delay: float = 0.0):
+    outline = project_data.model_dump()
+    for stage in outline["project_stages"]:
+        del stage["smart_results"]
+    results = {stage.stage_name: stage.smart_results for stage in project_data.project_stages}
+    active = []
+    lock = threading.Lock()
+
+    def respond(prompt: str, tool_name: str) -> dict:
+        if tool_name == "ProjectOutline":
+            return outline
+        with lock:
+            active.append(1)
+        time.sleep(stage_delay)
+        name = next(name for name in results if f"«{name}»" in prompt)
+        return {"smart_results": [result.model_dump() for result in results[name]]}
+
+    return respond, active
+
+
+def test_stage_results_are_joined_with_the_outline(project_data):
+    respond, _ = make_responder(project_data)
+    extractor = TwoPhaseProjectDataExtractor(FakeProjectDataChatModel(response_factory=respond))
+
+    assert extractor.extract_data("Проект") == project_data
+
+
+def test_stages_are_generated_concurrently(project_data):
+    stages = len(project_data.project_stages)
+    respond, active = make_responder(project_data, stage_delay=0.3)
+    extractor = TwoPhaseProjectDataExtractor(
+        FakeProjectDataChatModel(response_factory=respond), max_workers=stages
+    )
+
+    started = time.perf_counter()
+    extractor.extract_data("Проект")
+
+    assert len(active) == stages
+    assert time.perf_counter() - started < 0.3 * stages
+
+
+def test_failed_stage_fails_the_extraction(project_data):
+    respond, _ = make_responder(project_data)
+
+    def failing(prompt: str, tool_name: str) -> dict:
+        if tool_name == "StageResults":
+            raise RuntimeError("provider is down")
+        return respond(prompt, tool_name)
+
+    extractor = TwoPhaseProjectDataExtractor(FakeProjectDataChatModel(response_factory=failing))
+    with pytest.raises(ValueError, match="Error during extraction"):
+        extractor.extract_data("Проект")